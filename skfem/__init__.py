@@ -27,4 +27,5 @@ __all__ = all_mesh + all_assembly + all_element + [  # noqa
     'solver_direct_scipy',
     'solver_iter_pcg',
     'solver_iter_krylov',
+    'transfer_operator',
 ]
@@ -4,10 +4,13 @@ from typing import List, Any, Tuple,\
 
 import numpy as np
 from numpy import ndarray
+from scipy.sparse import coo_matrix, identity, spmatrix
 
-from skfem.assembly.dofs import Dofs
+from skfem.assembly.dofs import Dofs, DofsView
 from skfem.element.discrete_field import DiscreteField
 from skfem.element.element_composite import ElementComposite
+from skfem.element.element_h1 import ElementH1
+from skfem.mesh.topology import find_entities
 
 
 BasisType = TypeVar('BasisType', bound='Basis')
@@ -24,6 +27,11 @@ class Basis:
     """
 
     tind: ndarray = None
+    _doflocs: ndarray = None
+    _mesh_parameters: DiscreteField = None
+    # the number of calls to update and the cached transfer operators
+    _generation: int = 0
+    _transfers: Any = None
 
     def __init__(self, mesh, elem, mapping=None):
 
@@ -34,18 +42,6 @@ class Basis:
         if mesh.refdom != elem.refdom:
             raise ValueError("Incompatible Mesh and Element.")
 
-        # global degree-of-freedom location
-        # disabled for MappingMortar by checking mapping.maps
-        if hasattr(elem, 'doflocs') and not hasattr(mapping, 'maps'):
-            doflocs = self.mapping.F(elem.doflocs.T)
-            self.doflocs = np.zeros((doflocs.shape[0], self.N))
-
-            # match mapped dofs and global dof numbering
-            for itr in range(doflocs.shape[0]):
-                for jtr in range(self.element_dofs.shape[0]):
-                    self.doflocs[itr, self.element_dofs[jtr]] =\
-                        doflocs[itr, :, jtr]
-
         self.mesh = mesh
         self.elem = elem
 
@@ -56,6 +52,35 @@ class Basis:
         self.refdom = mesh.refdom
         self.brefdom = mesh.brefdom
 
+    @property
+    def doflocs(self) -> ndarray:
+        """Global locations of the degrees-of-freedom (dim x N).
+
+        Computed on first access by mapping each DOF once from the
+        reference element of one of the elements it belongs to.
+
+        """
+        if self._doflocs is None:
+            # disabled for MappingMortar by checking mapping.maps
+            if (not hasattr(self.elem, 'doflocs')
+                    or hasattr(self.mapping, 'maps')):
+                raise AttributeError("DOF locations not available "
+                                     "for the given element or mapping.")
+
+            # choose one (local index, element) pair for each global DOF
+            element_dofs = self.dofs.element_dofs
+            owner = np.full(self.N, -1, dtype=np.int64)
+            owner[element_dofs.flatten()] = np.arange(element_dofs.size)
+            found = owner >= 0
+            jtr, tind = np.divmod(owner[found], element_dofs.shape[1])
+
+            X = self.elem.doflocs[jtr].T[:, :, None]
+            x = self.mapping.F(X, tind=tind)[:, :, 0]
+            self._doflocs = np.zeros((x.shape[0], self.N))
+            self._doflocs[:, found] = x
+
+        return self._doflocs
+
     @property
     def nodal_dofs(self):
         return self.dofs.nodal_dofs
@@ -82,11 +107,91 @@ class Basis:
             return self.dofs.element_dofs
         return self.dofs.element_dofs[:, self.tind]
 
+    def renumber(self, strategy: Union[str, ndarray] = 'rcm') -> ndarray:
+        """Renumber the degrees-of-freedom for better locality.
+
+        Should be called before assembly.  The DOF subsets returned by
+        :meth:`~skfem.assembly.Basis.find_dofs` and the DOF locations
+        follow the new numbering.
+
+        Parameters
+        ----------
+        strategy
+            The string 'rcm' for reverse Cuthill-McKee ordering of the DOF
+            graph, the string 'sfc' for ordering the DOF locations along a
+            space-filling curve, or an explicit permutation.
+
+        Returns
+        -------
+        ndarray
+            The permutation `p`, i.e. a vector `x` in the old numbering
+            corresponds to `x[p]` in the new numbering.
+
+        """
+        if isinstance(strategy, str) and strategy == 'sfc':
+            doflocs = self.doflocs
+        else:
+            doflocs = None
+        perm = self.dofs.renumber(strategy, doflocs=doflocs)
+        self._doflocs = None
+        self._generation += 1
+        self._transfers = None
+        return perm
+
+    def update(self: BasisType, p: Optional[ndarray] = None) -> BasisType:
+        """Recompute the basis after the mesh vertices have moved.
+
+        Only the mapping, the global basis functions and the integration
+        weights are recomputed.  The degrees-of-freedom are kept, so the
+        sparsity pattern of the assembled matrices does not change.  This
+        is useful for moving meshes and shape optimization:
+
+        >>> from skfem import *
+        >>> m = MeshTri()
+        >>> basis = InteriorBasis(m, ElementTriP1())
+        >>> basis.update(2. * m.p).dx.sum().round(12)
+        4.0
+
+        Parameters
+        ----------
+        p
+            Optionally, the new locations of the mesh vertices which are
+            set using :meth:`~skfem.mesh.Mesh.update_vertices`.  If `None`,
+            the vertices are assumed to have been moved already.
+
+        Returns
+        -------
+        Basis
+            The updated basis itself.
+
+        """
+        if p is not None:
+            self.mesh.update_vertices(p)
+        else:
+            self.mesh._vertices_moved()
+        self.mapping.update()
+        self._doflocs = None
+        self._mesh_parameters = None
+        self._generation += 1
+        self._transfers = None
+        self._init_geometry()
+        return self
+
+    def _init_geometry(self) -> None:
+        """Evaluate the quantities that depend on the vertex locations."""
+        raise NotImplementedError
+
     def complement_dofs(self, *D):
         if type(D[0]) is dict:
             # if a dict of Dofs objects are given, flatten all
-            D = tuple(D[0][key].all() for key in D[0])
-        return np.setdiff1d(np.arange(self.N), np.concatenate(D))
+            D = tuple(D[0][key] for key in D[0])
+        mask = np.zeros(self.N, dtype=np.bool_)
+        for d in D:
+            if isinstance(d, DofsView) and d.mask.shape[0] == self.N:
+                mask |= d.mask
+            else:
+                mask[np.asarray(d)] = True
+        return np.nonzero(~mask)[0]
 
     def find_dofs(self,
                   facets: Dict[str, ndarray] = None,
@@ -95,16 +200,17 @@ class Basis:
 
         Facets can be queried from :class:`~skfem.mesh.Mesh` objects:
 
+        >>> from skfem import MeshTri, ElementTriP1, InteriorBasis
         >>> m = MeshTri()
         >>> m.refine()
         >>> m.facets_satisfying(lambda x: x[0] == 0)
-        array([1, 5])
+        array([2, 3])
 
         This corresponds to a list of facet indices that can be passed over:
 
         >>> basis = InteriorBasis(m, ElementTriP1())
-        >>> basis.find_dofs({'left': np.array([1, 5])})['left']
-        Dofs(nodal={'u': array([0, 2, 5])}, facet={}, edge={}, interior={})
+        >>> basis.find_dofs({'left': np.array([2, 3])})['left'].nodal
+        {'u': array([0, 2, 5])}
 
         Parameters
         ----------
@@ -159,6 +265,150 @@ class Basis:
                     for k in facets}
         return self.dofs.get_facet_dofs(facets)
 
+    def hanging_constraints(self) -> Tuple[spmatrix, ndarray]:
+        """Return the constraints of the DOFs at the hanging nodes.
+
+        After an adaptive refinement of :class:`~skfem.mesh.MeshQuad` or
+        :class:`~skfem.mesh.MeshHex`, the DOFs on the interface of refined
+        and unrefined elements are determined by the DOFs of the unrefined
+        elements.  A continuous solution is found by assembling the system
+        as usual and eliminating the constrained DOFs:
+
+        >>> from skfem import (MeshQuad, ElementQuad1, InteriorBasis, asm,
+        ...                    condense, solve)
+        >>> from skfem.models.poisson import laplace, unit_load
+        >>> m = MeshQuad()
+        >>> m.refine(2)
+        >>> m.refine(np.array([2]))
+        >>> basis = InteriorBasis(m, ElementQuad1())
+        >>> A = asm(laplace, basis)
+        >>> b = asm(unit_load, basis)
+        >>> D = basis.get_dofs().all()
+        >>> P, H = basis.hanging_constraints()
+        >>> len(H)
+        4
+        >>> x = P @ solve(*condense(P.T @ A @ P, P.T @ b, D=np.union1d(D, H)))
+
+        The values at the hanging nodes are now determined by the other
+        values:
+
+        >>> bool(np.allclose(P @ x, x))
+        True
+
+        Supported are Lagrange elements without DOFs on edges, such as
+        :class:`~skfem.element.ElementQuad1`,
+        :class:`~skfem.element.ElementQuad2` and
+        :class:`~skfem.element.ElementHex1`.
+
+        Returns
+        -------
+        P
+            A sparse matrix (N x N) mapping the values of the unconstrained
+            DOFs to the values of all DOFs.  The columns corresponding to the
+            constrained DOFs are zero, and `P[:, I]` is a basis of the
+            continuous functions if `I` are the unconstrained DOFs.
+        ndarray
+            The constrained DOFs.
+
+        """
+        mesh = self.mesh
+        if not mesh._midpoints:
+            return identity(self.N, format='csr'), np.array([], dtype=np.int64)
+        if not isinstance(self.elem, ElementH1) or self.elem.edge_dofs > 0:
+            raise NotImplementedError("Hanging node constraints not "
+                                      "implemented for the given element.")
+
+        # the constrained DOFs and the unrefined elements defining them
+        k = mesh.facets.shape[0]
+        dofs, tind = [], []
+        for n, R in mesh._midpoints.items():
+            if n == k:
+                elems = mesh.f2t[0, find_entities(mesh.facets, R[:n])]
+            else:
+                owner = np.empty(mesh.edges.shape[1], dtype=np.int64)
+                owner[mesh.t2e] = np.arange(mesh.t.shape[1])
+                elems = owner[find_entities(mesh.edges, R[:n])]
+            dofs.append(self.nodal_dofs[:, R[n]].flatten())
+            tind.append(np.tile(elems, self.nodal_dofs.shape[0]))
+            if n == k and self.elem.facet_dofs > 0:
+                # the parts of a split facet contain its centre and a vertex
+                parent = np.full(mesh.p.shape[1], -1, dtype=np.int64)
+                parent[R[n]] = np.arange(R.shape[1])
+                cand = np.nonzero(mesh.f2t[1] == -1)[0]
+                facets = mesh.facets[:, cand]
+                for e in parent[facets]:
+                    ix = np.nonzero(e >= 0)[0]
+                    ix = ix[(facets[:, None, ix]
+                             == R[None, :n, e[ix]]).any(axis=(0, 1))]
+                    dofs.append(self.facet_dofs[:, cand[ix]].flatten())
+                    tind.append(np.tile(elems[e[ix]],
+                                        self.facet_dofs.shape[0]))
+        dofs, first = np.unique(np.concatenate(dofs), return_index=True)
+        tind = np.concatenate(tind)[first]
+
+        # evaluate the basis of the unrefined elements at the DOFs
+        free = np.setdiff1d(np.arange(self.N), dofs)
+        C = self._interpolator(self.doflocs[:, dofs], tind).tocoo()
+        S = coo_matrix((
+            np.concatenate((np.ones(len(free)), C.data)),
+            (np.concatenate((free, dofs[C.row])),
+             np.concatenate((free, C.col)))
+        ), shape=(self.N, self.N)).tocsr()
+
+        # substitute the constrained DOFs that depend on each other
+        P = S
+        while P[:, dofs].count_nonzero() > 0:
+            P = P @ S
+        P.eliminate_zeros()
+        return P, dofs
+
+    def _interpolator(self,
+                      x: ndarray,
+                      tind: ndarray,
+                      gradient: bool = False
+                      ) -> Union[spmatrix, Tuple[spmatrix, List[spmatrix]]]:
+        """Return the matrix evaluating a solution vector at points.
+
+        Parameters
+        ----------
+        x
+            The points (dim x Npoints).
+        tind
+            The element containing each point.
+        gradient
+            If `True`, also return the matrices evaluating the partial
+            derivatives.
+
+        """
+        X = self.mapping.invF(x[:, :, None], tind=tind)
+        if isinstance(self.elem, ElementH1) and not gradient:
+            fields = [DiscreteField(value=self.elem.lbasis(X, i)[0])
+                      for i in range(self.Nbfun)]
+        else:
+            fields = [self.elem.gbasis(self.mapping, X, i, tind=tind)
+                      for i in range(self.Nbfun)]
+            if len(fields[0]) > 1 or fields[0][0].value.ndim != 2:
+                raise NotImplementedError("Point evaluation not implemented "
+                                          "for vectorial elements.")
+            fields = [field[0] for field in fields]
+
+        W = [np.array([f.value[:, 0] for f in fields])]
+        if gradient:
+            W += [np.array([f.grad[i][:, 0] for f in fields])
+                  for i in range(x.shape[0])]
+        rows = np.broadcast_to(np.arange(x.shape[1]), W[0].shape)
+        cols = self.dofs.element_dofs[:, tind]
+        mats = []
+        for w in W:
+            keep = np.abs(w) > 1e-10
+            mats.append(coo_matrix(
+                (w[keep], (rows[keep], cols[keep])),
+                shape=(x.shape[1], self.N)
+            ).tocsr())
+        if gradient:
+            return mats[0], mats[1:]
+        return mats[0]
+
     def default_parameters(self):
         """This is used by :func:`skfem.assembly.asm` to get the default
         parameters for 'w'."""
@@ -62,7 +62,7 @@ class FacetBasis(Basis):
         # facets where the basis is evaluated
         if facets is None:
             if side is None:
-                self.find = np.nonzero(self.mesh.f2t[1] == -1)[0]
+                self.find = self.mesh.boundary_facets()
                 self.tind = self.mesh.f2t[0, self.find]
             elif hasattr(self.mapping, 'helper_to_orig') and side in [0, 1]:
                 self.mapping.side = side
@@ -78,6 +78,11 @@ class FacetBasis(Basis):
             self.find = facets
             self.tind = self.mesh.f2t[0, self.find]
 
+        self.nelems = len(self.find)
+
+        self._init_geometry()
+
+    def _init_geometry(self):
         # boundary refdom to global facet
         x = self.mapping.G(self.X, find=self.find)
         # global facet to refdom facet
@@ -92,8 +97,6 @@ class FacetBasis(Basis):
                                        self.mesh.t2f)
         )
 
-        self.nelems = len(self.find)
-
         self.basis = [self.elem.gbasis(self.mapping, Y, j, self.tind)
                       for j in range(self.Nbfun)]
 
@@ -110,6 +113,10 @@ class FacetBasis(Basis):
         return DiscreteField(self.mapping.G(self.X, find=self.find))
 
     def mesh_parameters(self) -> ndarray:
-        return DiscreteField((np.abs(self.mapping.detDG(self.X, self.find))
-                              ** (1. / (self.mesh.dim() - 1.)))
-                             if self.mesh.dim() != 1 else np.array([0.]))
+        if self._mesh_parameters is None:
+            self._mesh_parameters = DiscreteField(
+                (np.abs(self.mapping.detDG(self.X, self.find))
+                 ** (1. / (self.mesh.dim() - 1.)))
+                if self.mesh.dim() != 1 else np.array([0.])
+            )
+        return self._mesh_parameters
@@ -1,7 +1,8 @@
-from typing import Optional, Callable, Tuple
+from typing import Callable, List, Optional, Tuple, Union
 
 import numpy as np
 from numpy import ndarray
+from scipy.sparse import spmatrix
 
 from skfem.element import Element, DiscreteField
 from skfem.mapping import Mapping
@@ -69,17 +70,22 @@ class InteriorBasis(Basis):
                 intorder if intorder is not None else 2 * self.elem.maxdeg
             )
 
-        self.basis = [self.elem.gbasis(self.mapping, self.X, j, tind=elements)
-                      for j in range(self.Nbfun)]
-
         if elements is None:
             self.nelems = mesh.t.shape[1]
             self.tind = np.arange(self.nelems, dtype=np.int64)
         else:
             self.nelems = len(elements)
             self.tind = elements
+        self._elements = elements
+
+        self._init_geometry()
+
+    def _init_geometry(self):
+        self.basis = [self.elem.gbasis(self.mapping, self.X, j,
+                                       tind=self._elements)
+                      for j in range(self.Nbfun)]
 
-        self.dx = (np.abs(self.mapping.detDF(self.X, tind=elements))
+        self.dx = (np.abs(self.mapping.detDF(self.X, tind=self._elements))
                    * np.tile(self.W, (self.nelems, 1)))
 
     def default_parameters(self):
@@ -91,13 +97,42 @@ class InteriorBasis(Basis):
         return DiscreteField(self.mapping.F(self.X, tind=self.tind))
 
     def mesh_parameters(self) -> DiscreteField:
-        return DiscreteField(np.abs(self.mapping.detDF(self.X, self.tind))
-                             ** (1. / self.mesh.dim()))
+        if self._mesh_parameters is None:
+            self._mesh_parameters = DiscreteField(
+                np.abs(self.mapping.detDF(self.X, self.tind))
+                ** (1. / self.mesh.dim())
+            )
+        return self._mesh_parameters
 
     def refinterp(self,
                   interp: ndarray,
-                  Nrefs: Optional[int] = 1) -> Tuple[Mesh, ndarray]:
-        """Refine and interpolate (for plotting)."""
+                  Nrefs: Optional[int] = 1,
+                  deduplicate: bool = False,
+                  return_arrays: bool = False):
+        """Refine and interpolate (for plotting).
+
+        Parameters
+        ----------
+        interp
+            The solution vector.
+        Nrefs
+            The number of refinements of each element.
+        deduplicate
+            If `True`, the vertices shared by neighbouring elements are merged
+            and the values are taken from one of the elements.  Otherwise,
+            each element has its own vertices so that discontinuous fields
+            can be plotted.
+        return_arrays
+            If `True`, return the arrays `(p, t, values)` instead of creating
+            a mesh, e.g., for exporting large meshes.
+
+        Returns
+        -------
+        Mesh, ndarray
+            The refined mesh and the values at its vertices.  Alternatively,
+            the vertices, the elements and the values as arrays.
+
+        """
         # mesh reference domain, refine and take the vertices
         meshclass = type(self.mesh)
         m = meshclass.init_refdom()
@@ -105,48 +140,94 @@ class InteriorBasis(Basis):
         X = m.p
 
         # map vertices to global elements
-        x = self.mapping.F(X)
+        x = self.mapping.F(X, tind=self._elements)
 
         # interpolate some previous discrete function at the vertices
         # of the refined mesh
         w = 0. * x[0]
         for j in range(self.Nbfun):
-            basis = self.elem.gbasis(self.mapping, X, j)
+            basis = self.elem.gbasis(self.mapping, X, j, tind=self._elements)
             w += interp[self.element_dofs[j]][:, None] * basis[0]
 
         # create connectivity for the new mesh
-        nt = self.nelems
-        t = np.tile(m.t, (1, nt))
-        dt = np.max(t)
-        t += (dt + 1) *\
-            (np.tile(np.arange(nt), (m.t.shape[0] * m.t.shape[1], 1))
-             .flatten('F')
-             .reshape((-1, m.t.shape[0])).T)
-
-        if X.shape[0] == 1:
-            p = np.array([x.flatten()])
-        else:
-            p = x[0].flatten()
-            for itr in range(len(x) - 1):
-                p = np.vstack((p, x[itr + 1].flatten()))
-
-        M = meshclass(p, t, validate=False)
-
-        return M, w.flatten()
+        nt, npts = w.shape
+        t = np.ascontiguousarray(
+            (m.t.T[None, :, :] + npts * np.arange(nt)[:, None, None])
+            .reshape(-1, m.t.shape[0]).T
+        )
+        p = x.reshape(x.shape[0], -1)
+        w = w.flatten()
+
+        if deduplicate:
+            # merge the vertices which coincide up to rounding errors
+            lo = p.min(axis=1, keepdims=True)
+            extent = float(np.max(p.max(axis=1) - lo[:, 0]))
+            tol = 1e-10 * (extent if extent > 0. else 1.)
+            _, ix, inverse = np.unique(np.round((p - lo) / tol)
+                                       .astype(np.int64),
+                                       axis=1,
+                                       return_index=True,
+                                       return_inverse=True)
+            p, t, w = p[:, ix], inverse.flatten()[t], w[ix]
+
+        if return_arrays:
+            return p, t, w
+
+        return meshclass(p, t, validate=False), w
 
     def interpolator(self, y: ndarray) -> Callable[[ndarray], ndarray]:
         """Return a function handle, which can be used for finding
-        pointwise values of the given solution vector."""
+        pointwise values of the given solution vector.
 
-        finder = self.mesh.element_finder()
+        Use :meth:`~skfem.assembly.InteriorBasis.probe` instead when the
+        same points are evaluated repeatedly."""
 
         def interpfun(x):
-            tris = finder(*x)
-            pts = self.mapping.invF(x[:, :, np.newaxis], tind=tris)
-            w = np.zeros(x.shape[1])
-            for k in range(self.Nbfun):
-                phi = self.elem.gbasis(self.mapping, pts, k, tind=tris)[0]
-                w += y[self.element_dofs[k, tris]] * phi[0].flatten()
-            return w
+            return self.probe(x) @ y
 
         return interpfun
+
+    def probe(self,
+              x: ndarray,
+              gradient: bool = False
+              ) -> Union[spmatrix, Tuple[spmatrix, List[spmatrix]]]:
+        """Return the matrix evaluating solution vectors at the given points.
+
+        The elements containing the points are located and the basis
+        functions are evaluated once.  Sampling a solution vector is then a
+        sparse matrix-vector product, and sampling the columns of an array
+        of snapshots a single matrix product:
+
+        >>> from skfem import MeshTri, InteriorBasis, ElementTriP1
+        >>> m = MeshTri()
+        >>> m.refine(2)
+        >>> basis = InteriorBasis(m, ElementTriP1())
+        >>> P = basis.probe(np.array([[.1, .3], [.25, .5]]))
+        >>> P.shape
+        (2, 25)
+        >>> (P @ np.array([t * m.p[0] for t in [1., 2.]]).T).round(12)
+        array([[0.1, 0.2],
+               [0.3, 0.6]])
+
+        Parameters
+        ----------
+        x
+            The points (dim x Npoints).
+        gradient
+            If `True`, also return the matrices evaluating the partial
+            derivatives.
+
+        Returns
+        -------
+        spmatrix
+            The matrix (Npoints x N).
+        list
+            If `gradient` is `True`, the matrices evaluating the partial
+            derivatives with respect to each coordinate.
+
+        """
+        x = np.asarray(x, dtype=np.float64).reshape(self.mesh.p.shape[0], -1)
+        tind = self.mesh.element_finder()(*x)
+        if (tind < 0).any():
+            raise ValueError("Some points are outside of the mesh.")
+        return self._interpolator(x, tind, gradient=gradient)
@@ -2,13 +2,15 @@ from typing import Union, NamedTuple, Any, List
 
 import numpy as np
 from numpy import ndarray
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
 
 from skfem.element import Element
 from skfem.mesh import Mesh
+from skfem.mesh.ordering import morton_order
 
 
-class DofsView(NamedTuple):
-    """A subset of :class:`skfem.assembly.Dofs`."""
+class _DofsViewFields(NamedTuple):
 
     obj: Any = None
     nodal_ix: Union[ndarray, slice] = slice(None)
@@ -20,8 +22,34 @@ class DofsView(NamedTuple):
     edge_rows: Union[ndarray, slice] = slice(None)
     interior_rows: Union[ndarray, slice] = slice(None)
 
-    def flatten(self):
-        """Return all DOF indices as a single array."""
+
+class DofsView(_DofsViewFields):
+    """A subset of :class:`skfem.assembly.Dofs`.
+
+    A named tuple of the parent Dofs and the selected entities and rows.
+    The flattened array of DOF indices and the corresponding boolean mask
+    are computed on first use and memoised on the instance.
+
+    """
+
+    def _cached(self, key, fun):
+        # invalidate if the parent Dofs have been renumbered
+        memo = self.__dict__
+        if memo.get('_cache_key') is not self.obj.element_dofs:
+            memo['_cache'] = {}
+            memo['_cache_key'] = self.obj.element_dofs
+        cache = memo['_cache']
+        if key not in cache:
+            value = fun()
+            value.flags.writeable = False
+            cache[key] = value
+        return cache[key]
+
+    def flatten(self) -> ndarray:
+        """Return all DOF indices as a single sorted array."""
+        return self._cached('flatten', self._flatten)
+
+    def _flatten(self):
         return np.unique(
             np.concatenate((
                 (self.obj
@@ -39,6 +67,23 @@ class DofsView(NamedTuple):
             ))
         )
 
+    @property
+    def mask(self) -> ndarray:
+        """Return a boolean array of length `N` marking the DOF's."""
+        def fun():
+            mask = np.zeros(self.obj.N, dtype=np.bool_)
+            mask[self.flatten()] = True
+            return mask
+        return self._cached('mask', fun)
+
+    def _all_rows(self):
+        return all(np.arange(dofs.shape[0])[rows].size == dofs.shape[0]
+                   for dofs, rows in ((self.obj.nodal_dofs, self.nodal_rows),
+                                      (self.obj.facet_dofs, self.facet_rows),
+                                      (self.obj.edge_dofs, self.edge_rows),
+                                      (self.obj.interior_dofs,
+                                       self.interior_rows)))
+
     def _intersect(self, a, b):
         if isinstance(a, slice):
             if a.start == 0:
@@ -104,10 +149,15 @@ class DofsView(NamedTuple):
     def all(self, key=None):
         if key is None:
             return self.flatten()
-        return self.keep(key).flatten()
+        if isinstance(key, str):
+            key = [key]
+        return self._cached(('all',) + tuple(key),
+                            lambda: self.keep(key).flatten())
 
-    def __array__(self):
-        return self.flatten()
+    def __array__(self, dtype=None):
+        if dtype is None:
+            return self.flatten()
+        return self.flatten().astype(dtype)
 
     @property
     def nodal(self):
@@ -140,17 +190,25 @@ class DofsView(NamedTuple):
                              rows=self.interior_rows)
 
     def __getattr__(self, attr):
+        if attr.startswith('__') or attr in ('_cache', '_cache_key'):
+            raise AttributeError(attr)
         return getattr(self.obj, attr)
 
     def __or__(self, other):
         """For merging two sets of DOF's."""
-        return DofsView(
+        view = DofsView(
             self.obj,
             np.union1d(self.nodal_ix, other.nodal_ix),
             np.union1d(self.facet_ix, other.facet_ix),
             np.union1d(self.edge_ix, other.edge_ix),
             np.union1d(self.interior_ix, other.interior_ix)
         )
+        if self._all_rows() and other._all_rows():
+            # merge via the boolean masks instead of sorting
+            mask = self.mask | other.mask
+            view._cached('mask', lambda: mask)
+            view._cached('flatten', lambda: np.nonzero(mask)[0])
+        return view
 
     def __add__(self, other):
         return self.__or__(other)
@@ -160,9 +218,9 @@ class Dofs:
     """An object containing a set of degree-of-freedom indices."""
 
     nodal_dofs: ndarray = None
-    facet_dofs: ndarray = None
-    edge_dofs: ndarray = None
     interior_dofs: ndarray = None
+    _facet_dofs: ndarray = None
+    _edge_dofs: ndarray = None
 
     element_dofs: ndarray = None
     N: int = 0
@@ -175,70 +233,161 @@ class Dofs:
         self.topo = topo
         self.element = element
 
+        # the facets and the edges are found only if the element has DOFs
+        # on them, e.g., not for ElementTriP1
+        nedges = (topo.nedges
+                  if element.dim == 3 and element.edge_dofs > 0 else 0)
+        nfacets = (topo.nfacets
+                   if element.dim >= 2 and element.facet_dofs > 0 else 0)
+
+        # use compact indices if the mesh does and the total count fits
+        dtype = topo._index_dtype(element.nodal_dofs * topo.nvertices
+                                  + element.edge_dofs * nedges
+                                  + element.facet_dofs * nfacets
+                                  + element.interior_dofs * topo.nelements)
+
         self.nodal_dofs = np.reshape(
-            np.arange(element.nodal_dofs * topo.nvertices, dtype=np.int64),
+            np.arange(element.nodal_dofs * topo.nvertices, dtype=dtype),
             (element.nodal_dofs, topo.nvertices),
             order='F')
         offset = element.nodal_dofs * topo.nvertices
 
         # edge dofs
-        if element.dim == 3:
+        if nedges > 0:
             self.edge_dofs = np.reshape(
-                np.arange(element.edge_dofs * topo.nedges,
-                          dtype=np.int64),
-                (element.edge_dofs, topo.nedges),
+                np.arange(element.edge_dofs * nedges,
+                          dtype=dtype),
+                (element.edge_dofs, nedges),
                 order='F') + offset
-            offset += element.edge_dofs * topo.nedges
-        else:
-            self.edge_dofs = np.empty((0, 0), dtype=np.int64)
+            offset += element.edge_dofs * nedges
+        elif element.dim < 3:
+            self.edge_dofs = np.empty((0, 0), dtype=dtype)
 
         # facet dofs
-        self.facet_dofs = np.reshape(
-            np.arange(element.facet_dofs * topo.nfacets,
-                      dtype=np.int64),
-            (element.facet_dofs, topo.nfacets),
-            order='F') + offset
-        offset += element.facet_dofs * topo.nfacets
+        if nfacets > 0:
+            self.facet_dofs = np.reshape(
+                np.arange(element.facet_dofs * nfacets,
+                          dtype=dtype),
+                (element.facet_dofs, nfacets),
+                order='F') + offset
+            offset += element.facet_dofs * nfacets
 
         # interior dofs
         self.interior_dofs = np.reshape(
-            np.arange(element.interior_dofs * topo.nelements, dtype=np.int64),
+            np.arange(element.interior_dofs * topo.nelements, dtype=dtype),
             (element.interior_dofs, topo.nelements),
             order='F') + offset
 
-        # global numbering
-        self.element_dofs = np.zeros((0, topo.nelements), dtype=np.int64)
-
-        # nodal dofs
-        for itr in range(topo.t.shape[0]):
-            self.element_dofs = np.vstack((
-                self.element_dofs,
-                self.nodal_dofs[:, topo.t[itr]]
-            ))
-
-        # edge dofs
-        if element.dim == 3:
-            for itr in range(topo.t2e.shape[0]):
-                self.element_dofs = np.vstack((
-                    self.element_dofs,
-                    self.edge_dofs[:, topo.t2e[itr]]
-                ))
-
-        # facet dofs
-        if element.dim >= 2:
-            for itr in range(topo.t2f.shape[0]):
-                self.element_dofs = np.vstack((
-                    self.element_dofs,
-                    self.facet_dofs[:, topo.t2f[itr]]
-                ))
+        # global numbering: gather the DOFs of each entity type into
+        # consecutive row blocks of a preallocated array
+        blocks = [(self.nodal_dofs, topo.t)]
+        if nedges > 0:
+            blocks.append((self.edge_dofs, topo.t2e))
+        if nfacets > 0:
+            blocks.append((self.facet_dofs, topo.t2f))
+
+        nrows = (sum(dofs.shape[0] * ix.shape[0] for dofs, ix in blocks)
+                 + self.interior_dofs.shape[0])
+        self.element_dofs = np.empty((nrows, topo.nelements), dtype=dtype)
+
+        row = 0
+        for dofs, ix in blocks:
+            n = dofs.shape[0] * ix.shape[0]
+            # entity-major ordering: all DOFs of the first vertex, then
+            # all DOFs of the second vertex, etc.
+            self.element_dofs[row:(row + n)] = (dofs[:, ix]
+                                                .transpose((1, 0, 2))
+                                                .reshape(n, topo.nelements))
+            row += n
 
         # interior dofs
-        self.element_dofs = np.vstack((self.element_dofs,
-                                       self.interior_dofs))
+        self.element_dofs[row:] = self.interior_dofs
 
         # total dofs
         self.N = np.max(self.element_dofs) + 1
 
+    @property
+    def facet_dofs(self) -> ndarray:
+        if self._facet_dofs is None:
+            self._facet_dofs = np.empty((0, self.topo.nfacets),
+                                        dtype=self.element_dofs.dtype)
+        return self._facet_dofs
+
+    @facet_dofs.setter
+    def facet_dofs(self, value: ndarray):
+        self._facet_dofs = value
+
+    @property
+    def edge_dofs(self) -> ndarray:
+        if self._edge_dofs is None:
+            self._edge_dofs = np.empty((0, self.topo.nedges),
+                                       dtype=self.element_dofs.dtype)
+        return self._edge_dofs
+
+    @edge_dofs.setter
+    def edge_dofs(self, value: ndarray):
+        self._edge_dofs = value
+
+    def _graph(self) -> csr_matrix:
+        """Return the adjacency matrix of the DOF graph."""
+        nbfun, nelems = self.element_dofs.shape
+        E = coo_matrix((np.ones(nbfun * nelems),
+                        (self.element_dofs.flatten(),
+                         np.tile(np.arange(nelems), nbfun))),
+                       shape=(self.N, nelems)).tocsr()
+        return (E @ E.T).tocsr()
+
+    def renumber(self,
+                 strategy: Union[str, ndarray] = 'rcm',
+                 doflocs: ndarray = None) -> ndarray:
+        """Renumber the degrees-of-freedom in place.
+
+        Parameters
+        ----------
+        strategy
+            The string 'rcm' for reverse Cuthill-McKee ordering of the DOF
+            graph, the string 'sfc' for ordering the DOF locations along a
+            space-filling curve, or an explicit permutation.
+        doflocs
+            The DOF locations (dim x N).  Required by the strategy 'sfc'.
+
+        Returns
+        -------
+        ndarray
+            The permutation `p`, i.e. a vector `x` in the old numbering
+            corresponds to `x[p]` in the new numbering.
+
+        """
+        if isinstance(strategy, ndarray):
+            perm = strategy
+        elif strategy == 'rcm':
+            perm = reverse_cuthill_mckee(self._graph(), symmetric_mode=True)
+        elif strategy == 'sfc':
+            if doflocs is None:
+                raise ValueError("Strategy 'sfc' requires DOF locations.")
+            perm = morton_order(doflocs)
+        else:
+            raise ValueError("Unknown renumbering strategy '{}'; expected "
+                             "'rcm', 'sfc' or a permutation."
+                             .format(strategy))
+
+        if len(perm) != self.N:
+            raise ValueError("The permutation has wrong size.")
+
+        dtype = self.element_dofs.dtype
+        inv = np.empty(self.N, dtype=dtype)
+        inv[perm] = np.arange(self.N, dtype=dtype)
+
+        self.nodal_dofs = inv[self.nodal_dofs]
+        if self._facet_dofs is not None:
+            self.facet_dofs = inv[self.facet_dofs]
+        if self._edge_dofs is not None:
+            self.edge_dofs = inv[self.edge_dofs]
+        self.interior_dofs = inv[self.interior_dofs]
+        self.element_dofs = inv[self.element_dofs]
+
+        return perm.astype(dtype)
+
     def get_facet_dofs(self,
                        facets: ndarray,
                        skip_dofnames: List[str] = None) -> DofsView:
@@ -57,8 +57,10 @@ class BilinearForm(Form):
         # initialize COO data structures
         sz = u.Nbfun * v.Nbfun * nt
         data = np.zeros(sz)
-        rows = np.zeros(sz)
-        cols = np.zeros(sz)
+        dtype = np.result_type(u.dofs.element_dofs.dtype,
+                               v.dofs.element_dofs.dtype)
+        rows = np.zeros(sz, dtype=dtype)
+        cols = np.zeros(sz, dtype=dtype)
 
         # loop over the indices of local stiffness matrix
         for j in range(u.Nbfun):
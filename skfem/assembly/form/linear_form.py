@@ -30,13 +30,12 @@ class LinearForm(Form):
         # initialize COO data structures
         sz = v.Nbfun * nt
         data = np.zeros(sz)
-        rows = np.zeros(sz)
-        cols = np.zeros(sz)
+        rows = np.zeros(sz, dtype=v.dofs.element_dofs.dtype)
+        cols = np.zeros(sz, dtype=v.dofs.element_dofs.dtype)
 
         for i in range(v.Nbfun):
             ixs = slice(nt * i, nt * (i + 1))
             rows[ixs] = v.element_dofs[i]
-            cols[ixs] = np.zeros(nt)
             data[ixs] = self._kernel(v.basis[i], w, dx)
 
         return self._assemble_numpy_vector(data, rows, cols, (v.N, 1))
@@ -19,6 +19,31 @@ MESH_TYPE_MAPPING = OrderedDict([
 
 TYPE_MESH_MAPPING = {v: k for k, v in MESH_TYPE_MAPPING.items()}
 
+# the nodes of the linear and quadratic VTK cells on the reference elements
+VTK_NODES = OrderedDict([
+    ('line', [[0.], [1.]]),
+    ('line3', [[0.], [1.], [.5]]),
+    ('triangle', [[0., 0.], [1., 0.], [0., 1.]]),
+    ('triangle6', [[0., 0.], [1., 0.], [0., 1.],
+                   [.5, 0.], [.5, .5], [0., .5]]),
+    ('quad', [[0., 0.], [1., 0.], [1., 1.], [0., 1.]]),
+    ('quad8', [[0., 0.], [1., 0.], [1., 1.], [0., 1.],
+               [.5, 0.], [1., .5], [.5, 1.], [0., .5]]),
+    ('quad9', [[0., 0.], [1., 0.], [1., 1.], [0., 1.],
+               [.5, 0.], [1., .5], [.5, 1.], [0., .5], [.5, .5]]),
+    ('tetra', [[0., 0., 0.], [1., 0., 0.], [0., 1., 0.], [0., 0., 1.]]),
+    ('tetra10', [[0., 0., 0.], [1., 0., 0.], [0., 1., 0.], [0., 0., 1.],
+                 [.5, 0., 0.], [.5, .5, 0.], [0., .5, 0.],
+                 [0., 0., .5], [.5, 0., .5], [0., .5, .5]]),
+    ('hexahedron', [[0., 0., 0.], [1., 0., 0.], [1., 1., 0.], [0., 1., 0.],
+                    [0., 0., 1.], [1., 0., 1.], [1., 1., 1.], [0., 1., 1.]]),
+    ('hexahedron20', [[0., 0., 0.], [1., 0., 0.], [1., 1., 0.], [0., 1., 0.],
+                      [0., 0., 1.], [1., 0., 1.], [1., 1., 1.], [0., 1., 1.],
+                      [.5, 0., 0.], [1., .5, 0.], [.5, 1., 0.], [0., .5, 0.],
+                      [.5, 0., 1.], [1., .5, 1.], [.5, 1., 1.], [0., .5, 1.],
+                      [0., 0., .5], [1., 0., .5], [1., 1., .5], [0., 1., .5]]),
+])
+
 
 def from_meshio(m, force_mesh_type=None):
     """Convert meshio mesh into :class:`skfem.mesh.Mesh`.
@@ -73,72 +98,136 @@ def from_meshio(m, force_mesh_type=None):
             'hexahedron': 'quad',
         }[meshio_type]
 
-        def find_tagname(tag):
-            for key in m.field_data:
-                if m.field_data[key][0] == tag:
-                    return key
-            return None
+        # resolve the names of the physical tags once; the first name
+        # given to a tag is used, preferring the names of the same dimension
+        names = {}
+        for key, value in reversed(list(m.field_data.items())):
+            names[value[0]] = key
+            if len(value) > 1:
+                names[value[0], value[1]] = key
+
+        def tagname(tag, dim):
+            return names.get((tag, dim), names.get(tag))
+
+        dim = mtmp.dim()
 
         if m.cell_sets:  # MSH 4.1
+            cell_sets = m.cell_sets_dict
             subdomains = {k: v[meshio_type]
-                          for k, v in m.cell_sets_dict.items()
+                          for k, v in cell_sets.items()
                           if meshio_type in v}
-            facets = {k: [tuple(f) for f in
-                          np.sort(m.cells_dict[bnd_type][v[bnd_type]])]
-                      for k, v in m.cell_sets_dict.items()
-                      if bnd_type in v}
-            boundaries = {k: np.array([i for i, f in
-                                       enumerate(map(tuple, mtmp.facets.T))
-                                       if f in v])
-                          for k, v in facets.items()}
+            boundaries = {}
+            for k, v in cell_sets.items():
+                if bnd_type in v:
+                    ix = mtmp.find_facets(cells[bnd_type][v[bnd_type]].T)
+                    boundaries[k] = np.unique(ix[ix >= 0])
         else:  # MSH 2.2?
-            elements_tag = m.cell_data_dict['gmsh:physical'][meshio_type]
-            subdomains = {}
-            tags = np.unique(elements_tag)
-
-            for tag in tags:
-                t_set = np.nonzero(tag == elements_tag)[0]
-                subdomains[find_tagname(tag)] = t_set
+            physical = m.cell_data_dict['gmsh:physical']
+            subdomains = {tagname(tag, dim): t_set
+                          for tag, t_set
+                          in _group_by_tag(physical[meshio_type]).items()}
 
             # find tagged boundaries
-            if bnd_type in m.cell_data_dict['gmsh:physical']:
-                facets = m.cells_dict[bnd_type]
-                facets_tag = m.cell_data_dict['gmsh:physical'][bnd_type]
-
-            # put meshio facets to dict
-            dic = {tuple(np.sort(facets[i])): facets_tag[i]
-                   for i in range(facets.shape[0])}
-
-            # get index of corresponding Mesh.facets for each meshio
-            # facet found in the dict
-            index = np.array([[dic[tuple(np.sort(mtmp.facets[:, i]))], i]
-                              for i in mtmp.boundary_facets()
-                              if tuple(np.sort(mtmp.facets[:, i])) in dic])
-
-            # read meshio tag numbers and names
-            tags = index[:, 0]
             boundaries = {}
-            for tag in np.unique(tags):
-                tagindex = np.nonzero(tags == tag)[0]
-                boundaries[find_tagname(tag)] = index[tagindex, 1]
+            if bnd_type in physical:
+                facets = cells[bnd_type]
+                facets_tag = physical[bnd_type]
+
+                # get index of corresponding Mesh.facets for each meshio
+                # facet on the boundary
+                ix = mtmp.find_facets(facets.T)
+                boundary = np.zeros(mtmp.facets.shape[1], dtype=np.bool_)
+                boundary[mtmp.boundary_facets()] = True
+                found = (ix >= 0) & boundary[ix]
+                ix, first = np.unique(ix[found], return_index=True)
+
+                boundaries = {tagname(tag, dim - 1): f_set
+                              for tag, f_set
+                              in _group_by_tag(facets_tag[found][first],
+                                               ix).items()}
 
         mtmp.boundaries = boundaries
         mtmp.subdomains = subdomains
 
-    except Exception:
+    except KeyError:
+        # no physical tags for the cells
         warnings.warn("Unable to load tagged boundaries/subdomains.")
 
     return mtmp
 
 
+def _group_by_tag(tags, values=None):
+    """Split the values (default: indices) by the tags using a single
+    sort."""
+    if values is None:
+        values = np.arange(len(tags))
+    order = np.argsort(tags, kind='stable')
+    keys, starts = np.unique(tags[order], return_index=True)
+    return dict(zip(keys, np.split(values[order], starts[1:])))
+
+
 def from_file(filename):
     return from_meshio(meshio.read(filename))
 
 
 def to_meshio(mesh, point_data=None):
-    cells = {TYPE_MESH_MAPPING[type(mesh)]: mesh.t.T}
+    t = (mesh.t[[0, 3, 6, 2, 1, 5, 7, 4]]
+         if isinstance(mesh, skfem.MeshHex)
+         # vtk requires a different ordering
+         else mesh.t)
+    cells = {TYPE_MESH_MAPPING[type(mesh)]: t.T}
     return meshio.Mesh(mesh.p.T, cells, point_data)
 
 
 def to_file(mesh, filename, point_data=None, **kwargs):
     meshio.write(filename, to_meshio(mesh, point_data), **kwargs)
+
+
+def _lagrange_cells(elem):
+    """Find the VTK cell type and the order of the DOFs of a Lagrange
+    element by comparing the DOF locations to the nodes of the cells."""
+    if (not isinstance(elem, skfem.element.ElementH1)
+            or any(name != 'u' for name in elem.dofnames)):
+        raise ValueError("Only scalar Lagrange elements are supported.")
+    X = elem.doflocs
+    for cell_type, nodes in VTK_NODES.items():
+        nodes = np.array(nodes)
+        if nodes.shape != X.shape:
+            continue
+        match = np.isclose(nodes[:, None], X[None]).all(axis=2)
+        if (match.sum(axis=0) == 1).all() and (match.sum(axis=1) == 1).all():
+            return cell_type, np.argmax(match, axis=1)
+    raise ValueError("The element has no corresponding VTK cell.")
+
+
+def basis_to_meshio(basis, point_data=None, cell_data=None):
+    """Convert a Lagrange basis into a meshio mesh with one point per DOF.
+
+    The DOF locations become the points and the element DOFs become linear
+    or quadratic cells, e.g., `triangle6` for
+    :class:`~skfem.element.ElementTriP2`.  Hence, the point data are
+    vectors of DOF values and no refinement is needed for visualizing them.
+
+    Parameters
+    ----------
+    basis
+        An :class:`~skfem.assembly.InteriorBasis` of a scalar Lagrange
+        element of order one or two.
+    point_data
+        A dictionary of solution vectors.
+    cell_data
+        A dictionary of arrays with one value per element.
+
+    """
+    cell_type, order = _lagrange_cells(basis.elem)
+    cells = {cell_type: basis.element_dofs[order].T}
+    if cell_data is not None:
+        cell_data = {k: [v] for k, v in cell_data.items()}
+    return meshio.Mesh(basis.doflocs.T, cells, point_data, cell_data)
+
+
+def basis_to_file(basis, filename, point_data=None, cell_data=None,
+                  **kwargs):
+    meshio.write(filename,
+                 basis_to_meshio(basis, point_data, cell_data),
+                 **kwargs)
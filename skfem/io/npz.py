@@ -0,0 +1,154 @@
+"""Save and load meshes as raw NumPy arrays.
+
+The mesh is written either to a `.npz` archive or to a directory of `.npy`
+files.  Besides the vertices and the elements, the connectivity arrays
+(`facets`, `t2f`, `f2t` and, in 3D, `edges` and `t2e`), the named
+boundaries and subdomains are stored so that nothing needs to be rebuilt
+on load.  The arrays of a directory are memory-mapped by default, which
+makes opening a large mesh instantaneous and lets several processes share
+the arrays through the page cache.
+
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Type, Union
+
+import numpy as np
+from numpy import ndarray
+
+from skfem.mesh import Mesh, MeshTri
+from skfem.mesh.topology import Connectivity
+
+
+FORMAT_VERSION = 1
+
+
+def _mesh_types() -> Dict[str, Type[Mesh]]:
+    """Find the mesh classes by their names."""
+    types = {}
+    stack = [Mesh]
+    while stack:
+        cls = stack.pop()
+        types[cls.__name__] = cls
+        stack.extend(cls.__subclasses__())
+    return types
+
+
+def _connectivity_names(mesh_type: Type[Mesh]):
+    return sorted({name for cls in mesh_type.__mro__
+                   for name, attr in vars(cls).items()
+                   if isinstance(attr, Connectivity)})
+
+
+def to_file(mesh: Mesh,
+            filename: Union[str, Path],
+            connectivity: bool = True) -> None:
+    """Save the mesh to a `.npz` archive or to a directory.
+
+    Parameters
+    ----------
+    mesh
+        The mesh to save.
+    filename
+        If the suffix is `.npz`, an uncompressed archive is written.
+        Otherwise, a directory is created containing a file `header.json`
+        and one `.npy` file per array.
+    connectivity
+        If `True`, the connectivity arrays are saved, building them if
+        necessary.
+
+    """
+    arrays = {'p': mesh.p, 't': mesh.t}
+    header = {
+        'format': 'skfem',
+        'version': FORMAT_VERSION,
+        'type': type(mesh).__name__,
+        'connectivity': [],
+        'boundaries': {},
+        'subdomains': {},
+        'midpoints': [],
+    }
+
+    if connectivity:
+        for name in _connectivity_names(type(mesh)):
+            arrays[name] = getattr(mesh, name)
+            header['connectivity'].append(name)
+
+    # names may contain any characters, so the arrays are numbered
+    for key in ('boundaries', 'subdomains'):
+        for itr, (name, ix) in enumerate((getattr(mesh, key) or {}).items()):
+            header[key][name] = '{}_{}'.format(key, itr)
+            arrays['{}_{}'.format(key, itr)] = np.asarray(ix)
+
+    for k, R in (mesh._midpoints or {}).items():
+        header['midpoints'].append(int(k))
+        arrays['midpoints_{}'.format(k)] = R
+
+    path = Path(filename)
+    if path.suffix == '.npz':
+        np.savez(path, header=np.array(json.dumps(header)), **arrays)
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(path / (name + '.npy'), np.ascontiguousarray(array))
+        with open(path / 'header.json', 'w') as handle:
+            json.dump(header, handle)
+
+
+def from_file(filename: Union[str, Path],
+              mmap_mode: Optional[str] = 'r') -> Mesh:
+    """Load a mesh saved by :func:`~skfem.io.npz.to_file`.
+
+    Parameters
+    ----------
+    filename
+        The `.npz` archive or the directory.
+    mmap_mode
+        Passed to :func:`numpy.load` when loading from a directory.  By
+        default, the arrays are memory-mapped read-only; use `'c'` for
+        copy-on-write arrays, e.g., for moving the vertices, or `None` to
+        read the arrays into memory.  Archives are always read into memory.
+
+    """
+    path = Path(filename)
+    if path.is_dir():
+        with open(path / 'header.json', 'r') as handle:
+            header = json.load(handle)
+
+        def load(name: str) -> ndarray:
+            return np.load(path / (name + '.npy'), mmap_mode=mmap_mode)
+    else:
+        with np.load(path) as data:
+            arrays = dict(data)
+        header = json.loads(str(arrays.pop('header')))
+
+        def load(name: str) -> ndarray:
+            return arrays[name]
+
+    if header.get('format') != 'skfem':
+        raise ValueError("The file is not a mesh saved by skfem.")
+    if header['version'] > FORMAT_VERSION:
+        raise ValueError("The file format version {} is not supported."
+                         .format(header['version']))
+
+    mesh_type = _mesh_types()[header['type']]
+    kwargs = {'validate': False}
+    if issubclass(mesh_type, MeshTri):
+        # the stored connectivity refers to the stored order
+        kwargs['sort_t'] = False
+    mesh = mesh_type(load('p'), load('t'), **kwargs)
+
+    if header['boundaries']:
+        mesh.boundaries = {name: load(key)
+                           for name, key in header['boundaries'].items()}
+    if header['subdomains']:
+        mesh.subdomains = {name: load(key)
+                           for name, key in header['subdomains'].items()}
+    if header['midpoints']:
+        mesh._midpoints = {k: load('midpoints_{}'.format(k))
+                           for k in header['midpoints']}
+    for name in header['connectivity']:
+        setattr(mesh, name, load(name))
+
+    return mesh
@@ -0,0 +1,172 @@
+"""Write and read fields on a fixed mesh at a sequence of times."""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from skfem.mesh import Mesh
+from .npz import from_file as mesh_from_file, to_file as mesh_to_file
+
+
+class TimeSeriesWriter:
+    """Write fields on a fixed mesh at a sequence of times.
+
+    The mesh is written once when the writer is opened and only the fields
+    are appended at each time step:
+
+    >>> from skfem import MeshTri
+    >>> from tempfile import TemporaryDirectory
+    >>> m = MeshTri()
+    >>> with TemporaryDirectory() as d:
+    ...     with TimeSeriesWriter(m, d + '/heat') as writer:
+    ...         for t in [0., .1, .2]:
+    ...             writer.write(t, point_data={'u': t * m.p[0]})
+    ...     mesh, steps = read_time_series(d + '/heat', mmap_mode=None)
+    >>> [t for t, _, _ in steps]
+    [0.0, 0.1, 0.2]
+
+    If the filename has the suffix `.xdmf`, the fields are written to XDMF
+    and HDF5 files using :class:`meshio.xdmf.TimeSeriesWriter`, which
+    requires `h5py`.  Otherwise, a directory is created which contains the
+    mesh in the format of :mod:`skfem.io.npz`, one `.npy` file per field and
+    time step, and an index `series.json`.  The index is replaced after each
+    time step so that the steps written so far can be read even if the
+    writer is never closed, e.g. after a crash.  The directory is read by
+    :func:`~skfem.io.time_series.read_time_series`.
+
+    """
+
+    def __init__(self, mesh: Mesh, filename: Union[str, Path]):
+        self.mesh = mesh
+        self.filename = Path(filename)
+        self.times: List[float] = []
+        self._names: Dict[str, Dict[str, str]] = {'point_data': {},
+                                                  'cell_data': {}}
+        self._steps: List[Dict[str, List[str]]] = []
+        self._writer = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        """Write the mesh."""
+        if self.filename.suffix == '.xdmf':
+            from meshio.xdmf import TimeSeriesWriter as XdmfWriter
+            from .meshio import to_meshio
+            self._writer = XdmfWriter(str(self.filename)).__enter__()
+            m = to_meshio(self.mesh)
+            self._writer.write_points_cells(m.points, m.cells)
+        else:
+            self.filename.mkdir(parents=True, exist_ok=True)
+            mesh_to_file(self.mesh, self.filename / 'mesh',
+                         connectivity=False)
+            self._write_index()
+        return self
+
+    def _write_index(self) -> None:
+        """Replace the index atomically so that it is never partial."""
+        tmp = self.filename / 'series.json.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump({'times': self.times,
+                       'names': self._names,
+                       'steps': self._steps}, handle)
+        os.replace(tmp, self.filename / 'series.json')
+
+    def write(self,
+              t: float,
+              point_data: Optional[Dict[str, ndarray]] = None,
+              cell_data: Optional[Dict[str, ndarray]] = None) -> None:
+        """Append the fields at time `t`.
+
+        Parameters
+        ----------
+        t
+            The time.
+        point_data
+            Arrays with one value (or row) per vertex.
+        cell_data
+            Arrays with one value (or row) per element.
+
+        """
+        point_data = point_data or {}
+        cell_data = cell_data or {}
+        if self._writer is not None:
+            self._writer.write_data(
+                t,
+                point_data=point_data,
+                cell_data={k: [v] for k, v in cell_data.items()},
+            )
+        else:
+            step = {}
+            for kind, data in [('point_data', point_data),
+                               ('cell_data', cell_data)]:
+                names = self._names[kind]
+                for name, values in data.items():
+                    # names may contain any characters, so they are numbered
+                    key = names.setdefault(name, '{}_{}'.format(
+                        kind.split('_')[0], len(names)))
+                    np.save(self.filename / '{}_{:06d}.npy'
+                            .format(key, len(self.times)),
+                            np.asarray(values))
+                step[kind] = list(data)
+            self._steps.append(step)
+        self.times.append(float(t))
+        if self._writer is None:
+            self._write_index()
+
+    def close(self) -> None:
+        """Finish writing."""
+        if self._writer is not None:
+            self._writer.__exit__(None, None, None)
+            self._writer = None
+
+
+def read_time_series(dirname: Union[str, Path],
+                     mmap_mode: Optional[str] = 'r'
+                     ) -> Tuple[Mesh, List[Tuple[float,
+                                                 Dict[str, ndarray],
+                                                 Dict[str, ndarray]]]]:
+    """Read a directory written by
+    :class:`~skfem.io.time_series.TimeSeriesWriter`.
+
+    Parameters
+    ----------
+    dirname
+        The directory.
+    mmap_mode
+        Passed to :func:`numpy.load`.  By default, the arrays are
+        memory-mapped read-only.
+
+    Returns
+    -------
+    Mesh
+        The mesh.
+    list
+        The tuples `(t, point_data, cell_data)` for each time step.
+
+    """
+    path = Path(dirname)
+    with open(path / 'series.json', 'r') as handle:
+        index = json.load(handle)
+
+    def load(kind, name, itr):
+        return np.load(path / '{}_{:06d}.npy'
+                       .format(index['names'][kind][name], itr),
+                       mmap_mode=mmap_mode)
+
+    steps = [(t,
+              {name: load('point_data', name, itr)
+               for name in step['point_data']},
+              {name: load('cell_data', name, itr)
+               for name in step['cell_data']})
+             for itr, (t, step) in enumerate(zip(index['times'],
+                                                 index['steps']))]
+
+    return mesh_from_file(path / 'mesh', mmap_mode=mmap_mode), steps
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 from numpy import ndarray
 
 
@@ -46,6 +47,31 @@ class Mapping():
         """
         raise NotImplementedError
 
+    def try_invF(self,
+                 x: ndarray,
+                 tind: Optional[ndarray] = None) -> Tuple[ndarray, ndarray]:
+        """Perform the inverse mapping where it can be found.
+
+        Parameters
+        ----------
+        x
+            The global points (Ndim x Nelems x Nqp).
+        tind
+            A set of element indices to map from
+
+        Returns
+        -------
+        ndarray
+            The corresponding local points (Ndim x Nelems x Nqp).
+        ndarray
+            A boolean array (Nelems) which is `False` for the elements whose
+            local points were not found, e.g., if an iteration did not
+            converge.
+
+        """
+        X = self.invF(x, tind=tind)
+        return X, np.ones(X.shape[1], dtype=np.bool_)
+
     def G(self,
           X: ndarray,
           find: Optional[ndarray] = None) -> ndarray:
@@ -111,3 +137,13 @@ class Mapping():
               tind: Optional[ndarray] = None):
         """The determinant of the jacobian of F."""
         raise NotImplementedError
+
+    def update(self) -> None:
+        """Recompute the quantities that depend on the vertex locations.
+
+        Called after the vertices of the mesh have been moved in place.
+        Mappings that evaluate the vertex locations on demand need not
+        override this.
+
+        """
+        pass
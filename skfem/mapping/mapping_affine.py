@@ -7,6 +7,12 @@ class MappingAffine(Mapping):
     """An affine mapping for simplical elements."""
 
     def __init__(self, mesh):
+        self.mesh = mesh  # this is required in ElementH2
+        self.update()
+
+    def update(self):
+        """Recompute the affine maps after the mesh vertices have moved."""
+        mesh = self.mesh
         dim = mesh.p.shape[0]
 
         if mesh.t.shape[0] > 0:
@@ -68,35 +74,56 @@ class MappingAffine(Mapping):
             else:
                 raise Exception("Not implemented for the given dimension.")
 
-        if hasattr(mesh, 'facets'):
+        # the boundary mapping is initialized on first use so that the
+        # facets are not found unless needed
+        self._boundary = None
+
+        self.dim = dim
+
+    def _boundary_mapping(self):
+        """Return the affine maps of the facets."""
+        if self._boundary is None:
+            mesh = self.mesh
+            dim = self.dim
             nf = mesh.facets.shape[1]
-            # initialize the boundary mapping
-            self.B = np.empty((dim, dim - 1, nf))
-            self.c = np.empty((dim, nf))
+            B = np.empty((dim, dim - 1, nf))
+            c = np.empty((dim, nf))
 
             for i in range(dim):
-                self.c[i] = mesh.p[i, mesh.facets[0, :]]
+                c[i] = mesh.p[i, mesh.facets[0, :]]
                 for j in range(dim-1):
-                    self.B[i, j] = (mesh.p[i, mesh.facets[j + 1, :]] -
-                                    mesh.p[i, mesh.facets[0, :]])
+                    B[i, j] = (mesh.p[i, mesh.facets[j + 1, :]] -
+                               mesh.p[i, mesh.facets[0, :]])
 
             # area scaling
             if dim == 1:
-                self.detB = np.ones(nf)
+                detB = np.ones(nf)
             elif dim == 2:
-                self.detB = np.sqrt(self.B[0, 0]**2 + self.B[1, 0]**2)
+                detB = np.sqrt(B[0, 0]**2 + B[1, 0]**2)
             elif dim == 3:
-                self.detB = np.sqrt((self.B[1, 0]*self.B[2, 1] -
-                                     self.B[2, 0]*self.B[1, 1])**2 +
-                                    (-self.B[0, 0]*self.B[2, 1] +
-                                     self.B[2, 0]*self.B[0, 1])**2 +
-                                    (self.B[0, 0]*self.B[1, 1] -
-                                     self.B[1, 0]*self.B[0, 1])**2)
+                detB = np.sqrt((B[1, 0]*B[2, 1] -
+                                B[2, 0]*B[1, 1])**2 +
+                               (-B[0, 0]*B[2, 1] +
+                                B[2, 0]*B[0, 1])**2 +
+                               (B[0, 0]*B[1, 1] -
+                                B[1, 0]*B[0, 1])**2)
             else:
                 raise Exception("Not implemented for the given dimension.")
 
-        self.dim = dim
-        self.mesh = mesh  # this is required in ElementH2
+            self._boundary = B, c, detB
+        return self._boundary
+
+    @property
+    def B(self):
+        return self._boundary_mapping()[0]
+
+    @property
+    def c(self):
+        return self._boundary_mapping()[1]
+
+    @property
+    def detB(self):
+        return self._boundary_mapping()[2]
 
     def F(self, X, tind=None):
         if tind is None:
@@ -43,7 +43,6 @@ class MappingIsoparametric(Mapping):
         """
         p = mesh.p
         t = mesh.t
-        facets = mesh.facets
 
         def map(i, X, tind=None):
             if tind is None:
@@ -74,6 +73,7 @@ class MappingIsoparametric(Mapping):
                 return out
 
         def bndmap(i, X, find=None):
+            facets = mesh.facets
             if find is None:
                 out = np.zeros((facets.shape[1], X.shape[1]))
                 for itr in range(facets.shape[0]):
@@ -88,6 +88,7 @@ class MappingIsoparametric(Mapping):
                 return out
 
         def bndJ(i, j, X, find=None):
+            facets = mesh.facets
             if find is None:
                 out = np.zeros((facets.shape[1], X.shape[1]))
                 for itr in range(facets.shape[0]):
@@ -131,16 +132,36 @@ class MappingIsoparametric(Mapping):
 
     def invF(self, x, tind=None, newton_max_iters=50, newton_tol=1e-8):
         """Newton iteration for evaluating inverse isoparametric mapping."""
+        X, converged = self.try_invF(x, tind, newton_max_iters, newton_tol)
+        if not converged.all():
+            raise Exception(("Newton iteration didn't converge "
+                             "up to TOL={}".format(newton_tol)))
+        return X
+
+    def try_invF(self, x, tind=None, newton_max_iters=50, newton_tol=1e-8):
+        """Newton iteration for each element separately.
+
+        The elements whose iteration has converged are not iterated
+        further.
+
+        """
+        if tind is None:
+            tind = np.arange(self.mesh.t.shape[1])
         X = np.zeros(x.shape) + .5
+        converged = np.zeros(x.shape[1], dtype=np.bool_)
+        active = np.arange(x.shape[1])
         for _ in range(newton_max_iters):
-            F = self.F(X, tind)
-            invDF = self.invDF(X, tind)
-            dX = np.einsum('ijkl,jkl->ikl', invDF, x - F)
-            X = X + dX
-            if (np.linalg.norm(dX, 1, (0, 2)) < newton_tol).all():
-                return X
-        raise Exception(("Newton iteration didn't converge "
-                         "up to TOL={}".format(newton_tol)))
+            Xa = X[:, active]
+            F = self.F(Xa, tind[active])
+            invDF = self.invDF(Xa, tind[active])
+            dX = np.einsum('ijkl,jkl->ikl', invDF, x[:, active] - F)
+            X[:, active] = Xa + dX
+            done = np.linalg.norm(dX, 1, (0, 2)) < newton_tol
+            converged[active[done]] = True
+            active = active[~done]
+            if len(active) == 0:
+                break
+        return X, converged
 
     def F(self, X, tind=None):
         return np.array([self.map(i, X, tind) for i in range(X.shape[0])])
@@ -172,6 +172,10 @@ class MappingMortar(Mapping):
                    map_super,
                    normals)
 
+    def update(self):
+        raise NotImplementedError("Mortar mappings must be recreated "
+                                  "after the meshes have moved.")
+
     def F(self, X, tind=None):
         return self.maps[self.side].F(X, tind=tind)
 
@@ -37,6 +37,8 @@ from .mesh import Mesh, MeshType
 from .mesh_line import MeshLine
 from .mesh2d import Mesh2D, MeshTri, MeshQuad
 from .mesh3d import Mesh3D, MeshTet, MeshHex
+from .hierarchy import MeshHierarchy
+from .partition import MeshPartition
 
 
 __all__ = [
@@ -48,4 +50,6 @@ __all__ = [
     "MeshQuad",
     "Mesh3D",
     "MeshTet",
-    "MeshHex"]
+    "MeshHex",
+    "MeshHierarchy",
+    "MeshPartition"]
@@ -0,0 +1,151 @@
+"""Locate the elements containing given points."""
+
+import numpy as np
+from numpy import ndarray
+
+
+def inside(refdom: str, X: ndarray, tol: float = 1e-10) -> ndarray:
+    """Check which points (dim x N) are inside the reference element."""
+    if refdom in ('line', 'quad', 'hex'):
+        return ((X > -tol) & (X < 1. + tol)).all(axis=0)
+    return (X > -tol).all(axis=0) & (X.sum(axis=0) < 1. + tol)
+
+
+class ElementFinder:
+    """Find the elements containing given points.
+
+    The bounding boxes of the elements are sorted into a uniform grid of
+    buckets whose size is the average size of the bounding boxes.  A query
+    point is compared only to the elements overlapping its bucket: the
+    candidates are first filtered by their bounding boxes and then the point
+    is mapped to the reference element using the inverse mapping.  All
+    points are processed simultaneously so the cost per point is small even
+    for millions of points.  The buckets are built once and reused by all
+    queries:
+
+    >>> from skfem import MeshTet
+    >>> m = MeshTet()
+    >>> m.refine(2)
+    >>> finder = m.element_finder()
+    >>> tind = finder(np.array([.1, .5, 2.]),
+    ...               np.array([.2, .5, 0.]),
+    ...               np.array([.3, .5, 0.]))
+    >>> tind[2]
+    -1
+    >>> bool((m.p[:, m.t[:, tind[0]]].min(axis=1) <= [.1, .2, .3]).all())
+    True
+
+    Points on the boundary of several elements are assigned to the one with
+    the smallest index.  Points outside of the mesh get the index -1.
+
+    """
+
+    def __init__(self, mesh, mapping=None, tol: float = 1e-10):
+        """Build the buckets.
+
+        Parameters
+        ----------
+        mesh
+            The mesh.
+        mapping
+            The mapping used for inverting the points.  By default,
+            :meth:`~skfem.mesh.Mesh.mapping` of the mesh.
+        tol
+            The relative tolerance of the point location.
+
+        """
+        self.mesh = mesh
+        self.mapping = mesh.mapping() if mapping is None else mapping
+        self.tol = tol
+
+        x = mesh.p[:, mesh.t]
+        self.lo = x.min(axis=1)
+        self.hi = x.max(axis=1)
+        nelems = mesh.t.shape[1]
+        self.origin = self.lo.min(axis=1)
+        extent = self.hi.max(axis=1) - self.origin
+        self.atol = tol * max(extent.max(initial=0.), 1.)
+
+        size = (self.hi - self.lo).mean(axis=1)
+        size[size == 0.] = 1.
+        shape = np.maximum(np.ceil(extent / size), 1)
+        # limit the number of empty buckets in very non-uniform meshes
+        while np.prod(shape) > 8 * nelems:
+            shape = np.maximum(np.ceil(shape / 2), 1)
+        self.shape = shape.astype(np.int64)
+        self.size = np.where(extent > 0., extent, 1.) / self.shape
+
+        # enumerate the buckets overlapped by each element
+        first = self._bucket(self.lo)
+        span = self._bucket(self.hi) - first + 1
+        count = np.prod(span, axis=0)
+        elems = np.repeat(np.arange(nelems), count)
+        local = (np.arange(count.sum())
+                 - np.repeat(np.cumsum(count) - count, count))
+        index = np.empty((len(self.shape), len(elems)), dtype=np.int64)
+        for d in range(len(self.shape)):
+            index[d] = first[d, elems] + local % span[d, elems]
+            local //= span[d, elems]
+        buckets = np.ravel_multi_index(index, self.shape)
+
+        order = np.argsort(buckets, kind='stable')
+        self.elements = elems[order]
+        self.offsets = np.searchsorted(buckets[order],
+                                       np.arange(np.prod(self.shape) + 1))
+
+    def _bucket(self, x: ndarray) -> ndarray:
+        """Return the multi-index of the bucket containing each point."""
+        ix = np.floor((x - self.origin[:, None]) / self.size[:, None])
+        return np.clip(ix, 0, self.shape[:, None] - 1).astype(np.int64)
+
+    def _invF(self, x: ndarray, tind: ndarray) -> ndarray:
+        """Map the points to the reference element.
+
+        Newton iteration for a nonlinear mapping may fail to converge for a
+        point far outside of the element.  Such points are returned as NaN
+        so that they are outside of the reference element.
+
+        """
+        with np.errstate(all='ignore'):
+            X, converged = self.mapping.try_invF(x[:, :, None], tind=tind)
+        X = X[:, :, 0]
+        X[:, ~converged] = np.nan
+        return X
+
+    def __call__(self, *args: ndarray) -> ndarray:
+        """Return the index of the element containing each point, or -1.
+
+        Parameters
+        ----------
+        args
+            The coordinates of the points, one array per dimension.
+
+        """
+        x = np.array([np.asarray(arg, dtype=np.float64).ravel()
+                      for arg in args])
+        npoints = x.shape[1]
+        found = np.full(npoints, -1, dtype=np.int64)
+
+        box = ((x >= self.origin[:, None] - self.atol)
+               & (x <= (self.origin + self.size * self.shape)[:, None]
+                  + self.atol)).all(axis=0)
+        points = np.nonzero(box)[0]
+        buckets = np.ravel_multi_index(self._bucket(x[:, points]),
+                                       self.shape)
+        first = self.offsets[buckets]
+        count = self.offsets[buckets + 1] - first
+
+        for k in range(count.max(initial=0)):
+            ix = np.nonzero((k < count) & (found[points] < 0))[0]
+            cand = self.elements[first[ix] + k]
+            xk = x[:, points[ix]]
+            near = ((xk >= self.lo[:, cand] - self.atol)
+                    & (xk <= self.hi[:, cand] + self.atol)).all(axis=0)
+            ix, cand, xk = ix[near], cand[near], xk[:, near]
+            if len(ix) == 0:
+                continue
+            X = self._invF(xk, cand)
+            hit = inside(self.mesh.refdom, X, self.tol)
+            found[points[ix[hit]]] = cand[hit]
+
+        return found.reshape(np.shape(args[0]))
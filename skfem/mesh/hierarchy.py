@@ -0,0 +1,235 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+from scipy.sparse import spmatrix
+
+from .element_finder import inside
+from .mesh import Mesh
+
+
+class MeshHierarchy:
+    """A sequence of nested meshes created by successive refinements.
+
+    The parent of each element is recorded so that finite element functions
+    can be transferred between consecutive levels without solving:
+
+    >>> from skfem import *
+    >>> h = MeshHierarchy(MeshTri())
+    >>> m = h.refine()
+    >>> coarse = InteriorBasis(h[0], ElementTriP2())
+    >>> fine = InteriorBasis(m, ElementTriP2())
+    >>> P = h.prolongation(coarse, fine)
+    >>> P.shape
+    (25, 9)
+
+    Attributes
+    ----------
+    meshes
+        The meshes from the coarsest to the finest.
+    parents
+        `parents[i]` contains the element of `meshes[i]` that contains each
+        element of `meshes[i + 1]`.
+    vertices
+        `vertices[i]` is a sparse matrix (Nvertices_{i+1} x Nvertices_i).
+        Each row gives the vertices of `meshes[i]` that a vertex of
+        `meshes[i + 1]` is the copy, the edge midpoint or the centre of,
+        with equal weights.
+
+    """
+
+    meshes: List[Mesh]
+    parents: List[ndarray]
+    vertices: List[spmatrix]
+
+    def __init__(self, mesh: Mesh):
+        """Start a hierarchy from a copy of the given mesh."""
+        self.meshes = [mesh.copy()]
+        self.parents = []
+        self.vertices = []
+        # the elements marked for refinement on each level
+        self._marked: List[ndarray] = []
+        # the meshes replaced by coarsening, their parent meshes and elements
+        self._replaced: List[Tuple[Mesh, Mesh, ndarray]] = []
+
+    def __len__(self):
+        return len(self.meshes)
+
+    def __getitem__(self, level: int) -> Mesh:
+        return self.meshes[level]
+
+    def refine(self, arg: Optional[Union[int, ndarray]] = None) -> Mesh:
+        """Refine the finest mesh and append the result to the hierarchy.
+
+        Parameters
+        ----------
+        arg
+            As in :meth:`~skfem.mesh.Mesh.refine`.  Several uniform
+            refinements are recorded as separate levels.
+
+        Returns
+        -------
+        Mesh
+            The new finest mesh.
+
+        """
+        if isinstance(arg, int):
+            for itr in range(arg):
+                self.refine()
+            return self.meshes[-1]
+        mesh = self.meshes[-1].copy()
+        if arg is None:
+            marked = np.arange(mesh.t.shape[1])
+        else:
+            marked = np.unique(np.asarray(arg, dtype=np.int64))
+        parents, vertices = mesh._refine(arg)
+        self.meshes.append(mesh)
+        self.parents.append(parents)
+        self.vertices.append(vertices)
+        self._marked.append(marked)
+        return mesh
+
+    def coarsen(self, marked: ndarray) -> Mesh:
+        """Undo the last refinement in the marked elements.
+
+        An element of the previous level is restored if all of its children
+        in the finest mesh are marked.  The previous level is then refined
+        again without the restored elements, which keeps the named
+        boundaries and subdomains.  The finest level is replaced by the
+        result, or removed if no refined elements remain.  Use
+        :meth:`~skfem.mesh.MeshHierarchy.transfer` to move solutions from
+        the replaced mesh.
+
+        Parameters
+        ----------
+        marked
+            Elements of the finest mesh.
+
+        Returns
+        -------
+        Mesh
+            The new finest mesh.
+
+        """
+        if len(self.meshes) < 2:
+            raise ValueError("The hierarchy has a single level.")
+        nelems = self.meshes[-2].t.shape[1]
+        parents = self.parents[-1]
+        restore = (np.bincount(parents[marked], minlength=nelems)
+                   == np.bincount(parents, minlength=nelems))
+        keep = self._marked[-1][~restore[self._marked[-1]]]
+
+        self._replaced.append((self.meshes.pop(), self.meshes[-1],
+                               self.parents.pop()))
+        self.vertices.pop()
+        self._marked.pop()
+        if len(keep) == 0:
+            return self.meshes[-1]
+        return self.refine(keep)
+
+    def _ancestors(self, mesh: Mesh) -> Dict[int, Optional[ndarray]]:
+        """Map the levels containing the mesh to its parent elements.
+
+        `None` stands for the mesh itself.
+
+        """
+        for i, m in enumerate(self.meshes):
+            if m is mesh:
+                if i == 0:
+                    return {0: None}
+                return {i - 1: self.parents[i - 1], i: None}
+        for m, coarse, parents in self._replaced:
+            if m is mesh:
+                return {i: parents for i in range(len(self.meshes))
+                        if self.meshes[i] is coarse}
+        raise ValueError("The mesh is not part of the hierarchy.")
+
+    def transfer(self, source, target) -> spmatrix:
+        """Return the interpolation between bases on two nested meshes.
+
+        The meshes must be levels of the hierarchy or meshes replaced by
+        :meth:`~skfem.mesh.MeshHierarchy.coarsen`, and they must refine a
+        common level.  The value of each target DOF is found by evaluating
+        the source basis functions in the element containing the DOF
+        location.  The element is searched among the children of the common
+        parent, so the cost is linear in the number of DOFs.
+
+        Parameters
+        ----------
+        source
+            A :class:`~skfem.assembly.Basis` to interpolate from.
+        target
+            A :class:`~skfem.assembly.Basis` to interpolate to.
+
+        Returns
+        -------
+        spmatrix
+            The interpolation matrix (target.N x source.N).
+
+        """
+        a = self._ancestors(source.mesh)
+        b = self._ancestors(target.mesh)
+        common = set(a) & set(b)
+        if len(common) == 0:
+            raise ValueError("The meshes do not refine a common level.")
+        level = max(common)
+
+        element_dofs = target.dofs.element_dofs
+        owner = np.empty(target.N, dtype=np.int64)
+        owner[element_dofs] = np.arange(element_dofs.shape[1])
+        x = target.doflocs
+        tind = owner if b[level] is None else b[level][owner]
+        if a[level] is None:
+            return source._interpolator(x, tind)
+
+        # search the source elements having the same parent
+        order = np.argsort(a[level], kind='stable')
+        first = np.searchsorted(a[level], tind, sorter=order)
+        count = np.searchsorted(a[level], tind, side='right',
+                                sorter=order) - first
+        found = np.full(len(tind), -1, dtype=np.int64)
+        for k in range(count.max(initial=0)):
+            ix = np.nonzero((k < count) & (found < 0))[0]
+            cand = order[first[ix] + k]
+            X = source.mapping.invF(x[:, ix, None], tind=cand)
+            hit = inside(source.mesh.refdom, X[:, :, 0])
+            found[ix[hit]] = cand[hit]
+        if (found < 0).any():
+            raise ValueError("Some DOF locations were not found.")
+        return source._interpolator(x, found)
+
+    def prolongation(self, coarse, fine) -> spmatrix:
+        """Return the interpolation from a coarse basis to a finer basis.
+
+        The value of each fine DOF is found by evaluating the coarse basis
+        functions of the parent element at the DOF location.  The result is
+        exact for nested Lagrange elements, such as
+        :class:`~skfem.element.ElementTriP1`,
+        :class:`~skfem.element.ElementTriP2` and
+        :class:`~skfem.element.ElementQuad1`.
+
+        Parameters
+        ----------
+        coarse
+            A :class:`~skfem.assembly.Basis` on some level of the hierarchy.
+        fine
+            A basis on the next level, with the same element.
+
+        Returns
+        -------
+        spmatrix
+            The prolongation matrix (fine.N x coarse.N).
+
+        """
+        for i in range(len(self.parents)):
+            if self.meshes[i] is coarse.mesh and \
+                    self.meshes[i + 1] is fine.mesh:
+                return self.transfer(coarse, fine)
+        raise ValueError("The bases must be defined on consecutive "
+                         "levels of the hierarchy.")
+
+    def restriction(self, coarse, fine) -> spmatrix:
+        """Return the transpose of
+        :meth:`~skfem.mesh.MeshHierarchy.prolongation`, e.g., for
+        restricting residuals in multigrid methods."""
+        return self.prolongation(coarse, fine).T.tocsr()
@@ -1,10 +1,18 @@
 import warnings
-from typing import Dict, Optional, Tuple, \
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, \
     Type, TypeVar, Union, \
     Callable
 
 import numpy as np
 from numpy import ndarray
+from scipy.sparse import coo_matrix, identity, spmatrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+from .element_finder import ElementFinder
+from .ordering import hilbert_order, morton_order
+from .topology import EntityIndex, build_f2t, encode, find_entities, \
+    unique_keys
 
 MeshType = TypeVar('MeshType', bound='Mesh')
 DimTuple = Union[Tuple[float],
@@ -23,6 +31,10 @@ class Mesh:
     - :class:`~skfem.mesh.MeshHex`, hexahedral mesh
     - :class:`~skfem.mesh.MeshLine`, one-dimensional mesh
 
+    The connectivity arrays, e.g. `facets`, `t2f`, `f2t`, `edges` and `t2e`,
+    and the boundary index sets are computed on first access and cached
+    until `t` is replaced by another array.  Modify `t` only by assignment.
+
     Attributes
     ----------
     p
@@ -50,6 +62,17 @@ class Mesh:
     subdomains: Dict[str, ndarray] = None
     boundaries: Dict[str, ndarray] = None
 
+    # connectivity cached for as long as self.t refers to the same array
+    _topology: Tuple[ndarray, Dict[str, ndarray]] = None
+
+    # split edges and faces next to unrefined elements, see _split_elements
+    _midpoints: Dict[int, ndarray] = None
+
+    # quantities cached for as long as self.p and self.t are not replaced
+    # and the vertices are not moved, see _vertices_moved
+    _geometry: Tuple[ndarray, ndarray, int, Dict[str, ndarray]] = None
+    _vertex_version: int = 0
+
     def __init__(self):
         """Check that p and t are C_CONTIGUOUS as this leads
         to better performance."""
@@ -83,9 +106,55 @@ class Mesh:
     def nelements(self):
         return self.t.shape[1]
 
+    def _connectivity(self) -> Dict[str, ndarray]:
+        """Return the cache of the arrays that depend only on `self.t`.
+
+        The cache is emptied when `self.t` is replaced by another array.
+
+        """
+        if self._topology is None or self._topology[0] is not self.t:
+            self._topology = (self.t, {})
+        return self._topology[1]
+
+    def _cached(self, name: str, fun: Callable[[], ndarray]) -> ndarray:
+        """Evaluate `fun` once and cache the result until `self.t` changes."""
+        cache = self._connectivity()
+        if name not in cache:
+            cache[name] = fun()
+            if isinstance(cache[name], ndarray):
+                cache[name].flags.writeable = False
+        return cache[name]
+
+    def _geometric(self, name: str, fun: Callable[[], ndarray]) -> ndarray:
+        """Evaluate `fun` once and cache the result until `self.p` or
+        `self.t` changes.
+
+        Replacing `self.p` or `self.t` by another array is detected.  The
+        methods moving the vertices in place call
+        :meth:`~skfem.mesh.Mesh._vertices_moved`.
+
+        """
+        geom = self._geometry
+        if (geom is None
+                or geom[0] is not self.p
+                or geom[1] is not self.t
+                or geom[2] != self._vertex_version):
+            geom = self._geometry = (self.p, self.t, self._vertex_version, {})
+        cache = geom[3]
+        if name not in cache:
+            cache[name] = fun()
+            if isinstance(cache[name], ndarray):
+                cache[name].flags.writeable = False
+        return cache[name]
+
+    def _vertices_moved(self):
+        """Empty the cache of the geometric quantities after the vertices
+        have been moved in place."""
+        self._vertex_version += 1
+
     @property
     def nvertices(self):
-        return np.max(self.t) + 1
+        return self._cached('nvertices', lambda: int(np.max(self.t)) + 1)
 
     @property
     def nfacets(self):
@@ -95,6 +164,19 @@ class Mesh:
     def nedges(self):
         return self.edges.shape[1]
 
+    def _index_dtype(self, n: int = 0):
+        """Return the integer type for index arrays of size `n`.
+
+        Index arrays are stored as int32 only if the element connectivity
+        `self.t` was given as int32 and the counts fit; otherwise int64 is
+        used.
+
+        """
+        if (self.t.dtype == np.int32
+                and max(n, self.p.shape[1]) < np.iinfo(np.int32).max):
+            return np.int32
+        return np.int64
+
     def __str__(self):
         return self.__repr__()
 
@@ -112,19 +194,96 @@ class Mesh:
         """Default local-to-global mapping for the mesh."""
         raise NotImplementedError("Default mapping not implemented!")
 
-    def _uniform_refine(self):
-        """Perform a single uniform mesh refinement."""
+    def _check_mapping(self):
+        """Check that the elements span the space of the vertices."""
+        ndims = {'line': 1, 'tri': 2, 'quad': 2, 'tet': 3, 'hex': 3}
+        if self.p.shape[0] != ndims[self.refdom]:
+            raise NotImplementedError("Mappings of meshes embedded in a "
+                                      "higher dimensional space, e.g., "
+                                      "from Mesh.boundary_mesh, are not "
+                                      "implemented.")
+
+    def _uniform_refine(self) -> Tuple[ndarray, List[ndarray]]:
+        """Perform a single uniform mesh refinement.
+
+        Returns
+        -------
+        parents
+            The element of the old mesh containing each new element.
+        new_vertices
+            The old vertices each new vertex is the centre of, as arrays of
+            size (Nvertices_per_entity x Nnew) in the order of the new
+            vertices.
+
+        """
         raise NotImplementedError("Single refine not implemented "
                                   "for this mesh type!")
 
-    def _adaptive_refine(self, marked):
-        """Perform adaptive refinement."""
+    def _adaptive_refine(self, marked) -> Tuple[ndarray, List[ndarray]]:
+        """Perform adaptive refinement.
+
+        The return value is as in :meth:`~skfem.mesh.Mesh._uniform_refine`.
+
+        """
         raise NotImplementedError("Adaptive refine not implemented "
                                   "for this mesh type!")
 
+    def _refine(self, arg: Optional[Union[int, ndarray]] = None
+                ) -> Tuple[ndarray, spmatrix]:
+        """Refine the mesh, see :meth:`~skfem.mesh.Mesh.refine`.
+
+        Returns
+        -------
+        parents
+            The element of the old mesh containing each new element.
+        vertices
+            A sparse matrix (Nvertices_new x Nvertices_old).  Each row
+            averages the old vertices that the new vertex is the centre of.
+
+        """
+        if arg is None:
+            steps = [None]
+        elif isinstance(arg, int):
+            steps = [None] * arg
+        elif isinstance(arg, (list, ndarray)):
+            steps = [np.array(arg)]
+        else:
+            raise NotImplementedError("The parameter type not supported.")
+
+        parents = np.arange(self.t.shape[1])
+        vertices = identity(self.p.shape[1], format='csr')
+        for marked in steps:
+            nverts = self.p.shape[1]
+            if marked is None:
+                step, new_vertices = self._uniform_refine()
+            else:
+                step, new_vertices = self._adaptive_refine(marked)
+            parents = parents[step]
+            if self.subdomains is not None:
+                for name, sub in self.subdomains.items():
+                    self.subdomains[name] = np.nonzero(np.isin(step, sub))[0]
+            rows, cols = [np.arange(nverts)], [np.arange(nverts)]
+            data = [np.ones(nverts)]
+            offset = nverts
+            for ents in new_vertices:
+                k, n = ents.shape
+                rows.append(np.tile(offset + np.arange(n), k))
+                cols.append(ents.flatten())
+                data.append(np.full(k * n, 1. / k))
+                offset += n
+            vertices = coo_matrix(
+                (np.concatenate(data),
+                 (np.concatenate(rows), np.concatenate(cols))),
+                shape=(self.p.shape[1], nverts)
+            ).tocsr() @ vertices
+        return parents, vertices
+
     def refine(self, arg: Optional[Union[int, ndarray]] = None):
         """Refine the mesh.
 
+        Use :class:`~skfem.mesh.MeshHierarchy` to keep the coarse mesh and
+        the parent of each element.
+
         Parameters
         ----------
         arg
@@ -133,17 +292,150 @@ class Mesh:
             indices, perform adaptive refinement.
 
         """
-        if arg is None:
-            self._uniform_refine()
-        elif isinstance(arg, int):
-            for itr in range(arg):
-                self._uniform_refine()
-        elif isinstance(arg, list):
-            self._adaptive_refine(np.array(arg))
-        elif isinstance(arg, ndarray):
-            self._adaptive_refine(arg)
-        else:
-            raise NotImplementedError("The parameter type not supported.")
+        self._refine(arg)
+
+    def _split_elements(self,
+                        marked: ndarray,
+                        edges: Sequence[Tuple[int, ...]],
+                        faces: Sequence[Tuple[int, ...]],
+                        children: Sequence[Sequence[Tuple[int, ...]]]):
+        """Split the marked elements leaving hanging nodes.
+
+        The marking is first extended so that the refinement levels of the
+        elements sharing an edge differ by at most one (2:1 balance).  The
+        split edges and faces which are still entities of some unrefined
+        element are recorded in `self._midpoints`, keyed by their number of
+        vertices.  Each column contains the vertices of an entity followed
+        by the new vertex at its centre.
+
+        Parameters
+        ----------
+        marked
+            The elements to refine.
+        edges
+            The local vertex pairs of the edges of an element.
+        faces
+            The local vertices of the faces of an element in cyclic order, or
+            an empty list in two dimensions.
+        children
+            The vertices of each child element given by labels.  A label is
+            a tuple of the local vertices of the parent element that
+            correspond to a vertex, the midpoint of an edge, the centre of a
+            face or the centre of the element.
+
+        """
+        t = self.t
+        p = self.p
+        nelems = t.shape[1]
+        registry = dict(self._midpoints or {})
+        split = registry.get(2, np.zeros((3, 0), dtype=t.dtype))
+
+        # elements next to a hanging node, i.e. refined once more than their
+        # neighbour, may be refined only together with the neighbour
+        refine = np.zeros(nelems, dtype=np.bool_)
+        refine[marked] = True
+        if split.shape[1] > 0:
+            coarse = find_entities(
+                split[:2],
+                np.hstack(tuple(t[list(ix)] for ix in edges))
+            ).reshape(len(edges), nelems)
+            owner = np.full(p.shape[1], -1, dtype=np.int64)
+            owner[split[2]] = np.arange(split.shape[1])
+            while True:
+                hanging = np.zeros(split.shape[1] + 1, dtype=np.bool_)
+                hanging[owner[t[:, refine]]] = True
+                hanging[-1] = False
+                ix = hanging[coarse].any(axis=0) & ~refine
+                if not ix.any():
+                    break
+                refine |= ix
+
+        M = np.nonzero(refine)[0]
+        if len(M) == 0:
+            return np.arange(nelems), []
+        tm = t[:, M]
+        newp = [p]
+        new_vertices = []
+        labels = {(i,): tm[i] for i in range(t.shape[0])}
+
+        # reuse the midpoints of the entities split by a neighbour
+        for local in (edges, faces):
+            if len(local) == 0:
+                continue
+            k = len(local[0])
+            R = registry.get(k, np.zeros((k + 1, 0), dtype=t.dtype))
+            ents = np.hstack(tuple(tm[list(ix)] for ix in local))
+            ix = find_entities(R[:k], ents)
+            new = ix < 0
+            first, _, inverse = unique_keys(
+                encode(np.sort(ents[:, new], axis=0), p.shape[1])
+            )
+            nverts = sum(x.shape[1] for x in newp)
+            mid = np.empty(ents.shape[1], dtype=t.dtype)
+            mid[~new] = R[k, ix[~new]]
+            mid[new] = nverts + inverse
+            added = ents[:, new][:, first]
+            newp.append(np.mean(p[:, added], axis=1))
+            new_vertices.append(added)
+            registry[k] = np.hstack((
+                R,
+                np.vstack((added, nverts + np.arange(len(first))))
+                .astype(t.dtype)
+            ))
+            for j, ix in enumerate(local):
+                labels[tuple(ix)] = mid[(j * len(M)):((j + 1) * len(M))]
+
+        nverts = sum(x.shape[1] for x in newp)
+        labels[tuple(range(t.shape[0]))] = (
+            nverts + np.arange(len(M), dtype=t.dtype))
+        newp.append(np.mean(p[:, tm], axis=1))
+        new_vertices.append(tm)
+
+        # the first child replaces its parent and the rest are appended
+        kids = [np.array([labels[label] for label in child])
+                for child in children]
+        newt = t.copy()
+        newt[:, M] = kids[0]
+        newt = np.hstack((newt, *kids[1:]))
+
+        def midpoint(*vertices):
+            R = registry[len(vertices)]
+            return R[-1, find_entities(R[:-1], np.array(vertices))]
+
+        def subfacets(f):
+            if f.shape[0] == 2:
+                m = midpoint(*f)
+                return [np.array([f[0], m]), np.array([m, f[1]])]
+            c = midpoint(*f)
+            m = [midpoint(f[i], f[(i + 1) % 4]) for i in range(4)]
+            return [np.array([f[i], m[i], c, m[i - 1]]) for i in range(4)]
+
+        boundaries = {}
+        if self.boundaries is not None:
+            boundaries = {k: self.facets[:, v]
+                          for k, v in self.boundaries.items()}
+
+        self.p = np.hstack(newp)
+        self.t = newt
+
+        for name, f in boundaries.items():
+            ix = find_entities(self.facets, f)
+            parts = [ix[ix >= 0]]
+            if (ix < 0).any():
+                parts += [find_entities(self.facets, sub)
+                          for sub in subfacets(f[:, ix < 0])]
+            self.boundaries[name] = np.sort(np.concatenate(parts))
+
+        # forget the entities that are no more next to an unrefined element
+        for k, R in registry.items():
+            ents = self.facets if self.facets.shape[0] == k else self.edges
+            registry[k] = R[:, find_entities(ents, R[:k]) >= 0]
+        self._midpoints = {k: R for k, R in registry.items()
+                           if R.shape[1] > 0}
+
+        return (np.concatenate((np.arange(nelems),
+                                np.tile(M, len(children) - 1))),
+                new_vertices)
 
     def _fix_boundaries(self, facets: ndarray):
         """This should be called after each refine to update the indices in
@@ -176,16 +468,165 @@ class Mesh:
 
         """
         keep = np.setdiff1d(np.arange(self.t.shape[1]), element_indices)
-        newt = self.t[:, keep]
-        ptix = np.unique(newt)
-        reverse = np.zeros(self.p.shape[1])
-        reverse[ptix] = np.arange(len(ptix))
-        newt = reverse[newt]
-        newp = self.p[:, ptix]
-        if newp.shape[1] == 0.0:
+        if len(keep) == 0:
             raise Exception("The new mesh contains no points!")
-        meshclass = type(self)
-        return meshclass(newp, newt.astype(np.intp))
+        return self.submesh(keep)[0]
+
+    def _restricted(self: MeshType, vertices: ndarray, t: ndarray,
+                    mesh_type: Optional[Type[MeshType]] = None) -> MeshType:
+        """Create a mesh of the given type from a subset of the vertices.
+
+        The vertices of the elements are not reordered so that the
+        connectivity of this mesh can be reused.
+
+        """
+        from .mesh2d import MeshTri
+        mesh_type = type(self) if mesh_type is None else mesh_type
+        kwargs = {'validate': False}
+        if issubclass(mesh_type, MeshTri):
+            kwargs['sort_t'] = False
+        return mesh_type(np.ascontiguousarray(self.p[:, vertices]),
+                         np.ascontiguousarray(t, dtype=self.t.dtype),
+                         **kwargs)
+
+    def submesh(self: MeshType, elements: ndarray
+                ) -> Tuple[MeshType, ndarray, ndarray, ndarray]:
+        """Extract a subset of the elements as a new mesh.
+
+        The connectivity of the new mesh is taken from this mesh and the
+        named boundaries and subdomains are restricted to the subset.  The
+        returned index maps transfer data between the meshes without
+        matching coordinates:
+
+        >>> from skfem import MeshTri
+        >>> m = MeshTri()
+        >>> m.refine(2)
+        >>> sub, vertices, facets, elements = m.submesh(
+        ...     m.elements_satisfying(lambda x: x[0] < .5))
+        >>> sub
+        Triangular mesh with 15 vertices and 16 elements.
+        >>> bool((sub.p == m.p[:, vertices]).all())
+        True
+
+        Parameters
+        ----------
+        elements
+            The indices of the elements or a boolean mask.
+
+        Returns
+        -------
+        Mesh
+            The new mesh of the same type.
+        ndarray
+            The vertex of this mesh for each vertex of the new mesh.
+        ndarray
+            The facet of this mesh for each facet of the new mesh.
+        ndarray
+            The element of this mesh for each element of the new mesh.
+
+        """
+        elements = np.asarray(elements)
+        if elements.dtype == np.bool_:
+            elements = np.nonzero(elements)[0]
+        elements = np.unique(elements).astype(np.int64)
+
+        vertices = np.unique(self.t[:, elements])
+        vinv = np.full(self.p.shape[1], -1, dtype=self.t.dtype)
+        vinv[vertices] = np.arange(len(vertices), dtype=self.t.dtype)
+        mesh = self._restricted(vertices, vinv[self.t[:, elements]])
+
+        # reuse the connectivity
+        t2f = self.t2f[:, elements]
+        facets = np.unique(t2f)
+        mesh.t2f = np.searchsorted(facets, t2f).astype(t2f.dtype)
+        mesh.facets = vinv[self.facets[:, facets]]
+        mesh.f2t = build_f2t(mesh.t2f, len(facets), dtype=self.f2t.dtype)
+        if self.dim() == 3:
+            t2e = self.t2e[:, elements]
+            edges = np.unique(t2e)
+            mesh.t2e = np.searchsorted(edges, t2e).astype(t2e.dtype)
+            mesh.edges = vinv[self.edges[:, edges]]
+
+        if self.boundaries is not None:
+            mesh.boundaries = {}
+            for name, ix in self.boundaries.items():
+                pos = np.minimum(np.searchsorted(facets, ix), len(facets) - 1)
+                mesh.boundaries[name] = pos[facets[pos] == ix]
+        if self.subdomains is not None:
+            mesh.subdomains = {
+                name: np.nonzero(np.isin(elements, ix))[0]
+                for name, ix in self.subdomains.items()
+            }
+        if self._midpoints:
+            mesh._midpoints = {k: vinv[R[:, (vinv[R] >= 0).all(axis=0)]]
+                               for k, R in self._midpoints.items()}
+
+        return mesh, vertices, facets, elements
+
+    def boundary_mesh(self, facets: Optional[ndarray] = None
+                      ) -> Tuple['Mesh', ndarray, ndarray]:
+        """Extract facets as a mesh of one dimension lower.
+
+        The facets of a :class:`~skfem.mesh.MeshTet` become a
+        :class:`~skfem.mesh.MeshTri`, the facets of a
+        :class:`~skfem.mesh.MeshHex` a :class:`~skfem.mesh.MeshQuad` and
+        the facets of two-dimensional meshes a
+        :class:`~skfem.mesh.MeshLine`.  The vertices keep all of their
+        coordinates so the new mesh is embedded in the space of this mesh.
+        It can be saved but no mapping, and hence no basis, can be built
+        on it; :meth:`mapping` raises `NotImplementedError`:
+
+        >>> from skfem import MeshTet
+        >>> m = MeshTet()
+        >>> m.refine(1)
+        >>> surface, vertices, facets = m.boundary_mesh()
+        >>> surface
+        Triangular mesh with 26 vertices and 48 elements.
+        >>> surface.p.shape
+        (3, 26)
+
+        Parameters
+        ----------
+        facets
+            The facets to extract.  By default, the boundary facets.
+
+        Returns
+        -------
+        Mesh
+            The new mesh whose elements are the facets.
+        ndarray
+            The vertex of this mesh for each vertex of the new mesh.
+        ndarray
+            The facet of this mesh for each element of the new mesh.
+
+        """
+        from .mesh_line import MeshLine
+        from .mesh2d import MeshQuad, MeshTri
+        mesh_types = {'line': MeshLine, 'tri': MeshTri, 'quad': MeshQuad}
+        if self.brefdom not in mesh_types:
+            raise NotImplementedError("Boundary mesh not implemented "
+                                      "for the given Mesh type.")
+
+        if facets is None:
+            facets = self.boundary_facets()
+        facets = np.unique(np.asarray(facets)).astype(np.int64)
+
+        vertices = np.unique(self.facets[:, facets])
+        vinv = np.full(self.p.shape[1], -1, dtype=self.t.dtype)
+        vinv[vertices] = np.arange(len(vertices), dtype=self.t.dtype)
+        mesh = self._restricted(vertices, vinv[self.facets[:, facets]],
+                                mesh_types[self.brefdom])
+
+        if self.dim() == 3:
+            # the facets of the new mesh are edges of this mesh
+            t2e = self._facet_edges(facets)
+            edges = np.unique(t2e)
+            mesh.t2f = np.searchsorted(edges, t2e).astype(self.t2e.dtype)
+            mesh.facets = vinv[self.edges[:, edges]]
+            mesh.f2t = build_f2t(mesh.t2f, len(edges),
+                                 dtype=self.f2t.dtype)
+
+        return mesh, vertices, facets
 
     def scale(self, scale: Union[float, DimTuple]) -> None:
         """Scale the mesh.
@@ -203,6 +644,7 @@ class Mesh:
                 self.p[itr, :] *= scale[itr]
             else:
                 self.p[itr, :] *= scale
+        self._vertices_moved()
 
     def translate(self, vec: DimTuple) -> None:
         """Translate the mesh.
@@ -216,6 +658,143 @@ class Mesh:
         """
         for itr in range(int(self.dim())):
             self.p[itr, :] += vec[itr]
+        self._vertices_moved()
+
+    def update_vertices(self, p: ndarray) -> None:
+        """Move the vertices of the mesh in place.
+
+        The element connectivity is kept so that the facets, the named
+        boundaries and subdomains, and the degrees-of-freedom of any basis
+        on the mesh remain valid.  The cached geometric quantities, e.g.
+        :meth:`~skfem.mesh.Mesh.element_midpoints`, are recomputed on next
+        use; modifying `self.p` in place otherwise is not detected.  Call :meth:`~skfem.assembly.Basis.update`
+        to recompute the mappings and the basis functions.
+
+        Parameters
+        ----------
+        p
+            The new locations of the vertices (dim x Nvertices).
+
+        """
+        p = np.asarray(p, dtype=np.float64)
+        if p.shape != self.p.shape:
+            raise ValueError("The new vertex array has a wrong shape.")
+        self.p[:] = p
+        self._vertices_moved()
+
+    def reorder(self,
+                strategy: Union[str, ndarray] = 'hilbert'
+                ) -> Tuple[ndarray, ndarray]:
+        """Renumber the elements and the vertices for memory locality.
+
+        Neighbouring elements are given nearby indices so that the gathers
+        during assembly access nearby memory.  The vertices are numbered in
+        the order they are first referenced by the renumbered elements.  The
+        connectivity is rebuilt and the named boundaries and subdomains are
+        renumbered.  Reorder before creating any bases on the mesh:
+
+        >>> from skfem import MeshTri
+        >>> m = MeshTri()
+        >>> m.refine(3)
+        >>> elements, vertices = m.reorder()
+        >>> m.t.shape[1] == len(elements), m.p.shape[1] == len(vertices)
+        (True, True)
+
+        Parameters
+        ----------
+        strategy
+            The string 'hilbert' or 'morton' for sorting the element
+            midpoints along a space-filling curve, the string 'rcm' for
+            reverse Cuthill-McKee ordering of the graph of elements sharing
+            a facet, or an explicit permutation of the elements.
+
+        Returns
+        -------
+        ndarray
+            The permutation of the elements, i.e. an array `x` of element
+            values in the old numbering corresponds to `x[elements]` in the
+            new numbering.
+        ndarray
+            The permutation of the vertices, in the same format.
+
+        """
+        if isinstance(strategy, ndarray):
+            eperm = strategy
+        elif strategy == 'hilbert':
+            eperm = hilbert_order(self.element_midpoints())
+        elif strategy == 'morton':
+            eperm = morton_order(self.element_midpoints())
+        elif strategy == 'rcm':
+            f2t = self.f2t[:, self.f2t[1] >= 0]
+            nelems = self.t.shape[1]
+            eperm = reverse_cuthill_mckee(coo_matrix(
+                (np.ones(f2t.shape[1]), (f2t[0], f2t[1])),
+                shape=(nelems, nelems)
+            ).tocsr(), symmetric_mode=False)
+        else:
+            raise ValueError("Unknown reordering strategy '{}'; expected "
+                             "'hilbert', 'morton', 'rcm' or a permutation."
+                             .format(strategy))
+        if len(eperm) != self.t.shape[1]:
+            raise ValueError("The permutation has wrong size.")
+
+        # number the vertices by their first appearance
+        t = self.t[:, eperm]
+        vertices, first = np.unique(t.T, return_index=True)
+        vperm = np.concatenate((
+            vertices[np.argsort(first)],
+            np.setdiff1d(np.arange(self.p.shape[1]), vertices),
+        )).astype(self.t.dtype)
+        vinv = np.empty_like(vperm)
+        vinv[vperm] = np.arange(len(vperm), dtype=vperm.dtype)
+        einv = np.empty(len(eperm), dtype=np.int64)
+        einv[eperm] = np.arange(len(eperm))
+
+        t = vinv[t]
+        if self.refdom in ('tri', 'tet') and (np.diff(self.t, axis=0)
+                                              > 0).all():
+            # keep the sorting of the constructor
+            t = np.sort(t, axis=0)
+        boundaries = {name: vinv[self.facets[:, ix]]
+                      for name, ix in (self.boundaries or {}).items()}
+
+        self.p = self.p[:, vperm]
+        self.t = t
+        if self.boundaries is not None:
+            self.boundaries = {name: self.find_facets(f)
+                               for name, f in boundaries.items()}
+        if self.subdomains is not None:
+            self.subdomains = {name: np.sort(einv[ix])
+                               for name, ix in self.subdomains.items()}
+        if self._midpoints:
+            self._midpoints = {k: vinv[R] for k, R in self._midpoints.items()}
+
+        return eperm.astype(np.int64), vperm
+
+    def partition(self, nparts: int, method: str = 'rcb'):
+        """Partition the elements into parts with small interfaces.
+
+        Parameters
+        ----------
+        nparts
+            The number of parts.
+        method
+            The string 'rcb' for recursive coordinate bisection of the
+            element midpoints, 'sfc' for cutting the elements sorted along a
+            Hilbert curve into contiguous pieces, or 'graph' for recursive
+            bisection of the graph of elements sharing a facet by the
+            distance from a peripheral element.  The parts have equal sizes
+            up to rounding.
+
+        Returns
+        -------
+        MeshPartition
+            The part of each element, the owned and ghost vertices and
+            facets of each part, and the submeshes of the parts.
+
+        """
+        from .partition import MeshPartition, partition
+        return MeshPartition(self, partition(self, nparts, method))
 
     def _validate(self):
         """Perform mesh validity checks."""
@@ -261,17 +840,7 @@ class Mesh:
         vertices = np.unique(self.facets[:, facets].flatten())
 
         if self.dim() == 3:
-            edge_candidates = self.t2e[:, self.f2t[0, facets]].flatten()
-            # subset of edges that share all points with the given facets
-            subset_ix = np.nonzero(
-                np.prod(np.isin(self.edges[:, edge_candidates],
-                                self.facets[:, facets].flatten()),
-                        axis=0)
-            )[0]
-            edges = np.intersect1d(
-                self.boundary_edges(),
-                edge_candidates[subset_ix]
-            )
+            edges = np.unique(self._facet_edges(facets))
         else:
             edges = np.array([], dtype=np.int64)
 
@@ -287,11 +856,17 @@ class Mesh:
         ----------
         filename
             The output filename, with suffix determining format;
-            e.g. .msh, .vtk, .xdmf
+            e.g. .msh, .vtk, .xdmf.  The suffix .npz saves the mesh and its
+            connectivity as NumPy arrays using :func:`skfem.io.npz.to_file`.
         point_data
             Data related to the vertices of the mesh.
 
         """
+        if str(filename).endswith('.npz'):
+            if point_data is not None:
+                raise ValueError("Point data cannot be saved to .npz.")
+            from skfem.io.npz import to_file as to_npz
+            return to_npz(self, filename)
         from skfem.io.meshio import to_file
         return to_file(self, filename, point_data, **kwargs)
 
@@ -301,8 +876,11 @@ class Mesh:
         if not isinstance(basis.mesh, cls):
             raise ValueError("Mesh and Basis must be compatible.")
         mesh = basis.mesh.copy()
+        # keep the connectivity of the low-order mesh
+        cache = {k: getattr(mesh, k) for k in ('facets', 't2f', 'f2t')}
         mesh.p = basis.doflocs
         mesh.t = basis.element_dofs
+        mesh._topology = (mesh.t, cache)
         return mesh
 
     @classmethod
@@ -313,15 +891,22 @@ class Mesh:
         Parameters
         ----------
         filename
-            The filename of the mesh.
+            The filename of the mesh.  Archives with the suffix .npz and
+            directories are loaded using :func:`skfem.io.npz.from_file`.
 
         """
+        if str(filename).endswith('.npz') or Path(filename).is_dir():
+            from skfem.io.npz import from_file as from_npz
+            return from_npz(filename)
         from skfem.io.meshio import from_file
         return from_file(filename)
 
     def boundary_nodes(self) -> ndarray:
         """Return an array of boundary node indices."""
-        return np.unique(self.facets[:, self.boundary_facets()])
+        return self._cached(
+            'boundary_nodes',
+            lambda: np.unique(self.facets[:, self.boundary_facets()])
+        )
 
     def interior_nodes(self) -> ndarray:
         """Return an array of interior node indices."""
@@ -330,17 +915,82 @@ class Mesh:
 
     def boundary_facets(self) -> ndarray:
         """Return an array of boundary facet indices."""
-        return np.nonzero(self.f2t[1, :] == -1)[0]
+        def find():
+            boundary = self.f2t[1] == -1
+            if self._midpoints:
+                boundary &= ~self._hanging_facets()
+            return np.nonzero(boundary)[0]
+        return self._cached('boundary_facets', find)
+
+    def _hanging_facets(self) -> ndarray:
+        """Mark the facets on the interface of refined and unrefined
+        elements.
+
+        These belong to a single element although they are not on the
+        boundary: either they have been split in the neighbouring element or
+        they contain the centre of such a facet.
+
+        """
+        k = self.facets.shape[0]
+        if not self._midpoints or k not in self._midpoints:
+            return np.zeros(self.facets.shape[1], dtype=np.bool_)
+        R = self._midpoints[k]
+        return ((find_entities(R[:k], self.facets) >= 0)
+                | np.isin(self.facets, R[k]).any(axis=0))
 
     def interior_facets(self) -> ndarray:
         """Return an array of interior facet indices."""
-        return np.nonzero(self.f2t[1, :] >= 0)[0]
+        return self._cached('interior_facets',
+                            lambda: np.nonzero(self.f2t[1, :] >= 0)[0])
+
+    def find_facets(self, vertices: ndarray) -> ndarray:
+        """Return the indices of the facets having the given vertices.
 
-    def element_finder(self) -> Callable[[ndarray], ndarray]:
+        The search index is built on the first call and cached together
+        with the connectivity.
+
+        >>> import numpy as np
+        >>> from skfem import MeshTri
+        >>> m = MeshTri()
+        >>> m.find_facets(np.array([[0, 0, 3], [1, 3, 2]]))
+        array([ 0, -1,  4])
+
+        Parameters
+        ----------
+        vertices
+            An array of vertex indices (nverts_per_facet x Nfacets).  The
+            order of the vertices within the columns is irrelevant.
+
+        Returns
+        -------
+        ndarray
+            The index of each facet or -1 if the vertices do not span a
+            facet of the mesh.
+
+        """
+        index = self._cached('facet_index', lambda: EntityIndex(self.facets))
+        return index.find(vertices)
+
+    def element_finder(self, mapping=None) -> Callable[..., ndarray]:
         """Return a function, which returns element
-        indices corresponding to the input points."""
-        raise NotImplementedError("element_finder not implemented "
-                                  "for the given Mesh type.")
+        indices corresponding to the input points.
+
+        The returned :class:`~skfem.mesh.element_finder.ElementFinder`
+        builds a spatial index once and is cached until the vertices or the
+        elements change.  Points outside of the mesh get the index -1.
+
+        Parameters
+        ----------
+        mapping
+            Optionally, the mapping used for locating the points, e.g., a
+            :class:`~skfem.mapping.MappingIsoparametric` for curved
+            elements.  The finder is then not cached.
+
+        """
+        if mapping is not None:
+            return ElementFinder(self, mapping)
+        return self._geometric('element_finder',
+                               lambda: ElementFinder(self))
 
     def nodes_satisfying(self,
                          test: Callable[[ndarray], ndarray],
@@ -375,9 +1025,7 @@ class Mesh:
             If True, include only boundary facets.
 
         """
-        midp = [np.sum(self.p[itr, self.facets], axis=0) / self.facets.shape[0]
-                for itr in range(self.p.shape[0])]
-        facets = np.nonzero(test(np.array(midp)))[0]
+        facets = np.nonzero(test(self.facet_midpoints()))[0]
         if boundaries_only:
             facets = np.intersect1d(facets, self.boundary_facets())
         return facets
@@ -393,9 +1041,44 @@ class Mesh:
             be included in the return set.
 
         """
-        midp = [np.sum(self.p[itr, self.t], axis=0) / self.t.shape[0]
-                for itr in range(self.p.shape[0])]
-        return np.nonzero(test(np.array(midp)))[0]
+        return np.nonzero(test(self.element_midpoints()))[0]
+
+    def element_midpoints(self) -> ndarray:
+        """Return the averages of the element vertices (dim x Nelements).
+
+        The geometric quantities are cached until the vertices or the
+        elements change.
+
+        """
+        return self._geometric('element_midpoints',
+                               lambda: self.p[:, self.t].mean(axis=1))
+
+    def facet_midpoints(self) -> ndarray:
+        """Return the averages of the facet vertices (dim x Nfacets)."""
+        return self._geometric('facet_midpoints',
+                               lambda: self.p[:, self.facets].mean(axis=1))
+
+    def element_measures(self) -> ndarray:
+        """Return the lengths, areas or volumes of the elements."""
+        def measures():
+            from skfem.quadrature import get_quadrature
+            X, W = get_quadrature(self.refdom, 3)
+            return np.abs(self.mapping().detDF(X)) @ W
+        return self._geometric('element_measures', measures)
+
+    def element_diameters(self) -> ndarray:
+        """Return the largest distances between the vertices of the
+        elements."""
+        def diameters():
+            nverts = self.t.shape[0]
+            h = np.zeros(self.t.shape[1])
+            for i in range(nverts):
+                for j in range(i + 1, nverts):
+                    h = np.maximum(h, np.linalg.norm(self.p[:, self.t[i]]
+                                                     - self.p[:, self.t[j]],
+                                                     axis=0))
+            return h
+        return self._geometric('element_diameters', diameters)
 
     @classmethod
     def from_dict(cls: Type[MeshType], d) -> MeshType:
@@ -2,6 +2,7 @@ import numpy as np
 from numpy import ndarray
 
 from skfem.mesh import Mesh, MeshType
+from ..topology import Connectivity
 
 
 class Mesh2D(Mesh):
@@ -14,9 +15,9 @@ class Mesh2D(Mesh):
 
     """
     p = np.zeros((2, 0), dtype=np.float64)
-    facets = np.zeros((2, 0), dtype=np.int64)
-    f2t = np.zeros((2, 0), dtype=np.int64)
-    t2f = np.array([], dtype=np.int64)
+    facets = Connectivity('_build_facets', np.zeros((2, 0), dtype=np.int64))
+    f2t = Connectivity('_build_facets', np.zeros((2, 0), dtype=np.int64))
+    t2f = Connectivity('_build_facets', np.array([], dtype=np.int64))
 
     def mirror(self, a: float, b: float, c: float) -> MeshType:
         """Mirror a mesh by the line :math:`ax + by + c = 0`.  Returns a new
@@ -42,8 +43,8 @@ class Mesh2D(Mesh):
 
     def param(self) -> float:
         """Return mesh parameter, viz. the length of the longest edge."""
-        return np.max(np.linalg.norm(np.diff(self.p[:, self.facets], axis=1),
-                                     axis=0))
+        return self._geometric('param', lambda: np.max(np.linalg.norm(
+            np.diff(self.p[:, self.facets], axis=1), axis=0)))
 
     @staticmethod
     def strip_extra_coordinates(p: ndarray) -> ndarray:
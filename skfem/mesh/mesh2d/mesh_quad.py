@@ -1,4 +1,3 @@
-from itertools import dropwhile
 from typing import Optional, Type, Dict
 
 import numpy as np
@@ -6,6 +5,7 @@ from numpy import ndarray
 
 from .mesh2d import Mesh2D, MeshType
 from .mesh_tri import MeshTri
+from ..topology import Connectivity, build_entities, refine_entities
 
 
 class MeshQuad(Mesh2D):
@@ -35,7 +35,7 @@ class MeshQuad(Mesh2D):
     name: str = "Quadrilateral"
 
     t = np.zeros((4, 0), dtype=np.int64)
-    t2f = np.zeros((4, 0), dtype=np.int64)
+    t2f = Connectivity('_build_facets', np.zeros((4, 0), dtype=np.int64))
 
     def __init__(self,
                  p: Optional[ndarray] = None,
@@ -85,7 +85,6 @@ class MeshQuad(Mesh2D):
         super(MeshQuad, self).__init__()
         if validate:
             self._validate()
-        self._build_mappings()
 
     @classmethod
     def init_tensor(cls: Type[MeshType],
@@ -131,7 +130,10 @@ class MeshQuad(Mesh2D):
         t[3, :] = (ix[0:(npy-1), 1:npx].reshape(nt, 1, order='F')
                                        .copy()
                                        .flatten())
-        return cls(p, t.astype(np.int64))
+        mesh = cls(p, t.astype(np.int64))
+        # the grid is structured so the connectivity is found without sorting
+        mesh._connectivity().update(mesh._build_facets(structured=True))
+        return mesh
 
     @classmethod
     def init_refdom(cls: Type[MeshType]) -> MeshType:
@@ -152,56 +154,28 @@ class MeshQuad(Mesh2D):
         """
         return cls()
 
-    def _build_mappings(self):
+    def _build_facets(self, structured=False):
         # do not sort since order defines counterclockwise order
         # self.t=np.sort(self.t,axis=0)
 
         # define facets: in the order (0,1) (1,2) (2,3) (0,3)
-        self.facets = np.sort(np.hstack((
-            self.t[[0, 1]],
-            self.t[[1, 2]],
-            self.t[[2, 3]],
-            self.t[[0, 3]],
-        )), axis=0)
-
-        # get unique facets and build quad-to-facet mapping: 4 (edges) x Nquads
-        tmp = np.ascontiguousarray(self.facets.T)
-        tmp, ixa, ixb = np.unique(tmp.view([('', tmp.dtype)] * tmp.shape[1]),
-                                  return_index=True, return_inverse=True)
-        self.facets = self.facets[:, ixa]
-        self.t2f = ixb.reshape((4, self.t.shape[1]))
-
-        # build facet-to-quadrilateral mapping: 2 (quads) x Nedges
-        e_tmp = np.hstack((self.t2f[0],
-                           self.t2f[1],
-                           self.t2f[2],
-                           self.t2f[3]))
-        t_tmp = np.tile(np.arange(self.t.shape[1]), (1, 4))[0]
-
-        e_first, ix_first = np.unique(e_tmp, return_index=True)
-        # this emulates matlab unique(e_tmp,'last')
-        e_last, ix_last = np.unique(e_tmp[::-1], return_index=True)
-        ix_last = e_tmp.shape[0] - ix_last - 1
-
-        self.f2t = np.zeros((2, self.facets.shape[1]), dtype=np.int64)
-        self.f2t[0, e_first] = t_tmp[ix_first]
-        self.f2t[1, e_last] = t_tmp[ix_last]
-
-        # second row to -1 if repeated (i.e., on boundary)
-        self.f2t[1, np.nonzero(self.f2t[0, :] == self.f2t[1, :])[0]] = -1
+        facets, t2f, f2t = build_entities(
+            self.t,
+            [[0, 1], [1, 2], [2, 3], [0, 3]],
+            dtype=self._index_dtype(4 * self.t.shape[1]),
+            structured=structured
+        )
+        return {'facets': facets, 't2f': t2f, 'f2t': f2t}
 
     def _uniform_refine(self):
         """Perform a single mesh refine that halves 'h'. Each
         quadrilateral is split into four."""
-        # rename variables
-        t = np.copy(self.t)
-        p = np.copy(self.p)
+        if self._midpoints:
+            return self._adaptive_refine(np.arange(self.t.shape[1]))
+        t = self.t
+        p = self.p
         e = self.facets
         sz = p.shape[1]
-        t2f = self.t2f + sz
-
-        # quadrilateral middle point
-        mid = range(self.t.shape[1]) + np.max(t2f) + 1
 
         # new vertices are the midpoints of edges ...
         newp1 = 0.5*np.vstack((p[0, e[0]] + p[0, e[1]],
@@ -212,38 +186,51 @@ class MeshQuad(Mesh2D):
                                 p[0, t[2]] + p[0, t[3]],
                                 p[1, t[0]] + p[1, t[1]] +
                                 p[1, t[2]] + p[1, t[3]]))
-        self.p = np.hstack((p, newp1, newp2))
-
-        # build new quadrilateral definitions
-        self.t = np.hstack((
-            np.vstack((t[0], t2f[0], mid, t2f[3])),
-            np.vstack((t2f[0], t[1], t2f[1], mid)),
-            np.vstack((mid, t2f[1], t[2], t2f[2])),
-            np.vstack((t2f[3], mid, t2f[2], t[3])),
-            ))
-
-        # build mapping between old and new facets
-        new_facets = np.zeros((2, e.shape[1]), dtype=np.int64)
-        ix0 = np.arange(t.shape[1], dtype=np.int64)
-        ix1 = ix0 + t.shape[1]
-        ix2 = ix0 + 2 * t.shape[1]
-        ix3 = ix0 + 3 * t.shape[1]
-
-        self._build_mappings()
 
-        new_facets[0, t2f[0] - sz] = self.t2f[0, ix0]
-        new_facets[1, t2f[0] - sz] = self.t2f[0, ix1]
+        # build new quadrilateral definitions and their facets
+        local = [[0, 1], [1, 2], [2, 3], [0, 3]]
+        mid = (0, 1, 2, 3)
+        newt, [(facets, t2f, f2t, new_facets)] = refine_entities(
+            t,
+            [(None, ((0,), (0, 1), mid, (0, 3))),
+             (None, ((0, 1), (1,), (1, 2), mid)),
+             (None, (mid, (1, 2), (2,), (2, 3))),
+             (None, ((0, 3), mid, (2, 3), (3,)))],
+            sz,
+            e,
+            self.t2f,
+            local,
+            entities=[(local, True)],
+            dtype=self._index_dtype(sz + 4 * (e.shape[1] + t.shape[1]))
+        )
 
-        new_facets[0, t2f[1] - sz] = self.t2f[1, ix1]
-        new_facets[1, t2f[1] - sz] = self.t2f[1, ix2]
+        self.p = np.hstack((p, newp1, newp2))
+        self.t = newt
+        self._connectivity().update({'facets': facets,
+                                     't2f': t2f,
+                                     'f2t': f2t})
+        self._fix_boundaries(new_facets.T)
+        return np.tile(np.arange(t.shape[1]), 4), [e, t]
 
-        new_facets[0, t2f[2] - sz] = self.t2f[2, ix2]
-        new_facets[1, t2f[2] - sz] = self.t2f[2, ix3]
+    def _adaptive_refine(self, marked):
+        """Split the marked quadrilaterals into four leaving hanging nodes.
 
-        new_facets[0, t2f[3] - sz] = self.t2f[3, ix3]
-        new_facets[1, t2f[3] - sz] = self.t2f[3, ix0]
+        The neighbours of the marked elements are refined as well if
+        necessary to keep the mesh 2:1 balanced.  The continuity of the
+        finite element functions over the hanging nodes is enforced by
+        :meth:`~skfem.assembly.Basis.hanging_constraints`.
 
-        self._fix_boundaries(new_facets)
+        """
+        mid = (0, 1, 2, 3)
+        return self._split_elements(
+            marked,
+            [(0, 1), (1, 2), (2, 3), (0, 3)],
+            [],
+            [((0,), (0, 1), mid, (0, 3)),
+             ((0, 1), (1,), (1, 2), mid),
+             (mid, (1, 2), (2,), (2, 3)),
+             ((0, 3), mid, (2, 3), (3,))]
+        )
 
     def to_meshtri(self, x=None):
         """Split each quad into two triangles and return MeshTri."""
@@ -259,14 +246,10 @@ class MeshQuad(Mesh2D):
         mesh = MeshTri(self.p, t, **kwargs)
 
         if self.boundaries:
-            mesh.boundaries = {}
-            for k in self.boundaries:
-                slots = enumerate(mesh.facets.T)
-                mesh.boundaries[k] = np.array([
-                    next(dropwhile(lambda slot: not(np.array_equal(f,
-                                                                   slot[1])),
-                                   slots))[0]
-                    for f in self.facets.T[np.sort(self.boundaries[k])]])
+            mesh.boundaries = {
+                k: mesh.find_facets(self.facets[:, np.sort(v)])
+                for k, v in self.boundaries.items()
+            }
 
         if x is not None:
             if len(x) == self.t.shape[1]:
@@ -295,14 +278,7 @@ class MeshQuad(Mesh2D):
                        validate=False)
 
     def mapping(self):
+        self._check_mapping()
         from skfem.mapping import MappingIsoparametric
         from skfem.element import ElementQuad1, ElementLineP1
         return MappingIsoparametric(self, ElementQuad1(), ElementLineP1())
-
-    def element_finder(self):
-        tri_finder = self._splitquads().element_finder()
-
-        def finder(*args):
-            return tri_finder(*args) % self.t.shape[1]
-
-        return finder
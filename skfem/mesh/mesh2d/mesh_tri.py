@@ -4,6 +4,8 @@ import numpy as np
 from numpy import ndarray
 
 from .mesh2d import Mesh2D, MeshType
+from ..topology import (Connectivity, build_entities, find_entities,
+                        refine_entities)
 
 
 class MeshTri(Mesh2D):
@@ -38,7 +40,7 @@ class MeshTri(Mesh2D):
     name: str = "Triangular"
 
     t = np.zeros((3, 0), dtype=np.int64)
-    t2f = np.zeros((3, 0), dtype=np.int64)
+    t2f = Connectivity('_build_facets', np.zeros((3, 0), dtype=np.int64))
 
     def __init__(self,
                  p: Optional[ndarray] = None,
@@ -76,8 +78,7 @@ class MeshTri(Mesh2D):
         validate
             If `True`, run mesh validity checks.
         sort_t
-            If `True`, sort the element connectivity matrix before building
-            mappings.
+            If `True`, sort the element connectivity matrix.
 
         """
         if p is None and t is None:
@@ -94,7 +95,9 @@ class MeshTri(Mesh2D):
         super(MeshTri, self).__init__()
         if validate:
             self._validate()
-        self._build_mappings(sort_t=sort_t)
+        # sort to preserve orientations etc.
+        if sort_t:
+            self.t = np.sort(self.t, axis=0)
 
     @classmethod
     def init_tensor(cls: Type[MeshType],
@@ -147,7 +150,10 @@ class MeshTri(Mesh2D):
                                      .copy()
                                      .flatten())
 
-        return cls(p, t.astype(np.int64))
+        mesh = cls(p, t.astype(np.int64))
+        # the grid is structured so the connectivity is found without sorting
+        mesh._connectivity().update(mesh._build_facets(structured=True))
+        return mesh
 
     @classmethod
     def init_symmetric(cls) -> MeshType:
@@ -252,82 +258,58 @@ class MeshTri(Mesh2D):
                       [0, 3, 5]], dtype=np.intp).T
         return cls(p, t)
 
-    def _build_mappings(self, sort_t=True):
-        # sort to preserve orientations etc.
-        if sort_t:
-            self.t = np.sort(self.t, axis=0)
-
+    def _build_facets(self, structured=False):
         # define facets: in the order (0,1) (1,2) (0,2)
-        self.facets = np.sort(np.hstack((
-            self.t[[0, 1]],
-            self.t[[1, 2]],
-            self.t[[0, 2]],
-        )), axis=0)
-
-        # get unique facets and build triangle-to-facet
-        # mapping: 3 (edges) x Ntris
-        tmp = np.ascontiguousarray(self.facets.T)
-        tmp, ixa, ixb = np.unique(tmp.view([('', tmp.dtype)] * tmp.shape[1]),
-                                  return_index=True, return_inverse=True)
-        self.facets = self.facets[:, ixa]
-        self.t2f = ixb.reshape((3, self.t.shape[1]))
-
-        # build facet-to-triangle mapping: 2 (triangles) x Nedges
-        e_tmp = np.hstack((self.t2f[0], self.t2f[1], self.t2f[2]))
-        t_tmp = np.tile(np.arange(self.t.shape[1]), (1, 3))[0]
-
-        e_first, ix_first = np.unique(e_tmp, return_index=True)
-        # this emulates matlab unique(e_tmp,'last')
-        e_last, ix_last = np.unique(e_tmp[::-1], return_index=True)
-        ix_last = e_tmp.shape[0] - ix_last - 1
-
-        self.f2t = np.zeros((2, self.facets.shape[1]), dtype=np.int64)
-        self.f2t[0, e_first] = t_tmp[ix_first]
-        self.f2t[1, e_last] = t_tmp[ix_last]
-
-        # second row to zero if repeated (i.e., on boundary)
-        self.f2t[1, np.nonzero(self.f2t[0] == self.f2t[1])[0]] = -1
+        facets, t2f, f2t = build_entities(
+            self.t,
+            [[0, 1], [1, 2], [0, 2]],
+            dtype=self._index_dtype(3 * self.t.shape[1]),
+            structured=structured
+        )
+        return {'facets': facets, 't2f': t2f, 'f2t': f2t}
 
     def _uniform_refine(self):
         """Perform a single mesh refine."""
-        # rename variables
-        t = np.copy(self.t)
-        p = np.copy(self.p)
+        p = self.p
         e = self.facets
         sz = p.shape[1]
-        t2f = self.t2f + sz
 
         # new vertices are the midpoints of edges
         new_p = 0.5 * np.vstack((p[0, e[0]] + p[0, e[1]],
                                  p[1, e[0]] + p[1, e[1]]))
-        self.p = np.hstack((p, new_p))
 
-        # build new triangle definitions
-        self.t = np.hstack((
-            np.vstack((t[0], t2f[0], t2f[2])),
-            np.vstack((t[1], t2f[0], t2f[1])),
-            np.vstack((t[2], t2f[2], t2f[1])),
-            np.vstack((t2f[0], t2f[1], t2f[2])),
-        ))
-
-        # mapping of indices between old and new facets
-        new_facets = np.zeros((2, e.shape[1]), dtype=np.int64)
-        ix0 = np.arange(t.shape[1], dtype=np.int64)
-        ix1 = ix0 + t.shape[1]
-        ix2 = ix0 + 2 * t.shape[1]
-
-        # rebuild mappings
-        self._build_mappings()
-
-        # finish mapping of indices between old and new facets
-        new_facets[0, t2f[2, :] - sz] = self.t2f[2, ix0]
-        new_facets[0, t2f[1, :] - sz] = self.t2f[2, ix1]
-        new_facets[0, t2f[0, :] - sz] = self.t2f[0, ix0]
-        new_facets[1, t2f[2, :] - sz] = self.t2f[0, ix2]
-        new_facets[1, t2f[1, :] - sz] = self.t2f[2, ix2]
-        new_facets[1, t2f[0, :] - sz] = self.t2f[0, ix1]
-
-        self._fix_boundaries(new_facets)
+        # build new triangle definitions and their facets
+        local = [[0, 1], [1, 2], [0, 2]]
+        t, [(facets, t2f, f2t, new_facets)] = refine_entities(
+            self.t,
+            [(None, ((0,), (0, 1), (0, 2))),
+             (None, ((1,), (0, 1), (1, 2))),
+             (None, ((2,), (0, 2), (1, 2))),
+             (None, ((0, 1), (1, 2), (0, 2)))],
+            sz,
+            e,
+            self.t2f,
+            local,
+            entities=[(local, True)],
+            dtype=self._index_dtype(sz + 4 * e.shape[1])
+        )
+
+        # sort the new triangles and permute t2f accordingly
+        order = np.argsort(t, axis=0)
+        rank = np.argsort(order, axis=0)
+        new_t2f = np.empty_like(t2f)
+        for i, (a, b) in enumerate(local):
+            # local facet (0,1) -> 0, (1,2) -> 1, (0,2) -> 2
+            ix = np.array([-1, 0, 2, 1])[rank[a] + rank[b]]
+            np.put_along_axis(new_t2f, ix[None], t2f[i][None], axis=0)
+
+        self.p = np.hstack((p, new_p))
+        self.t = np.take_along_axis(t, order, axis=0)
+        self._connectivity().update({'facets': facets,
+                                     't2f': new_t2f,
+                                     'f2t': f2t})
+        self._fix_boundaries(new_facets.T)
+        return np.tile(np.arange(t.shape[1] // 4), 4), [e]
 
     def _adaptive_refine(self, marked):
         """Refine the set of provided elements."""
@@ -341,7 +323,8 @@ class MeshTri(Mesh2D):
             ix01 = (l01 > l02) * (l01 > l12)
             ix12 = (l12 > l01) * (l12 > l02)
 
-            # row swaps
+            # row swaps; t may be a read-only memory map
+            t = t.copy()
             tmp = t[2, ix01]
             t[2, ix01] = t[1, ix01]
             t[1, ix01] = tmp
@@ -410,22 +393,44 @@ class MeshTri(Mesh2D):
             p = .5 * (m.p[:, m.facets[0, facets == 1]] +
                       m.p[:, m.facets[1, facets == 1]])
 
+            # parents of the new elements
+            parents = np.concatenate((np.nonzero(rest)[0],
+                                      np.tile(np.nonzero(red)[0], 4),
+                                      np.tile(np.nonzero(blue1)[0], 3),
+                                      np.tile(np.nonzero(blue2)[0], 3),
+                                      np.tile(np.nonzero(green)[0], 2)))
+
             return np.hstack((m.p, p)),\
-                np.hstack((m.t[:, rest], t_red, t_blue1, t_blue2, t_green))
+                np.hstack((m.t[:, rest], t_red, t_blue1, t_blue2, t_green)),\
+                parents
+
+        if self.boundaries is not None:
+            boundaries = {k: self.facets[:, v]
+                          for k, v in self.boundaries.items()}
 
         sorted_mesh = MeshTri(self.p, sort_mesh(self.p, self.t), sort_t=False)
         facets = find_facets(sorted_mesh, marked)
-        self.p, self.t = split_elements(sorted_mesh, facets)
-
-        self._build_mappings()
+        self.p, t, parents = split_elements(sorted_mesh, facets)
+        self.t = np.sort(t, axis=0)
+
+        if self.boundaries is not None:
+            # split facets are replaced by their halves
+            mid = np.full(len(facets), -1, dtype=np.int64)
+            mid[facets == 1] = (np.arange(np.count_nonzero(facets))
+                                + sorted_mesh.p.shape[1])
+            for name, f in boundaries.items():
+                m = mid[find_entities(sorted_mesh.facets, f)]
+                split = m >= 0
+                self.boundaries[name] = np.sort(find_entities(
+                    self.facets,
+                    np.hstack((f[:, ~split],
+                               np.vstack((f[0, split], m[split])),
+                               np.vstack((m[split], f[1, split]))))
+                ))
+
+        return parents, [sorted_mesh.facets[:, facets == 1]]
 
     def mapping(self):
+        self._check_mapping()
         from skfem.mapping import MappingAffine
         return MappingAffine(self)
-
-    def element_finder(self):
-        from matplotlib.tri import Triangulation
-
-        return Triangulation(self.p[0],
-                             self.p[1],
-                             self.t.T).get_trifinder()
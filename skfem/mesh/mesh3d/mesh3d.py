@@ -4,6 +4,7 @@ import numpy as np
 from numpy import ndarray
 
 from ..mesh import Mesh
+from ..topology import Connectivity, find_entities
 
 
 class Mesh3D(Mesh):
@@ -16,7 +17,7 @@ class Mesh3D(Mesh):
 
     """
     p = np.zeros((3, 0), dtype=np.float64)
-    f2t = np.zeros((2, 0), dtype=np.int64)
+    f2t = Connectivity('_build_facets', np.zeros((2, 0), dtype=np.int64))
 
     def edges_satisfying(self, test: Callable[[ndarray], bool]) -> ndarray:
         """Return edges whose midpoints satisfy some condition.
@@ -32,22 +33,31 @@ class Mesh3D(Mesh):
 
     def boundary_edges(self) -> ndarray:
         """Return an array of boundary edge indices."""
-        facets = self.boundary_facets()
-        boundary_edges = np.sort(np.hstack(
-            tuple([np.vstack((self.facets[itr, facets],
-                              self.facets[(itr + 1) % self.facets.shape[0],
-                              facets]))
-                   for itr in range(self.facets.shape[0])])).T, axis=1)
-        return np.nonzero((self.edges.T[:, None] == boundary_edges)
-                          .all(-1).any(-1))[0]
+        return self._cached('boundary_edges', self._boundary_edges)
+
+    def _boundary_edges(self) -> ndarray:
+        return np.unique(self._facet_edges(self.boundary_facets()))
+
+    def _facet_edges(self, facets: ndarray) -> ndarray:
+        """Return the edges of the given facets (Nverts_per_facet x
+        Nfacets).
+
+        The vertices of the facets are in cyclic order, so consecutive
+        vertices are connected by an edge.
+
+        """
+        f = self.facets[:, facets]
+        return find_entities(self.edges,
+                             np.vstack((f.flatten(),
+                                        np.roll(f, -1, axis=0).flatten()))
+                             ).reshape(f.shape)
 
     def interior_edges(self) -> ndarray:
         """Return an array of interior edge indices."""
-        return np.setdiff1d(np.arange(self.edges.shape[1], dtype=np.int),
+        return np.setdiff1d(np.arange(self.edges.shape[1], dtype=np.int64),
                             self.boundary_edges())
 
     def param(self) -> float:
         """Return mesh parameter, viz the length of the longest edge."""
-        lengths = np.linalg.norm(
-            np.diff(self.p[:, self.edges], axis=1), axis=0)
-        return np.max(lengths)
+        return self._geometric('param', lambda: np.max(np.linalg.norm(
+            np.diff(self.p[:, self.edges], axis=1), axis=0)))
@@ -5,6 +5,7 @@ from numpy import ndarray
 
 from .mesh3d import Mesh3D
 from ..mesh import MeshType
+from ..topology import Connectivity, build_entities, refine_entities
 
 
 class MeshHex(Mesh3D):
@@ -40,10 +41,10 @@ class MeshHex(Mesh3D):
     name: str = "Hexahedral"
 
     t = np.zeros((8, 0), dtype=np.int64)
-    t2f = np.zeros((6, 0), dtype=np.int64)
-    facets = np.zeros((4, 0), dtype=np.int64)
-    edges = np.zeros((2, 0), dtype=np.int64)
-    t2e = np.zeros((12, 0), dtype=np.int64)
+    t2f = Connectivity('_build_facets', np.zeros((6, 0), dtype=np.int64))
+    facets = Connectivity('_build_facets', np.zeros((4, 0), dtype=np.int64))
+    edges = Connectivity('_build_edges', np.zeros((2, 0), dtype=np.int64))
+    t2e = Connectivity('_build_edges', np.zeros((12, 0), dtype=np.int64))
 
     def __init__(self,
                  p: Optional[ndarray] = None,
@@ -109,7 +110,6 @@ class MeshHex(Mesh3D):
         super(MeshHex, self).__init__()
         if validate:
             self._validate()
-        self._build_mappings()
 
     @classmethod
     def init_refdom(cls: Type[MeshType]):
@@ -174,85 +174,68 @@ class MeshHex(Mesh3D):
                    .reshape(ne, 1, order='F')
                    .copy()
                    .flatten())
-        return cls(p, t.astype(np.int64))
-
-    def _build_mappings(self):
-        """Build element-to-facet, element-to-edges, etc. mappings."""
-        self.edges = np.sort(np.hstack((
-            self.t[[0, 1]],
-            self.t[[0, 2]],
-            self.t[[0, 3]],
-            self.t[[1, 4]],
-            self.t[[1, 5]],
-            self.t[[2, 4]],
-            self.t[[2, 6]],
-            self.t[[3, 5]],
-            self.t[[3, 6]],
-            self.t[[4, 7]],
-            self.t[[5, 7]],
-            self.t[[6, 7]],
-        )), axis=0)
-
-        # unique edges
-        self.edges, ixa, ixb = np.unique(self.edges,
-                                         axis=1,
-                                         return_index=True,
-                                         return_inverse=True)
-        self.edges = np.ascontiguousarray(self.edges)
-
-        self.t2e = ixb.reshape((12, self.t.shape[1]))
-
-        # define facets
-        self.facets = np.hstack((
-            self.t[[0, 1, 4, 2]],
-            self.t[[0, 2, 6, 3]],
-            self.t[[0, 3, 5, 1]],
-            self.t[[2, 4, 7, 6]],
-            self.t[[1, 5, 7, 4]],
-            self.t[[3, 6, 7, 5]],
-        ))
-
-        sorted_facets = np.sort(self.facets, axis=0)
-
-        # unique facets
-        sorted_facets, ixa, ixb = np.unique(sorted_facets,
-                                            axis=1,
-                                            return_index=True,
-                                            return_inverse=True)
-        self.facets = np.ascontiguousarray(self.facets[:, ixa])
-
-        self.t2f = ixb.reshape((6, self.t.shape[1]))
-
-        # build facet-to-hexa mapping: 2 (hexes) x Nfacets
-        e_tmp = np.hstack((self.t2f[0], self.t2f[1],
-                           self.t2f[2], self.t2f[3],
-                           self.t2f[4], self.t2f[5]))
-        t_tmp = np.tile(np.arange(self.t.shape[1]), (1, 6))[0]
-
-        e_first, ix_first = np.unique(e_tmp, return_index=True)
-        e_last, ix_last = np.unique(e_tmp[::-1], return_index=True)
-        ix_last = e_tmp.shape[0] - ix_last - 1
-
-        self.f2t = np.zeros((2, self.facets.shape[1]), dtype=np.int64)
-        self.f2t[0, e_first] = t_tmp[ix_first]
-        self.f2t[1, e_last] = t_tmp[ix_last]
-
-        # second row to zero if repeated (i.e., on boundary)
-        self.f2t[1, np.nonzero(self.f2t[0, :] == self.f2t[1, :])[0]] = -1
+        mesh = cls(p, t.astype(np.int64))
+        # the grid is structured so the connectivity is found without sorting
+        mesh._connectivity().update({**mesh._build_edges(structured=True),
+                                     **mesh._build_facets(structured=True)})
+        return mesh
+
+    def _build_edges(self, structured=False):
+        """Build the edges and the element-to-edge mapping."""
+        edges, t2e, _ = build_entities(
+            self.t,
+            [[0, 1], [0, 2], [0, 3], [1, 4], [1, 5], [2, 4],
+             [2, 6], [3, 5], [3, 6], [4, 7], [5, 7], [6, 7]],
+            dtype=self._index_dtype(12 * self.t.shape[1]),
+            structured=structured
+        )
+        return {'edges': edges, 't2e': t2e}
+
+    def _build_facets(self, structured=False):
+        """Build the facets and the element-to-facet mappings."""
+        # keep the vertex order which defines the orientation
+        facets, t2f, f2t = build_entities(
+            self.t,
+            [[0, 1, 4, 2], [0, 2, 6, 3], [0, 3, 5, 1],
+             [2, 4, 7, 6], [1, 5, 7, 4], [3, 6, 7, 5]],
+            sort=False,
+            dtype=self._index_dtype(6 * self.t.shape[1]),
+            structured=structured
+        )
+        return {'facets': facets, 't2f': t2f, 'f2t': f2t}
+
+    @staticmethod
+    def _children():
+        """Return the local edges, the local faces and the labels of the
+        vertices of the children of a hexahedron."""
+        E = [(0, 1), (0, 2), (0, 3), (1, 4), (1, 5), (2, 4),
+             (2, 6), (3, 5), (3, 6), (4, 7), (5, 7), (6, 7)]
+        F = [(0, 1, 4, 2), (0, 2, 6, 3), (0, 3, 5, 1),
+             (2, 4, 7, 6), (1, 5, 7, 4), (3, 6, 7, 5)]
+        mid = tuple(range(8))
+        # build new hex indexing (this requires some serious meditation)
+        children = [
+            ((0,), E[0], E[1], E[2], F[0], F[2], F[1], mid),
+            (E[0], (1,), F[0], F[2], E[3], E[4], mid, F[4]),
+            (E[1], F[0], (2,), F[1], E[5], mid, E[6], F[3]),
+            (E[2], F[2], F[1], (3,), mid, E[7], E[8], F[5]),
+            (F[0], E[3], E[5], mid, (4,), F[4], F[3], E[9]),
+            (F[2], E[4], mid, E[7], F[4], (5,), F[5], E[10]),
+            (F[1], mid, E[6], E[8], F[3], F[5], (6,), E[11]),
+            (mid, F[4], F[3], F[5], E[9], E[10], E[11], (7,)),
+        ]
+        return E, F, children
 
     def _uniform_refine(self):
         """Perform a single mesh refine that halves 'h'. Each hex is
         split into 8."""
-        # rename variables
+        if self._midpoints:
+            return self._adaptive_refine(np.arange(self.t.shape[1]))
         t = self.t
         p = self.p
         e = self.edges
         f = self.facets
         sz = p.shape[1]
-        t2e = self.t2e + sz
-        t2f = self.t2f + np.max(t2e) + 1
-        # hex middle point
-        mid = range(self.t.shape[1]) + np.max(t2f) + 1
         # new vertices are the midpoints of edges ...
         newp1 = 0.5 * np.sum(p[:, e], axis=1)
         # ... midpoints of facets ...
@@ -260,76 +243,43 @@ class MeshHex(Mesh3D):
         # ... and element middle points
         newp3 = 0.125 * np.sum(p[:, t], axis=1)
         newp = np.hstack((p, newp1, newp2, newp3))
-        # build new hex indexing (this requires some serious meditation)
-        newt = np.vstack((t[0],
-                          t2e[0],
-                          t2e[1],
-                          t2e[2],
-                          t2f[0],
-                          t2f[2],
-                          t2f[1],
-                          mid))
-        newt = np.hstack((newt, np.vstack((t2e[0],
-                                           t[1],
-                                           t2f[0],
-                                           t2f[2],
-                                           t2e[3],
-                                           t2e[4],
-                                           mid,
-                                           t2f[4]))))
-        newt = np.hstack((newt, np.vstack((t2e[1],
-                                           t2f[0],
-                                           t[2],
-                                           t2f[1],
-                                           t2e[5],
-                                           mid,
-                                           t2e[6],
-                                           t2f[3]))))
-        newt = np.hstack((newt, np.vstack((t2e[2],
-                                           t2f[2],
-                                           t2f[1],
-                                           t[3],
-                                           mid,
-                                           t2e[7],
-                                           t2e[8],
-                                           t2f[5]))))
-        newt = np.hstack((newt, np.vstack((t2f[0],
-                                           t2e[3],
-                                           t2e[5],
-                                           mid,
-                                           t[4],
-                                           t2f[4],
-                                           t2f[3],
-                                           t2e[9]))))
-        newt = np.hstack((newt, np.vstack((t2f[2],
-                                           t2e[4],
-                                           mid,
-                                           t2e[7],
-                                           t2f[4],
-                                           t[5],
-                                           t2f[5],
-                                           t2e[10],))))
-        newt = np.hstack((newt, np.vstack((t2f[1],
-                                           mid,
-                                           t2e[6],
-                                           t2e[8],
-                                           t2f[3],
-                                           t2f[5],
-                                           t[6],
-                                           t2e[11]))))
-        newt = np.hstack((newt, np.vstack((mid,
-                                           t2f[4],
-                                           t2f[3],
-                                           t2f[5],
-                                           t2e[9],
-                                           t2e[10],
-                                           t2e[11],
-                                           t[7]))))
+        E, F, children = self._children()
+        newt, [(edges, t2e, _, _),
+               (facets, t2f, f2t, new_facets)] = refine_entities(
+            t,
+            [(None, labels) for labels in children],
+            sz,
+            e,
+            self.t2e,
+            E,
+            faces=f,
+            t2fa=self.t2f,
+            local_faces=F,
+            entities=[(E, True), (F, False)],
+            dtype=self._index_dtype(sz + 4 * (e.shape[1] + f.shape[1])
+                                    + 36 * t.shape[1])
+        )
         # update fields
         self.p = newp
         self.t = newt
+        self._connectivity().update({'edges': edges,
+                                     't2e': t2e,
+                                     'facets': facets,
+                                     't2f': t2f,
+                                     'f2t': f2t})
+        self._fix_boundaries(new_facets.T)
+        return np.tile(np.arange(t.shape[1]), 8), [e, f, t]
+
+    def _adaptive_refine(self, marked):
+        """Split the marked hexahedra into eight leaving hanging nodes.
+
+        The neighbours of the marked elements are refined as well if
+        necessary to keep the mesh 2:1 balanced over the edges.  The
+        continuity of the finite element functions over the hanging nodes
+        is enforced by :meth:`~skfem.assembly.Basis.hanging_constraints`.
 
-        self._build_mappings()
+        """
+        return self._split_elements(marked, *self._children())
 
     def save(self,
              filename: str,
@@ -347,6 +297,9 @@ class MeshHex(Mesh3D):
             ndarray for one output or dict for multiple
 
         """
+        if str(filename).endswith('.npz'):
+            return super(MeshHex, self).save(filename, point_data)
+
         import meshio
 
         # vtk requires a different ordering
@@ -367,6 +320,7 @@ class MeshHex(Mesh3D):
         meshio.write(filename, mesh)
 
     def mapping(self):
+        self._check_mapping()
         from skfem.mapping import MappingIsoparametric
         from skfem.element import ElementHex1, ElementQuad1
         return MappingIsoparametric(self, ElementHex1(), ElementQuad1())
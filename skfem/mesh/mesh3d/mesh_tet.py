@@ -5,6 +5,7 @@ from numpy import ndarray
 
 from .mesh3d import Mesh3D
 from ..mesh import MeshType
+from ..topology import Connectivity, build_entities, refine_entities
 
 
 class MeshTet(Mesh3D):
@@ -41,10 +42,10 @@ class MeshTet(Mesh3D):
     name: str = "Tetrahedral"
 
     t = np.zeros((4, 0), dtype=np.int64)
-    t2f = np.zeros((4, 0), dtype=np.int64)
-    facets = np.zeros((3, 0), dtype=np.int64)
-    edges = np.zeros((2, 0), dtype=np.int64)
-    t2e = np.zeros((6, 0), dtype=np.int64)
+    t2f = Connectivity('_build_facets', np.zeros((4, 0), dtype=np.int64))
+    facets = Connectivity('_build_facets', np.zeros((3, 0), dtype=np.int64))
+    edges = Connectivity('_build_edges', np.zeros((2, 0), dtype=np.int64))
+    t2e = Connectivity('_build_edges', np.zeros((6, 0), dtype=np.int64))
 
     def __init__(self,
                  p: Optional[ndarray] = None,
@@ -91,8 +92,6 @@ class MeshTet(Mesh3D):
         super(MeshTet, self).__init__()
         if validate:
             self._validate()
-        self.enable_facets = True
-        self._build_mappings()
 
     @classmethod
     def init_refdom(cls: Type[MeshType]) -> MeshType:
@@ -124,79 +123,24 @@ class MeshTet(Mesh3D):
         from skfem.zoo.tet_tensor import build
         return cls(*build(x, y, z))
 
-    def _build_mappings(self):
-        """Build element-to-facet, element-to-edges, etc. mappings."""
+    def _build_edges(self):
+        """Build the edges and the element-to-edge mapping."""
         # define edges: in the order (0,1) (1,2) (0,2) (0,3) (1,3) (2,3)
-        self.edges = np.sort(np.hstack((
-            self.t[[0, 1]],
-            self.t[[1, 2]],
-            self.t[[0, 2]],
-            self.t[[0, 3]],
-            self.t[[1, 3]],
-            self.t[[2, 3]]
-        )), axis=0)
-
-        # unique edges
-        self.edges, ixa, ixb = np.unique(self.edges,
-                                         axis=1,
-                                         return_index=True,
-                                         return_inverse=True)
-        self.edges = np.ascontiguousarray(self.edges)
-
-        self.t2e = ixb.reshape((6, self.t.shape[1]))
-
-        # define facets
-        if self.enable_facets:
-            self.facets = np.sort(np.hstack((
-                self.t[[0, 1, 2]],
-                self.t[[0, 1, 3]],
-                self.t[[0, 2, 3]],
-                self.t[[1, 2, 3]]
-            )), axis=0)
-
-            # unique facets
-            self.facets, ixa, ixb = np.unique(self.facets,
-                                              axis=1,
-                                              return_index=True,
-                                              return_inverse=True)
-            self.facets = np.ascontiguousarray(self.facets)
-
-            self.t2f = ixb.reshape((4, self.t.shape[1]))
-
-            # build facet-to-tetra mapping: 2 (tets) x Nfacets
-            e_tmp = np.hstack((self.t2f[0], self.t2f[1],
-                               self.t2f[2], self.t2f[3]))
-            t_tmp = np.tile(np.arange(self.t.shape[1]), (1, 4))[0]
-
-            e_first, ix_first = np.unique(e_tmp, return_index=True)
-            # this emulates matlab unique(e_tmp,'last')
-            e_last, ix_last = np.unique(e_tmp[::-1], return_index=True)
-            ix_last = e_tmp.shape[0] - ix_last-1
-
-            self.f2t = np.zeros((2, self.facets.shape[1]), dtype=np.int64)
-            self.f2t[0, e_first] = t_tmp[ix_first]
-            self.f2t[1, e_last] = t_tmp[ix_last]
-
-            # second row to zero if repeated (i.e., on boundary)
-            self.f2t[1, np.nonzero(self.f2t[0, :] == self.f2t[1, :])[0]] = -1
-
-    def refine(self, N=None):
-        """Refine the mesh, tetrahedral optimization.
-
-        Parameters
-        ----------
-        N : (optional) int
-            Perform N refinements.
-
-        """
-        if N is None:
-            return self._uniform_refine()
-        else:
-            self.enable_facets = False
-            for itr in range(N-1):
-                self._uniform_refine()
-            self.enable_facets = True
-            self._uniform_refine()
+        edges, t2e, _ = build_entities(
+            self.t,
+            [[0, 1], [1, 2], [0, 2], [0, 3], [1, 3], [2, 3]],
+            dtype=self._index_dtype(6 * self.t.shape[1])
+        )
+        return {'edges': edges, 't2e': t2e}
+
+    def _build_facets(self):
+        """Build the facets and the element-to-facet mappings."""
+        facets, t2f, f2t = build_entities(
+            self.t,
+            [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]],
+            dtype=self._index_dtype(4 * self.t.shape[1])
+        )
+        return {'facets': facets, 't2f': t2f, 'f2t': f2t}
 
     def _uniform_refine(self):
         """Perform a single mesh refine.
@@ -206,7 +150,7 @@ class MeshTet(Mesh3D):
 
           I=(0,1), II=(1,2), III=(0,2), IV=(0,3), V=(1,3), VI=(2,3)
 
-        by self._build_mappings(). Let I denote the midpoint of the edge
+        by self._build_edges(). Let I denote the midpoint of the edge
         (0,1), II denote the midpoint of the edge (1,2), etc. Then each
         tetrahedron is split into eight smaller subtetrahedra as follows.
 
@@ -229,69 +173,176 @@ class MeshTet(Mesh3D):
         the resulting mesh family.
 
         """
-        # rename variables
         t = self.t
         p = self.p
         e = self.edges
         sz = p.shape[1]
-        t2e = self.t2e + sz
+        t2e = self.t2e
         # new vertices are the midpoints of edges
         newp = .5 * np.vstack((p[0, e[0]] + p[0, e[1]],
                                p[1, e[0]] + p[1, e[1]],
                                p[2, e[0]] + p[2, e[1]]))
         newp = np.hstack((p, newp))
-        # new tets
-        newt = np.vstack((t[0], t2e[0], t2e[2], t2e[3]))
-        newt = np.hstack((newt, np.vstack((t[1], t2e[0], t2e[1], t2e[4]))))
-        newt = np.hstack((newt, np.vstack((t[2], t2e[1], t2e[2], t2e[5]))))
-        newt = np.hstack((newt, np.vstack((t[3], t2e[3], t2e[4], t2e[5]))))
         # compute middle pyramid diagonal lengths and choose shortest
-        d1 = ((newp[0, t2e[2]] - newp[0, t2e[4]]) ** 2 +
-              (newp[1, t2e[2]] - newp[1, t2e[4]]) ** 2)
-        d2 = ((newp[0, t2e[1]] - newp[0, t2e[3]]) ** 2 +
-              (newp[1, t2e[1]] - newp[1, t2e[3]]) ** 2)
-        d3 = ((newp[0, t2e[0]] - newp[0, t2e[5]]) ** 2 +
-              (newp[1, t2e[0]] - newp[1, t2e[5]]) ** 2)
+        d1 = ((newp[0, t2e[2] + sz] - newp[0, t2e[4] + sz]) ** 2 +
+              (newp[1, t2e[2] + sz] - newp[1, t2e[4] + sz]) ** 2)
+        d2 = ((newp[0, t2e[1] + sz] - newp[0, t2e[3] + sz]) ** 2 +
+              (newp[1, t2e[1] + sz] - newp[1, t2e[3] + sz]) ** 2)
+        d3 = ((newp[0, t2e[0] + sz] - newp[0, t2e[5] + sz]) ** 2 +
+              (newp[1, t2e[0] + sz] - newp[1, t2e[5] + sz]) ** 2)
         I1 = d1 < d2
         I2 = d1 < d3
         I3 = d2 < d3
-        c1 = I1 * I2
-        c2 = (~I1) * I3
-        c3 = (~I2) * (~I3)
-        # splitting the pyramid in the middle.
-        # diagonals are [2,4], [1,3] and [0,5]
-        # CASE 1: diagonal [2,4]
-        newt = np.hstack((newt, np.vstack((t2e[2, c1], t2e[4, c1],
-                                           t2e[0, c1], t2e[1, c1]))))
-        newt = np.hstack((newt, np.vstack((t2e[2, c1], t2e[4, c1],
-                                           t2e[0, c1], t2e[3, c1]))))
-        newt = np.hstack((newt, np.vstack((t2e[2, c1], t2e[4, c1],
-                                           t2e[1, c1], t2e[5, c1]))))
-        newt = np.hstack((newt, np.vstack((t2e[2, c1], t2e[4, c1],
-                                           t2e[3, c1], t2e[5, c1]))))
-        # CASE 2: diagonal [1,3]
-        newt = np.hstack((newt, np.vstack((t2e[1, c2], t2e[3, c2],
-                                           t2e[0, c2], t2e[4, c2]))))
-        newt = np.hstack((newt, np.vstack((t2e[1, c2], t2e[3, c2],
-                                           t2e[4, c2], t2e[5, c2]))))
-        newt = np.hstack((newt, np.vstack((t2e[1, c2], t2e[3, c2],
-                                           t2e[5, c2], t2e[2, c2]))))
-        newt = np.hstack((newt, np.vstack((t2e[1, c2], t2e[3, c2],
-                                           t2e[2, c2], t2e[0, c2]))))
-        # CASE 3: diagonal [0,5]
-        newt = np.hstack((newt, np.vstack((t2e[0, c3], t2e[5, c3],
-                                           t2e[1, c3], t2e[4, c3]))))
-        newt = np.hstack((newt, np.vstack((t2e[0, c3], t2e[5, c3],
-                                           t2e[4, c3], t2e[3, c3]))))
-        newt = np.hstack((newt, np.vstack((t2e[0, c3], t2e[5, c3],
-                                           t2e[3, c3], t2e[2, c3]))))
-        newt = np.hstack((newt, np.vstack((t2e[0, c3], t2e[5, c3],
-                                           t2e[2, c3], t2e[1, c3]))))
+        c1 = np.nonzero(I1 * I2)[0]
+        c2 = np.nonzero((~I1) * I3)[0]
+        c3 = np.nonzero((~I2) * (~I3))[0]
+        # labels of the midpoints, in the order of the edges
+        E = [(0, 1), (1, 2), (0, 2), (0, 3), (1, 3), (2, 3)]
+        # new tets; the first four are in the corners, the remaining
+        # split the middle pyramid along one of the diagonals
+        # [2,4], [1,3] and [0,5]
+        children = [
+            (None, ((0,), E[0], E[2], E[3])),
+            (None, ((1,), E[0], E[1], E[4])),
+            (None, ((2,), E[1], E[2], E[5])),
+            (None, ((3,), E[3], E[4], E[5])),
+        ]
+        for c, (i, j), others in [(c1, (2, 4), [(0, 1), (0, 3),
+                                                (1, 5), (3, 5)]),
+                                  (c2, (1, 3), [(0, 4), (4, 5),
+                                                (5, 2), (2, 0)]),
+                                  (c3, (0, 5), [(1, 4), (4, 3),
+                                                (3, 2), (2, 1)])]:
+            for k, m in others:
+                children.append((c, (E[i], E[j], E[k], E[m])))
+        local_facets = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        newt, [(edges, t2e, _, _),
+               (facets, t2f, f2t, new_facets)] = refine_entities(
+            t,
+            children,
+            sz,
+            e,
+            t2e,
+            E,
+            faces=self.facets,
+            t2fa=self.t2f,
+            local_faces=local_facets,
+            entities=[(E, True), (local_facets, True)],
+            dtype=self._index_dtype(sz + 3 * e.shape[1]
+                                    + 8 * t.shape[1])
+        )
         # update fields
         self.p = newp
         self.t = newt
+        self._connectivity().update({'edges': edges,
+                                     't2e': t2e,
+                                     'facets': facets,
+                                     't2f': t2f,
+                                     'f2t': f2t})
+        self._fix_boundaries(new_facets.T)
+        return np.concatenate(
+            [np.tile(np.arange(t.shape[1]), 4)]
+            + [np.tile(c, 4) for c in (c1, c2, c3)]
+        ), [e]
+
+    def _adaptive_refine(self, marked):
+        """Refine the set of provided elements by longest edge bisection.
+
+        All edges of the marked elements are marked for splitting.  The
+        marking is closed so that each element with a marked edge has also
+        its longest edge marked.  Then each element is bisected repeatedly
+        at its longest remaining marked edge until no marked edges remain.
+        The resulting mesh is conforming because the bisections of each
+        facet depend only on the marked edges of the facet.
 
-        self._build_mappings()
+        """
+        t = self.t
+        p = self.p
+        e = self.edges
+        t2e = self.t2e
+        sz = p.shape[1]
+        nelems = t.shape[1]
+
+        # rank edges by length; ties are broken by the edge index
+        length = np.sum((p[:, e[0]] - p[:, e[1]]) ** 2, axis=0)
+        rank = np.empty(e.shape[1], dtype=np.int64)
+        rank[np.lexsort((np.arange(e.shape[1]), length))] = (
+            np.arange(e.shape[1]))
+        longest = t2e[np.argmax(rank[t2e], axis=0), np.arange(nelems)]
+
+        # mark edges and close the marking
+        split = np.zeros(e.shape[1], dtype=np.bool_)
+        split[t2e[:, marked].flatten()] = True
+        while True:
+            ix = split[t2e].any(axis=0) & ~split[longest]
+            if not ix.any():
+                break
+            split[longest[ix]] = True
+
+        # midpoints of the split edges are numbered after the old vertices
+        ix = np.nonzero(split)[0]
+        if len(ix) == 0:
+            return np.arange(nelems), []
+        keys = e[0, ix].astype(np.int64) * sz + e[1, ix]
+        order = np.argsort(keys)
+        keys = keys[order]
+        mid = (sz + order).astype(t.dtype)
+        rank = rank[ix[order]]
+        new_vertices = e[:, ix]
+        newp = np.hstack((p, .5 * (p[:, e[0, ix]] + p[:, e[1, ix]])))
+
+        # local edges of a tetrahedron
+        A = np.array([0, 1, 0, 0, 1, 2])
+        B = np.array([1, 2, 2, 3, 3, 3])
+
+        def find(u, v):
+            """Find the split edge between the vertices u and v."""
+            key = np.minimum(u, v).astype(np.int64) * sz + np.maximum(u, v)
+            loc = np.minimum(np.searchsorted(keys, key), len(keys) - 1)
+            found = (u < sz) & (v < sz) & (keys[loc] == key)
+            return np.where(found, loc, -1)
+
+        # facets of the parent elements, indexed by the opposite vertex
+        T = t
+        F = self.t2f[[3, 2, 1, 0]]
+        P = np.arange(nelems)
+        finished = []
+        while T.shape[1] > 0:
+            E = np.vstack(tuple(find(T[a], T[b]) for a, b in zip(A, B)))
+            R = np.where(E >= 0, rank[np.maximum(E, 0)], -1)
+            active = R.max(axis=0) >= 0
+            finished.append((T[:, ~active], F[:, ~active], P[~active]))
+            T, F, P, E, R = (T[:, active], F[:, active], P[active],
+                             E[:, active], R[:, active])
+            n = T.shape[1]
+            j = np.argmax(R, axis=0)
+            a, b = A[j], B[j]
+            m = mid[E[j, np.arange(n)]]
+            # the first child replaces b by the midpoint and the second
+            # child replaces a; the facet between the children is new
+            T1, T2 = T.copy(), T.copy()
+            T1[b, np.arange(n)] = m
+            T2[a, np.arange(n)] = m
+            F1, F2 = F.copy(), F.copy()
+            F1[a, np.arange(n)] = -1
+            F2[b, np.arange(n)] = -1
+            T = np.hstack((T1, T2))
+            F = np.hstack((F1, F2))
+            P = np.hstack((P, P))
+
+        T, F, P = (np.hstack(arrays) for arrays in zip(*finished))
+
+        self.p = newp
+        self.t = T
+
+        if self.boundaries is not None:
+            # facets that lie on the old facets
+            t2f = self.t2f[[3, 2, 1, 0]]
+            for name in self.boundaries:
+                ix = np.isin(F, self.boundaries[name])
+                self.boundaries[name] = np.unique(t2f[ix])
+
+        return P, [new_vertices]
 
     def shapereg(self):
         """Return the largest shape-regularity constant."""
@@ -299,9 +350,14 @@ class MeshTet(Mesh3D):
             return np.sqrt(np.sum((self.p[:, self.edges[0, self.t2e[n]]] -
                                    self.p[:, self.edges[1, self.t2e[n]]]) ** 2,
                                   axis=0))
-        edgelenmat = np.vstack(tuple(edgelen(i) for i in range(6)))
-        return np.max(np.max(edgelenmat, axis=0) / np.min(edgelenmat, axis=0))
+
+        def shapereg():
+            edgelenmat = np.vstack(tuple(edgelen(i) for i in range(6)))
+            return np.max(np.max(edgelenmat, axis=0)
+                          / np.min(edgelenmat, axis=0))
+        return self._geometric('shapereg', shapereg)
 
     def mapping(self):
+        self._check_mapping()
         from skfem.mapping import MappingAffine
         return MappingAffine(self)
@@ -4,6 +4,7 @@ import numpy as np
 from numpy import ndarray
 
 from ..mesh import Mesh, MeshType
+from .topology import Connectivity, build_f2t
 
 
 class MeshLine(Mesh):
@@ -16,8 +17,9 @@ class MeshLine(Mesh):
 
     p = np.zeros((1, 0), dtype=np.float64)
     t = np.zeros((2, 0), dtype=np.int64)
-    t2f = np.zeros((1, 0), dtype=np.int64)
-    f2t = np.zeros((2, 0), dtype=np.int64)
+    facets = Connectivity('_build_facets')
+    t2f = Connectivity('_build_facets', np.zeros((1, 0), dtype=np.int64))
+    f2t = Connectivity('_build_facets', np.zeros((2, 0), dtype=np.int64))
 
     def __init__(self,
                  p: ndarray = None,
@@ -52,11 +54,11 @@ class MeshLine(Mesh):
         self.boundaries = boundaries
         self.subdomains = subdomains
 
-        self.facets = np.arange(self.p.shape[1])[None, :]
-        self.t = np.vstack([self.facets[0, :-1],
-                            self.facets[0, 1:]]) if t is None else t
+        if t is None:
+            ix = np.arange(self.p.shape[1], dtype=np.int64)
+            t = np.vstack((ix[:-1], ix[1:]))
+        self.t = t
         super(MeshLine, self).__init__()
-        self._build_mappings()
 
         if validate:
             self._validate()
@@ -66,24 +68,13 @@ class MeshLine(Mesh):
         """Initialise a mesh consisting of the reference interval [0,1]."""
         return cls()
 
-    def _build_mappings(self):
-        """Build t2f and f2t"""
-
-        self.t2f = self.t
-        # build f2t
-        e_tmp = np.hstack((self.t2f[0, :], self.t2f[1, :]))
-        t_tmp = np.tile(np.arange(self.t.shape[1]), (1, 2))[0]
-
-        e_first, ix_first = np.unique(e_tmp, return_index=True)
-        e_last, ix_last = np.unique(e_tmp[::-1], return_index=True)
-        ix_last = e_tmp.shape[0] - ix_last - 1
-
-        self.f2t = np.zeros((2, self.facets.shape[1]), dtype=np.int64)
-        self.f2t[0, e_first] = t_tmp[ix_first]
-        self.f2t[1, e_last] = t_tmp[ix_last]
-
-        # second row to zero if repeated (i.e., on boundary)
-        self.f2t[1, np.nonzero(self.f2t[0, :] == self.f2t[1, :])[0]] = -1
+    def _build_facets(self):
+        """Build facets, t2f and f2t; the facets are the vertices."""
+        facets = np.arange(self.p.shape[1], dtype=self.t.dtype)[None, :]
+        f2t = build_f2t(self.t,
+                        facets.shape[1],
+                        dtype=self._index_dtype(self.t.shape[1]))
+        return {'facets': facets, 't2f': self.t, 'f2t': f2t}
 
     def _adaptive_refine(self, marked):
         """Perform an adaptive refine which splits each marked element into
@@ -92,7 +83,7 @@ class MeshLine(Mesh):
         t = self.t
         p = self.p
 
-        mid = range(len(marked)) + np.max(t) + 1
+        mid = np.arange(len(marked), dtype=t.dtype) + np.max(t) + 1
 
         nonmarked = np.setdiff1d(np.arange(t.shape[1]), marked)
 
@@ -107,7 +98,7 @@ class MeshLine(Mesh):
         self.p = newp
         self.t = newt
 
-        self._build_mappings()
+        return np.concatenate((nonmarked, marked, marked)), [t[:, marked]]
 
     def nodes_satisfying(self, test):
         """Return nodes that satisfy some condition.
@@ -134,13 +125,12 @@ class MeshLine(Mesh):
         newt[0, 1::2] = p.shape[1] + np.arange(self.t.shape[1])
         newt[1, ::2] = newt[0, 1::2]
         newt[1, 1::2] = self.t[1]
+        parents = np.repeat(np.arange(self.t.shape[1]), 2)
+        new_vertices = self.t
         # update fields
         self.p = newp
-        self.facets = np.hstack(
-            [self.facets,
-             self.facets.shape[1] + np.arange(self.t.shape[1])[None, :]])
         self.t = newt
-        self._build_mappings()
+        return parents, [new_vertices]
 
     def boundary_nodes(self):
         """Find the boundary nodes of the mesh."""
@@ -162,6 +152,7 @@ class MeshLine(Mesh):
                              - self.p[0, self.t[0, :]]))
 
     def mapping(self):
+        self._check_mapping()
         from skfem.mapping import MappingAffine
         return MappingAffine(self)
 
@@ -0,0 +1,98 @@
+"""Orderings of points and graphs for improving memory locality."""
+
+from typing import Tuple
+
+import numpy as np
+from numpy import ndarray
+
+
+def _quantize(x: ndarray) -> Tuple[ndarray, int]:
+    """Scale the points to integers so that the keys fit into uint64."""
+    x = np.nan_to_num(np.atleast_2d(x))
+    bits = 63 // x.shape[0]
+    lo = x.min(axis=1)[:, None]
+    scale = x.max(axis=1)[:, None] - lo
+    scale[scale == 0.] = 1.
+    return ((x - lo) / scale * (2 ** bits - 1)).astype(np.uint64), bits
+
+
+def morton_order(x: ndarray) -> ndarray:
+    """Return a permutation sorting points along a Morton (Z-order) curve.
+
+    Parameters
+    ----------
+    x
+        An array of points (dim x Npoints).
+
+    Returns
+    -------
+    ndarray
+        The permutation, i.e. `x[:, morton_order(x)]` is sorted.
+
+    """
+    q, bits = _quantize(x)
+    dim = q.shape[0]
+
+    key = np.zeros(x.shape[1], dtype=np.uint64)
+    for b in range(bits):
+        for d in range(dim):
+            key |= (((q[d] >> np.uint64(b)) & np.uint64(1))
+                    << np.uint64(dim * b + d))
+
+    return np.argsort(key, kind='stable')
+
+
+def hilbert_order(x: ndarray) -> ndarray:
+    """Return a permutation sorting points along a Hilbert curve.
+
+    Unlike the Morton curve, the Hilbert curve has no jumps: points which
+    are close along the curve are close in space.  The keys are computed
+    using the algorithm of J. Skilling, Programming the Hilbert curve, AIP
+    Conference Proceedings 707 (2004).
+
+    Parameters
+    ----------
+    x
+        An array of points (dim x Npoints).
+
+    Returns
+    -------
+    ndarray
+        The permutation, i.e. `x[:, hilbert_order(x)]` is sorted.
+
+    """
+    X, bits = _quantize(x)
+    dim = X.shape[0]
+    zero = np.uint64(0)
+
+    # inverse undo excess work
+    Q = 1 << (bits - 1)
+    while Q > 1:
+        P = np.uint64(Q - 1)
+        for i in range(dim):
+            flip = (X[i] & np.uint64(Q)) != zero
+            X[0] = np.where(flip, X[0] ^ P, X[0])
+            swap = np.where(flip, zero, (X[0] ^ X[i]) & P)
+            X[0] ^= swap
+            X[i] ^= swap
+        Q >>= 1
+
+    # Gray encode
+    for i in range(1, dim):
+        X[i] ^= X[i - 1]
+    t = np.zeros(X.shape[1], dtype=np.uint64)
+    Q = 1 << (bits - 1)
+    while Q > 1:
+        t ^= np.where((X[dim - 1] & np.uint64(Q)) != zero,
+                      np.uint64(Q - 1), zero)
+        Q >>= 1
+    X ^= t
+
+    # interleave the bits of the transposed index
+    key = np.zeros(X.shape[1], dtype=np.uint64)
+    for b in range(bits):
+        for i in range(dim):
+            key |= (((X[i] >> np.uint64(b)) & np.uint64(1))
+                    << np.uint64(dim * b + dim - 1 - i))
+
+    return np.argsort(key, kind='stable')
@@ -0,0 +1,207 @@
+"""Partition the elements of a mesh into parts."""
+
+from typing import Callable, List, Tuple
+
+import numpy as np
+from numpy import ndarray
+from scipy.sparse import coo_matrix, spmatrix
+from scipy.sparse.csgraph import shortest_path
+
+from .mesh import Mesh
+from .ordering import hilbert_order
+
+
+class MeshPartition:
+    """A partition of the elements of a mesh into parts.
+
+    Each vertex and facet is owned by the part with the smallest label among
+    the elements containing it.  The vertices and facets of the elements of
+    a part which are owned by another part are the ghosts of the part:
+
+    >>> from skfem import MeshTri
+    >>> m = MeshTri()
+    >>> m.refine(3)
+    >>> partition = m.partition(4)
+    >>> [len(e) for e in partition.elements]
+    [32, 32, 32, 32]
+    >>> sum(len(v) for v in partition.owned_vertices) == m.p.shape[1]
+    True
+
+    Attributes
+    ----------
+    mesh
+        The partitioned mesh.
+    labels
+        The part of each element.
+    elements
+        `elements[i]` contains the elements of the part `i`.
+    owned_vertices
+        `owned_vertices[i]` contains the vertices owned by the part `i`.
+    ghost_vertices
+        `ghost_vertices[i]` contains the vertices of the elements of the
+        part `i` owned by other parts.
+    owned_facets
+        `owned_facets[i]` contains the facets owned by the part `i`.
+    ghost_facets
+        `ghost_facets[i]` contains the facets of the elements of the part
+        `i` owned by other parts.
+
+    """
+
+    mesh: Mesh
+    labels: ndarray
+    elements: List[ndarray]
+    owned_vertices: List[ndarray]
+    ghost_vertices: List[ndarray]
+    owned_facets: List[ndarray]
+    ghost_facets: List[ndarray]
+
+    def __init__(self, mesh: Mesh, labels: ndarray):
+        """Group the elements, the vertices and the facets by part.
+
+        Parameters
+        ----------
+        mesh
+            The mesh.
+        labels
+            The part of each element, from 0 to the number of parts minus
+            one.
+
+        """
+        self.mesh = mesh
+        self.labels = np.asarray(labels, dtype=np.int64)
+        if self.labels.shape != (mesh.t.shape[1],):
+            raise ValueError("The labels must be given for each element.")
+        nparts = self.labels.max(initial=-1) + 1
+
+        order = np.argsort(self.labels, kind='stable')
+        self.elements = np.split(order, np.searchsorted(
+            self.labels[order], np.arange(1, nparts)))
+        self.owned_vertices, self.ghost_vertices = self._split(
+            mesh.t, mesh.p.shape[1], nparts)
+        self.owned_facets, self.ghost_facets = self._split(
+            mesh.t2f, mesh.facets.shape[1], nparts)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _split(self,
+               entities: ndarray,
+               nentities: int,
+               nparts: int) -> Tuple[List[ndarray], List[ndarray]]:
+        """Find the owned and the ghost entities of each part."""
+        labels = np.broadcast_to(self.labels, entities.shape).flatten()
+        owner = np.full(nentities, nparts, dtype=np.int64)
+        np.minimum.at(owner, entities.flatten(), labels)
+
+        # the pairs (part, entity) sorted by part
+        pairs = np.unique(labels * nentities + entities.flatten())
+        part, ents = np.divmod(pairs, nentities)
+        owned = owner[ents] == part
+        owned_ents, ghost_ents = [], []
+        for mask, out in [(owned, owned_ents), (~owned, ghost_ents)]:
+            out.extend(np.split(ents[mask], np.searchsorted(
+                part[mask], np.arange(1, nparts))))
+        return owned_ents, ghost_ents
+
+    def interface_facets(self) -> ndarray:
+        """Return the facets between elements of different parts."""
+        facets = self.mesh.interior_facets()
+        f2t = self.mesh.f2t[:, facets]
+        return facets[self.labels[f2t[0]] != self.labels[f2t[1]]]
+
+    def submesh(self, part: int) -> Tuple[Mesh, ndarray, ndarray, ndarray]:
+        """Extract the elements of a part as a new mesh.
+
+        Parameters
+        ----------
+        part
+            The part.
+
+        Returns
+        -------
+        Mesh
+            The mesh of the part.
+        ndarray
+            The vertex of the original mesh for each vertex.
+        ndarray
+            The facet of the original mesh for each facet.
+        ndarray
+            The element of the original mesh for each element.
+
+        """
+        return self.mesh.submesh(self.elements[part])
+
+
+def _bisect(key: Callable[[ndarray], ndarray],
+            nelems: int,
+            nparts: int) -> ndarray:
+    """Split the elements recursively in proportion to the parts.
+
+    `key` returns the values of a subset of elements to sort before
+    cutting the subset in two.
+
+    """
+    labels = np.empty(nelems, dtype=np.int64)
+    stack = [(np.arange(nelems), 0, nparts)]
+    while stack:
+        ix, first, n = stack.pop()
+        if n == 1:
+            labels[ix] = first
+            continue
+        half = n // 2
+        order = ix[np.argsort(key(ix), kind='stable')]
+        cut = (len(ix) * half + n // 2) // n
+        stack.append((order[:cut], first, half))
+        stack.append((order[cut:], first + half, n - half))
+    return labels
+
+
+def _adjacency(mesh: Mesh) -> spmatrix:
+    """Return the graph of the elements sharing a facet."""
+    f2t = mesh.f2t[:, mesh.f2t[1] >= 0]
+    nelems = mesh.t.shape[1]
+    A = coo_matrix((np.ones(f2t.shape[1]), (f2t[0], f2t[1])),
+                   shape=(nelems, nelems))
+    return (A + A.T).tocsr()
+
+
+def partition(mesh: Mesh, nparts: int, method: str = 'rcb') -> ndarray:
+    """Return the part of each element, see
+    :meth:`~skfem.mesh.Mesh.partition`."""
+    nelems = mesh.t.shape[1]
+    if not 1 <= nparts <= nelems:
+        raise ValueError("The number of parts must be between one and "
+                         "the number of elements.")
+
+    if method == 'sfc':
+        labels = np.empty(nelems, dtype=np.int64)
+        labels[hilbert_order(mesh.element_midpoints())] = (
+            np.arange(nelems) * nparts // nelems
+        )
+        return labels
+
+    if method == 'rcb':
+        x = mesh.element_midpoints()
+
+        def key(ix):
+            # cut across the longest side of the bounding box
+            y = x[:, ix]
+            return y[np.argmax(np.ptp(y, axis=1))]
+
+    elif method == 'graph':
+        A = _adjacency(mesh)
+
+        def key(ix):
+            # the level sets of the distance from a pseudo-peripheral
+            # element of the subgraph
+            B = A[ix][:, ix]
+            d = shortest_path(B, unweighted=True, indices=0)
+            start = np.argmax(np.where(np.isinf(d), -1, d))
+            return shortest_path(B, unweighted=True, indices=start)
+
+    else:
+        raise ValueError("Unknown partitioning method '{}'; expected "
+                         "'rcb', 'sfc' or 'graph'.".format(method))
+
+    return _bisect(key, nelems, nparts)
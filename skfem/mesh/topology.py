@@ -0,0 +1,550 @@
+"""Construction of the mesh topology, i.e. the unique edges and facets and
+the mappings between them and the elements.
+
+The numbering of the sub-entities depends on how the mesh was created:
+
+- In general, the sorted vertex tuples of the sub-entities are encoded into
+  integer keys which are sorted once, so the sub-entities are numbered in
+  the lexicographic order of their sorted vertex tuples.
+- The sub-entities of structured meshes, e.g., from `init_tensor`, are
+  numbered by their shape and then by their lowest vertex without sorting,
+  see :func:`build_entities`.
+- The sub-entities of uniformly refined meshes are numbered from the parent
+  mesh without sorting: first the halves of the parent edges in the order
+  of the parent edges, then the parts of the parent faces and finally the
+  sub-entities inside the parent elements, see :func:`refine_entities`.
+
+Hence the numbering is not, in general, lexicographic and code should not
+rely on it; use :func:`find_entities` or :class:`EntityIndex` to look up
+given vertex tuples.
+
+"""
+
+from itertools import permutations
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+
+def encode(ents: ndarray, nverts: int) -> ndarray:
+    """Encode columns of sorted vertex indices into integer keys.
+
+    The keys are ordered as the columns in lexicographic order.
+
+    Parameters
+    ----------
+    ents
+        An array of vertex indices (nverts_per_entity x Nentities).  Each
+        column must be sorted.
+    nverts
+        An upper bound for the vertex indices.
+
+    """
+    key = ents[0].astype(np.int64)
+    for row in ents[1:]:
+        if (int(key.max(initial=0)) + 1) * nverts > np.iinfo(np.int64).max:
+            # renumber the prefixes to avoid overflow
+            _, key = np.unique(key, return_inverse=True)
+        key = key * nverts + row
+    return key
+
+
+def unique_keys(keys: ndarray) -> Tuple[ndarray, ndarray, ndarray]:
+    """Find unique keys using a single sort.
+
+    Returns
+    -------
+    first
+        The index of the first occurrence of each unique key.
+    last
+        The index of the last occurrence of each unique key.
+    inverse
+        For each key, the index of the corresponding unique key.
+
+    """
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    flag = np.empty(len(keys), dtype=np.bool_)
+    flag[:1] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=flag[1:])
+    starts = np.nonzero(flag)[0]
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(flag) - 1
+    ends = np.append(starts[1:], len(keys)) - 1
+    return order[starts], order[ends], inverse
+
+
+def compact_keys(keys: ndarray, nkeys: int) -> Tuple[ndarray, int]:
+    """Number the distinct keys from a bounded range without sorting.
+
+    The keys keep their relative order.
+
+    Parameters
+    ----------
+    keys
+        An array of integers in the range [0, nkeys).
+    nkeys
+        An upper bound for the keys.
+
+    Returns
+    -------
+    inverse
+        For each key, the index of the corresponding distinct key.
+    int
+        The number of distinct keys.
+
+    """
+    used = np.zeros(nkeys, dtype=np.bool_)
+    used[keys] = True
+    index = np.cumsum(used) - 1
+    return index[keys], int(index[-1]) + 1 if nkeys > 0 else 0
+
+
+def first_last(inverse: ndarray, n: int) -> Tuple[ndarray, ndarray]:
+    """Find the first and the last occurrence of each entity by scattering.
+
+    Exact if each entity occurs at most twice, e.g. for the facets of a
+    conforming mesh; otherwise, some two occurrences are returned.
+
+    Parameters
+    ----------
+    inverse
+        The entity corresponding to each occurrence.
+    n
+        The number of entities.
+
+    Returns
+    -------
+    first
+        The index of the first occurrence of each entity, or -1.
+    last
+        The index of the last occurrence of each entity, or -1.
+
+    """
+    pos = np.arange(len(inverse))
+    first = np.full(n, -1, dtype=np.int64)
+    first[inverse] = pos
+    other = first[inverse] != pos
+    last = first.copy()
+    last[inverse[other]] = pos[other]
+    return np.minimum(first, last), np.maximum(first, last)
+
+
+def _structured_keys(t: ndarray,
+                     local: Sequence[Sequence[int]],
+                     nverts: int) -> Optional[Tuple[ndarray, int]]:
+    """Key the sub-entities by their lowest vertex and their shape.
+
+    Applies if each local sub-entity has the same shape in every element,
+    i.e. its vertex indices have constant offsets from its lowest vertex.
+    This holds, for example, for the meshes created by `init_tensor`.
+
+    """
+    shapes: Dict[Tuple[int, ...], int] = {}
+    keys = []
+    for ix in local:
+        ent = np.sort(t[list(ix)], axis=0)
+        offsets = ent - ent[0]
+        if ent.shape[1] > 0 and (offsets != offsets[:, :1]).any():
+            return None
+        shape = tuple(offsets[:, 0]) if ent.shape[1] > 0 else ()
+        keys.append(shapes.setdefault(shape, len(shapes)) * nverts
+                    + ent[0].astype(np.int64))
+    return np.concatenate(keys), len(shapes) * nverts
+
+
+def build_entities(t: ndarray,
+                   local: Sequence[Sequence[int]],
+                   sort: bool = True,
+                   dtype=np.int64,
+                   structured: bool = False) -> Tuple[ndarray,
+                                                      ndarray,
+                                                      ndarray]:
+    """Find the unique sub-entities (edges or facets) of the elements.
+
+    Parameters
+    ----------
+    t
+        The element connectivity (nverts_per_elem x Nelems).
+    local
+        Local vertex indices of the sub-entities, e.g. `[(0, 1), (1, 2),
+        (0, 2)]` for the edges of a triangle.
+    sort
+        If `True`, the vertices of the returned entities are sorted.
+        Otherwise, the vertex order of the first occurrence is kept.
+    dtype
+        The integer type of the returned mappings.
+    structured
+        If `True` and each local sub-entity has the same shape in every
+        element, the entities are numbered by their shape and lowest vertex
+        without sorting.  Otherwise, the numbering is lexicographic.
+
+    Returns
+    -------
+    ents
+        The unique entities (nverts_per_entity x Nentities).
+    t2ents
+        The entities of each element (len(local) x Nelems).
+    f2t
+        The elements next to each entity (2 x Nentities).  The second row
+        is -1 if the entity belongs to only one element.  Meaningful only
+        for facets.
+
+    """
+    nelems = t.shape[1]
+    ents = np.hstack(tuple(t[list(ix)] for ix in local))
+    nverts = int(t.max(initial=0)) + 1
+    keys = _structured_keys(t, local, nverts) if structured else None
+
+    if keys is not None:
+        inverse, n = compact_keys(*keys)
+        first, last = first_last(inverse, n)
+        ents = ents[:, first]
+        if sort:
+            ents = np.sort(ents, axis=0)
+    else:
+        sorted_ents = np.sort(ents, axis=0)
+        first, last, inverse = unique_keys(encode(sorted_ents, nverts))
+        ents = sorted_ents[:, first] if sort else ents[:, first]
+
+    t2ents = inverse.reshape((len(local), nelems)).astype(dtype)
+
+    f2t = np.empty((2, len(first)), dtype=dtype)
+    f2t[0] = first % nelems
+    f2t[1] = last % nelems
+    f2t[1, first == last] = -1
+
+    return np.ascontiguousarray(ents), t2ents, f2t
+
+
+def build_f2t(t2f: ndarray, nfacets: int, dtype=np.int64) -> ndarray:
+    """Build the facet-to-element mapping from the element-to-facet mapping.
+
+    Parameters
+    ----------
+    t2f
+        The facets of each element (nfacets_per_elem x Nelems).
+    nfacets
+        The total number of facets.
+
+    Returns
+    -------
+    ndarray
+        The elements next to each facet (2 x Nfacets).  The second row is -1
+        if the facet belongs to only one element.
+
+    """
+    nelems = t2f.shape[1]
+    first, last = first_last(t2f.flatten(), nfacets)
+    f2t = np.zeros((2, nfacets), dtype=dtype)
+    f2t[1] = -1
+    ix = first >= 0
+    f2t[0, ix] = first[ix] % nelems
+    shared = first != last
+    f2t[1, shared] = last[shared] % nelems
+    return f2t
+
+
+def find_entities(ents: ndarray, query: ndarray) -> ndarray:
+    """Find sub-entities by their vertices.
+
+    Parameters
+    ----------
+    ents
+        The entities to search from (nverts_per_entity x Nentities).
+    query
+        The entities to search for (nverts_per_entity x Nquery).  The order
+        of the vertices within the columns is irrelevant.
+
+    Returns
+    -------
+    ndarray
+        For each column of `query`, the index of the matching column of
+        `ents` or -1 if not found.
+
+    """
+    if ents.shape[1] == 0 or query.shape[1] == 0:
+        return np.full(query.shape[1], -1, dtype=np.int64)
+    nverts = int(max(ents.max(), query.max())) + 1
+    keys = encode(np.sort(np.hstack((ents, query)), axis=0), nverts)
+    keys, qkeys = keys[:ents.shape[1]], keys[ents.shape[1]:]
+    order = np.argsort(keys, kind='stable')
+    pos = np.searchsorted(keys, qkeys, sorter=order)
+    ix = order[np.minimum(pos, len(keys) - 1)]
+    return np.where(keys[ix] == qkeys, ix, -1)
+
+
+class EntityIndex:
+    """A search index mapping vertex tuples to sub-entities.
+
+    The sorted vertex tuples are encoded row by row.  Before appending a
+    row, the encoded prefixes are replaced by their ranks among the distinct
+    prefixes so that the keys never overflow.  The queries are encoded
+    using the same ranks and looked up by a binary search.
+
+    """
+
+    def __init__(self, ents: ndarray):
+        """Build the index for the entities (nverts_per_entity x
+        Nentities)."""
+        ents = np.sort(ents, axis=0)
+        self.nverts = int(ents.max(initial=-1)) + 1
+        self.prefixes = []
+        key = ents[0].astype(np.int64)
+        for row in ents[1:]:
+            prefix = np.unique(key)
+            self.prefixes.append(prefix)
+            key = np.searchsorted(prefix, key) * self.nverts + row
+        self.order = np.argsort(key, kind='stable')
+        self.keys = key[self.order]
+
+    def find(self, query: ndarray) -> ndarray:
+        """Find entities by their vertices.
+
+        Parameters
+        ----------
+        query
+            The entities to search for (nverts_per_entity x Nquery).  The
+            order of the vertices within the columns is irrelevant.
+
+        Returns
+        -------
+        ndarray
+            For each column of `query`, the index of the matching entity or
+            -1 if not found.
+
+        """
+        query = np.sort(np.asarray(query), axis=0)
+        if len(self.keys) == 0 or query.shape[1] == 0:
+            return np.full(query.shape[1], -1, dtype=np.int64)
+        found = ((query >= 0) & (query < self.nverts)).all(axis=0)
+        key = query[0].astype(np.int64)
+        for prefix, row in zip(self.prefixes, query[1:]):
+            pos = np.minimum(np.searchsorted(prefix, key), len(prefix) - 1)
+            found &= prefix[pos] == key
+            key = pos * self.nverts + row
+        pos = np.minimum(np.searchsorted(self.keys, key), len(self.keys) - 1)
+        found &= self.keys[pos] == key
+        return np.where(found, self.order[pos], -1)
+
+
+def refine_entities(t: ndarray,
+                    children: Sequence[Tuple[Optional[ndarray],
+                                             Sequence[Sequence[int]]]],
+                    nverts: int,
+                    edges: ndarray,
+                    t2e: ndarray,
+                    local_edges: Sequence[Sequence[int]],
+                    faces: Optional[ndarray] = None,
+                    t2fa: Optional[ndarray] = None,
+                    local_faces: Sequence[Sequence[int]] = (),
+                    entities: Sequence[Tuple[Sequence[Sequence[int]],
+                                             bool]] = (),
+                    dtype=np.int64):
+    """Build the elements and the sub-entities of a refined mesh.
+
+    The new vertices are numbered as follows: first the vertices of the
+    parent mesh, then the midpoints of the edges, the centres of the faces
+    and the centres of the elements.  The sub-entities of the refined mesh
+    are found from their position within the parent elements, faces and
+    edges so that no global sorting is needed.
+
+    Parameters
+    ----------
+    t
+        The parent element connectivity (nverts_per_elem x Nelems).
+    children
+        The new elements as pairs `(tind, labels)`.  The parent elements
+        `tind` (or all elements if `None`) are each split into one child
+        whose vertices are given by `labels`.  A label is a tuple of local
+        vertex indices of the parent element: a single vertex, the vertices
+        of an edge or a face (the midpoint), or all vertices (the centre).
+    nverts
+        The number of vertices in the parent mesh.
+    edges
+        The edges of the parent mesh (2 x Nedges).  These are the facets
+        in two dimensions.
+    t2e
+        The edges of each parent element.
+    local_edges
+        The local vertex indices of the parent edges.
+    faces
+        Optionally, the two-dimensional faces of the parent mesh.
+    t2fa
+        The faces of each parent element.
+    local_faces
+        The local vertex indices of the parent faces.
+    entities
+        The sub-entities to build as pairs `(local, sort)` where `local` are
+        the local vertex indices of the sub-entity in a child element; see
+        :func:`build_entities`.
+
+    Returns
+    -------
+    t
+        The refined element connectivity.
+    list
+        For each requested sub-entity, a tuple `(ents, t2ents, f2t, sub)`
+        where `sub` gives the children of each parent edge (or face, if the
+        sub-entities have more than two vertices).
+
+    """
+    nelems = t.shape[1]
+    ne = edges.shape[1]
+    nfa = 0 if faces is None else faces.shape[1]
+    edge_ix = {frozenset(e): j for j, e in enumerate(local_edges)}
+    face_ix = {frozenset(f): j for j, f in enumerate(local_faces)}
+    centre = frozenset(range(t.shape[0]))
+    elems = np.arange(nelems)
+    cache: Dict[Tuple, ndarray] = {}
+
+    def cached(key, fun, tind):
+        if key not in cache:
+            cache[key] = fun()
+        return cache[key] if tind is None else cache[key][tind]
+
+    def point(label, tind):
+        s = frozenset(label)
+        if len(s) == 1:
+            return t[label[0]] if tind is None else t[label[0], tind]
+        if s in edge_ix:
+            return cached(s, lambda: nverts + t2e[edge_ix[s]], tind)
+        if s in face_ix:
+            return cached(s, lambda: nverts + ne + t2fa[face_ix[s]], tind)
+        if s == centre:
+            return cached(s, lambda: nverts + ne + nfa + elems, tind)
+        raise ValueError("Unknown label {}.".format(label))
+
+    def half(j, v):
+        """Is local vertex v the second vertex of the edge j?"""
+        return t[v] != edges[0, t2e[j]]
+
+    def rank_code(f):
+        """Encode the positions of the local face vertices in faces."""
+        n = len(local_faces[f])
+        code = np.zeros(nelems, dtype=np.int64)
+        F = faces[:, t2fa[f]]
+        for i, v in enumerate(local_faces[f]):
+            code += np.argmax(F == t[v], axis=0) * n ** i
+        return code
+
+    newt = np.hstack(tuple(
+        np.vstack(tuple(point(label, tind) for label in labels))
+        for tind, labels in children
+    )).astype(dtype)
+
+    out = []
+    for local, sort in entities:
+        face_keys: Dict[frozenset, int] = {}
+        interior_keys: Dict[frozenset, int] = {}
+        slots = []
+        for tind, labels in children:
+            for ix in local:
+                ent = [labels[i] for i in ix]
+                support = frozenset().union(*ent)
+                if len(ix) == 2 and support in edge_ix:
+                    # half of a parent edge
+                    j = edge_ix[support]
+                    v = [label for label in ent if len(label) == 1][0][0]
+                    E = t2e[j] if tind is None else t2e[j, tind]
+                    slots.append((0, E, 2 * E + cached(
+                        ('half', j, v), lambda: half(j, v), tind)))
+                elif support in face_ix:
+                    # part of a parent face; the key must not depend on
+                    # the element so use the positions in faces[:, F]
+                    f = face_ix[support]
+                    lf = list(local_faces[f])
+                    n = len(lf)
+                    lut = np.zeros(n ** n, dtype=np.int64)
+                    for perm in permutations(range(n)):
+                        key = frozenset(frozenset(perm[lf.index(v)]
+                                                  for v in label)
+                                        for label in ent)
+                        lut[sum(r * n ** i for i, r in enumerate(perm))] = (
+                            face_keys.setdefault(key, len(face_keys)))
+                    F = t2fa[f] if tind is None else t2fa[f, tind]
+                    code = cached(('code', f), lambda: rank_code(f), tind)
+                    slots.append((1, F, lut[code]))
+                else:
+                    key = frozenset(frozenset(label) for label in ent)
+                    slots.append((2, elems if tind is None else tind,
+                                  interior_keys.setdefault(
+                                      key, len(interior_keys))))
+
+        nsub = len(face_keys)
+        nint = len(interior_keys)
+        offsets = (0, 2 * ne, 2 * ne + nfa * nsub)
+        keys = np.concatenate(tuple(
+            offsets[kind] + (sub if kind == 0 else
+                             ix * (nsub if kind == 1 else nint) + sub)
+            for kind, ix, sub in slots
+        )).astype(np.int64)
+        total = 2 * ne + nfa * nsub + nelems * nint
+        inverse, count = compact_keys(keys, total)
+
+        # slots are ordered by child block, then by local sub-entity
+        t2ents = np.empty((len(local), newt.shape[1]), dtype=dtype)
+        ents = np.empty((len(local[0]), count), dtype=newt.dtype)
+        start, ix = 0, 0
+        for tind, labels in children:
+            size = nelems if tind is None else len(tind)
+            for i, loc in enumerate(local):
+                ids = inverse[ix:ix + size]
+                t2ents[i, start:start + size] = ids
+                pts = [point(labels[j], tind) for j in loc]
+                if sort and len(pts) == 2:
+                    pts = [np.minimum(*pts), np.maximum(*pts)]
+                elif sort:
+                    pts = np.sort(pts, axis=0)
+                ents[:, ids] = pts
+                ix += size
+            start += size
+
+        # children of the parent edges or faces
+        index = np.full(total, -1, dtype=np.int64)
+        index[keys] = inverse
+        if len(local[0]) == 2:
+            sub = index[:2 * ne].reshape(ne, 2)
+        else:
+            sub = index[2 * ne:2 * ne + nfa * nsub].reshape(nfa, nsub)
+            sub = sub[:, (sub >= 0).any(axis=0)]
+
+        out.append((ents,
+                    t2ents,
+                    build_f2t(t2ents, count, dtype=dtype),
+                    sub.astype(dtype)))
+
+    return newt, out
+
+
+class Connectivity:
+    """A lazily built connectivity array of a mesh, e.g. `facets` or `t2f`.
+
+    The array is built on first access by calling the mesh method `builder`,
+    which returns a dictionary of related arrays, e.g. `facets`, `t2f` and
+    `f2t`.  The arrays are cached until `Mesh.t` is replaced.  When accessed
+    through the class, `default` is returned; it describes the shape of the
+    array and defaults to raising `AttributeError`.
+
+    """
+
+    def __init__(self, builder: str, default: Optional[ndarray] = None):
+        self.builder = builder
+        self.default = default
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, mesh, owner=None):
+        if mesh is None:
+            if self.default is None:
+                raise AttributeError(self.name)
+            return self.default
+        cache = mesh._connectivity()
+        if self.name not in cache:
+            cache.update(getattr(mesh, self.builder)())
+        return cache[self.name]
+
+    def __set__(self, mesh, value):
+        mesh._connectivity()[self.name] = value
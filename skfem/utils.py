@@ -2,6 +2,7 @@
 SciPy linear solvers."""
 
 import warnings
+import weakref
 from typing import Optional, Union, Tuple, Callable, Dict
 
 import numpy as np
@@ -192,6 +193,19 @@ def _flatten_dofs(S: DofsCollection) -> ndarray:
         raise NotImplementedError("Unable to flatten the given set of DOF's.")
 
 
+def _dofs_mask(S: DofsCollection, N: int) -> ndarray:
+    """Return a boolean array of length `N` marking the given DOF's."""
+    if isinstance(S, DofsView) and S.mask.shape[0] == N:
+        return S.mask
+    mask = np.zeros(N, dtype=np.bool_)
+    if isinstance(S, dict):
+        for key in S:
+            mask |= _dofs_mask(S[key], N)
+    else:
+        mask[_flatten_dofs(S)] = True
+    return mask
+
+
 def condense(A: spmatrix,
              b: Union[ndarray, spmatrix] = None,
              x: ndarray = None,
@@ -227,18 +241,19 @@ def condense(A: spmatrix,
         The condensed linear system (and optionally information about
         the boundary values).
     """
-    D = _flatten_dofs(D)
-    I = _flatten_dofs(I)
-
     if x is None:
         x = np.zeros(A.shape[0])
 
     if I is None and D is None:
         raise Exception("Either I or D must be given!")
     elif I is None and D is not None:
-        I = np.setdiff1d(np.arange(A.shape[0]), D)
+        mask = _dofs_mask(D, A.shape[0])
+        D = _flatten_dofs(D)
+        I = np.nonzero(~mask)[0]
     elif D is None and I is not None:
-        D = np.setdiff1d(np.arange(A.shape[0]), I)
+        mask = _dofs_mask(I, A.shape[0])
+        I = _flatten_dofs(I)
+        D = np.nonzero(~mask)[0]
     else:
         raise Exception("Give only I or only D!")
 
@@ -339,6 +354,95 @@ def project(fun,
     return solve(M, f)
 
 
+def transfer_operator(source: Basis,
+                      target: Basis,
+                      method: str = 'interpolation'
+                      ) -> Union[spmatrix, spl.LinearOperator]:
+    """Return the operator transferring solution vectors between bases.
+
+    The meshes of the bases need not match.  The operator is computed once
+    using point location in the source mesh and then cached, so that
+    transferring each field costs a single sparse matrix-vector product:
+
+    >>> from skfem import *
+    >>> m1 = MeshTri()
+    >>> m1.refine(2)
+    >>> m2 = MeshQuad()
+    >>> m2.refine(3)
+    >>> source = InteriorBasis(m1, ElementTriP1())
+    >>> target = InteriorBasis(m2, ElementQuad1())
+    >>> T = transfer_operator(source, target)
+    >>> T.shape
+    (81, 25)
+    >>> float(abs(T @ m1.p[0] - m2.p[0]).max()) < 1e-12
+    True
+
+    The operators are cached in the target basis and recomputed after
+    :meth:`~skfem.assembly.Basis.update` or
+    :meth:`~skfem.assembly.Basis.renumber` of either basis.
+
+    Parameters
+    ----------
+    source
+        The basis to transfer from.  Only scalar elements are supported.
+    target
+        The basis to transfer to.  The target mesh must be covered by the
+        source mesh.
+    method
+        If `'interpolation'`, the source solution is evaluated at the DOF
+        locations of the target, which is suitable for Lagrange elements.
+        If `'projection'`, the Galerkin (L2) projection is computed using
+        the quadrature of the target basis which must be an
+        :class:`~skfem.assembly.InteriorBasis`.  The mass matrix of the
+        target is factorized once.
+
+    Returns
+    -------
+    spmatrix or LinearOperator
+        The sparse interpolation matrix or the projection operator
+        (target.N x source.N).
+
+    """
+    if target._transfers is None:
+        target._transfers = weakref.WeakKeyDictionary()
+    cache = target._transfers.setdefault(source, {})
+    if method in cache and cache[method][0] == source._generation:
+        return cache[method][1]
+
+    if method == 'interpolation':
+        operator = source.probe(target.doflocs)
+    elif method == 'projection':
+        # evaluate both bases at the quadrature points of the target
+        x = target.global_coordinates().value
+        S = source.probe(x.reshape(x.shape[0], -1))
+        rows = np.arange(x[0].size).reshape(x[0].shape)
+        T = sp.coo_matrix((
+            np.concatenate([(phi[0].value * target.dx).flatten()
+                            for phi in target.basis]),
+            (np.tile(rows.flatten(), target.Nbfun),
+             np.concatenate([np.repeat(dofs, rows.shape[1])
+                             for dofs in target.element_dofs])),
+        ), shape=(x[0].size, target.N)).tocsr()
+        B = T.T @ S
+
+        @BilinearForm
+        def mass(u, v, w):
+            return u * v
+
+        lu = spl.splu(asm(mass, target).tocsc())
+        operator = spl.LinearOperator(
+            (target.N, source.N),
+            matvec=lambda y: lu.solve(B @ y),
+            matmat=lambda Y: lu.solve(np.asarray(B @ Y)),
+            dtype=B.dtype,
+        )
+    else:
+        raise ValueError("Unknown transfer method '{}'.".format(method))
+
+    cache[method] = (source._generation, operator)
+    return operator
+
+
 # for backwards compatibility
 def L2_projection(a, b, c=None):
     """Superseded by :func:`skfem.utils.project`."""
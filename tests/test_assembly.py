@@ -179,6 +179,66 @@ class BasisInterpolatorMorley(BasisInterpolator):
         return solve(M, f)
 
 
+class BasisProbe(unittest.TestCase):
+    """Sample linear functions at random points using probe matrices."""
+
+    def runTest(self):
+        rng = np.random.default_rng(0)
+        for mtype, etype in [(MeshTri, ElementTriP1),
+                             (MeshQuad, ElementQuad2),
+                             (MeshTet, ElementTetP2),
+                             (MeshHex, ElementHex1)]:
+            m = mtype()
+            m.refine(2)
+            basis = InteriorBasis(m, etype())
+            dim = m.p.shape[0]
+            x = rng.uniform(0., 1., (dim, 40))
+            c = np.arange(1., dim + 1.)
+            # snapshots of the linear function t * c . x
+            Y = np.array([t * c @ basis.doflocs for t in [1., -2.]]).T
+
+            P, grad = basis.probe(x, gradient=True)
+            self.assertEqual(P.shape, (40, basis.N))
+            self.assertEqual(len(grad), dim)
+            np.testing.assert_allclose(P @ Y, np.outer(c @ x, [1., -2.]))
+            for i in range(dim):
+                np.testing.assert_allclose(grad[i] @ Y[:, 0],
+                                           np.full(40, c[i]))
+            np.testing.assert_allclose(basis.interpolator(Y[:, 1])(x),
+                                       P @ Y[:, 1])
+
+            with self.assertRaises(ValueError):
+                basis.probe(np.full((dim, 1), 2.))
+
+
+class AssembleWithoutConnectivity(unittest.TestCase):
+    """Lowest order assembly does not find the facets or the edges."""
+
+    def runTest(self):
+        from skfem.models.poisson import laplace, mass
+
+        for mtype, etype in [(MeshTri, ElementTriP1),
+                             (MeshQuad, ElementQuad1),
+                             (MeshTet, ElementTetP1),
+                             (MeshHex, ElementHex1)]:
+            m = mtype()
+            m.refine(2)
+            m = mtype(m.p, m.t)
+            basis = InteriorBasis(m, etype())
+            K = asm(laplace, basis)
+            for name in ['facets', 't2f', 'f2t', 'edges', 't2e']:
+                self.assertNotIn(name, m._connectivity())
+
+            # the facets are found when needed
+            self.assertEqual(basis.facet_dofs.shape,
+                             (0, m.facets.shape[1]))
+            fbasis = FacetBasis(m, etype())
+            M = asm(mass, fbasis)
+            ones = np.ones(K.shape[0])
+            self.assertAlmostEqual(ones @ (K @ ones), 0.)
+            self.assertAlmostEqual(ones @ (M @ ones), 2. * m.dim())
+
+
 class NormalVectorTestTri(unittest.TestCase):
     case = (MeshTri(), ElementTriP1())
     test_integrate_volume = True
@@ -268,6 +328,13 @@ class TestRefinterp(unittest.TestCase):
 
         self.assertEqual(M.p.shape[1], len(X))
 
+        # shared vertices are merged
+        p, t, X = basis.refinterp(m.p[0], 3, deduplicate=True,
+                                  return_arrays=True)
+        self.assertEqual(p.shape[1], 33 ** 2)
+        self.assertEqual(t.shape, (4, M.t.shape[1]))
+        np.testing.assert_allclose(X, p[0])
+
 
 class TestCompositeAssembly(unittest.TestCase):
 
@@ -1,13 +1,15 @@
+import warnings
 from unittest import TestCase
 
 import numpy as np
 from numpy.testing import assert_allclose
 
 from skfem import BilinearForm, asm, solve, condense
-from skfem.mesh import MeshTri, MeshTet, MeshHex
-from skfem.assembly import InteriorBasis, Dofs
+from skfem.mesh import MeshTri, MeshTet, MeshHex, MeshQuad
+from skfem.assembly import InteriorBasis, FacetBasis, Dofs
 from skfem.element import (ElementVectorH1, ElementTriP2, ElementTriP1,
-                           ElementTetP2, ElementHexS2)
+                           ElementTetP2, ElementHexS2, ElementQuad1,
+                           ElementQuad2, ElementHex1)
 
 
 class TestCompositeSplitting(TestCase):
@@ -90,3 +92,200 @@ class TestFacetExpansionHexS2(TestFacetExpansion):
 
     mesh_type = MeshHex
     elem_type = ElementHexS2
+
+
+class TestRenumbering(TestCase):
+
+    def runTest(self):
+        from skfem.models.poisson import laplace, unit_load
+
+        m = MeshTet()
+        m.refine(2)
+
+        for strategy in ['rcm', 'sfc']:
+            basis0 = InteriorBasis(m, ElementTetP2())
+            basis = InteriorBasis(m, ElementTetP2())
+            p = basis.renumber(strategy)
+
+            A0 = asm(laplace, basis0)
+            A = asm(laplace, basis)
+            assert_allclose((A - A0[p].T[p].T).data, 0., atol=1e-12)
+            assert_allclose(basis.doflocs, basis0.doflocs[:, p])
+
+            x0 = solve(*condense(A0, asm(unit_load, basis0),
+                                 D=basis0.get_dofs()))
+            x = solve(*condense(A, asm(unit_load, basis),
+                                D=basis.get_dofs()))
+            assert_allclose(x, x0[p], atol=1e-12)
+
+        # an explicit permutation
+        basis = InteriorBasis(m, ElementTetP2())
+        perm = np.random.default_rng(0).permutation(basis.N)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            p = basis.renumber(perm)
+        assert_allclose(p, perm)
+        assert_allclose(basis.doflocs, basis0.doflocs[:, perm])
+        assert_allclose(basis.element_dofs,
+                        np.argsort(perm)[basis0.element_dofs])
+
+        with self.assertRaises(ValueError):
+            InteriorBasis(m, ElementTetP2()).renumber('amd')
+
+
+class TestDoflocs(TestCase):
+
+    def runTest(self):
+
+        m = MeshTet()
+        m.refine(2)
+        basis = InteriorBasis(m, ElementTetP2())
+
+        # computed lazily
+        self.assertTrue(basis._doflocs is None)
+
+        assert_allclose(basis.doflocs[:, basis.nodal_dofs[0]], m.p)
+        assert_allclose(basis.doflocs[:, basis.edge_dofs[0]],
+                        m.p[:, m.edges].mean(axis=1))
+
+
+class TestBasisUpdate(TestCase):
+
+    def runTest(self):
+
+        from skfem.models.poisson import laplace, mass
+
+        def deform(p):
+            return np.array([p[0] + .1 * p[1] ** 2, p[1] * (1. + .2 * p[0])])
+
+        for m, e in [(MeshTri(), ElementTriP2()),
+                     (MeshQuad(), ElementQuad2())]:
+            m.refine(2)
+            ib = InteriorBasis(m, e)
+            fb = FacetBasis(m, e)
+            dofs = ib.dofs
+            ib.doflocs
+            ib.update(deform(m.p))
+            fb.update()
+
+            # compare to the bases built from scratch
+            self.assertTrue(ib.dofs is dofs)
+            assert_allclose(asm(laplace, ib).toarray(),
+                            asm(laplace, InteriorBasis(m, e)).toarray())
+            assert_allclose(asm(mass, fb).toarray(),
+                            asm(mass, FacetBasis(m, e)).toarray())
+            assert_allclose(ib.doflocs[:, ib.nodal_dofs[0]], m.p)
+
+
+class TestHangingConstraints(TestCase):
+    """Harmonic polynomials are solved exactly on non-conforming meshes."""
+
+    def runTest(self):
+        from skfem.models.poisson import laplace
+
+        quad = MeshQuad()
+        quad.refine(2)
+        hexa = MeshHex()
+        hexa.refine(1)
+        for m in [quad, hexa]:
+            for itr in range(3):
+                m.refine(m.elements_satisfying(
+                    lambda x: np.linalg.norm(x - .1, axis=0) < .3))
+
+        for m, e, u in [
+                (quad, ElementQuad1(), lambda x, y: x + 2 * y + x * y),
+                (quad, ElementQuad2(), lambda x, y: x ** 2 - y ** 2 + x),
+                (hexa, ElementHex1(), lambda x, y, z: x - z + x * y * z),
+        ]:
+            basis = InteriorBasis(m, e)
+            A = asm(laplace, basis)
+            P, H = basis.hanging_constraints()
+            self.assertTrue(len(H) > 0)
+            D = basis.get_dofs().flatten()
+            x = np.zeros(basis.N)
+            x[D] = u(*basis.doflocs[:, D])
+            y = P @ solve(*condense(P.T @ A @ P, np.zeros(basis.N), x=x,
+                                    D=np.union1d(D, H)))
+            assert_allclose(y, u(*basis.doflocs), atol=1e-10)
+
+
+class TestMeshHierarchy(TestCase):
+    """Prolongation reproduces functions in the coarse space."""
+
+    def runTest(self):
+        from skfem.mesh import MeshHierarchy
+
+        for m, e, u in [
+                (MeshTri(), ElementTriP1(), lambda x, y: 1 + x - y),
+                (MeshTri(), ElementTriP2(), lambda x, y: x ** 2 + x * y),
+                (MeshQuad(), ElementQuad1(), lambda x, y: x * y + y),
+                (MeshTet(), ElementTetP2(), lambda x, y, z: x * z + y ** 2),
+        ]:
+            m.refine()
+            h = MeshHierarchy(m)
+            h.refine()
+            h.refine(h[-1].elements_satisfying(lambda x: x[0] < .5))
+            self.assertEqual(len(h), 3)
+            for i in range(2):
+                coarse = InteriorBasis(h[i], e)
+                fine = InteriorBasis(h[i + 1], e)
+                P = h.prolongation(coarse, fine)
+                assert_allclose(P @ u(*coarse.doflocs), u(*fine.doflocs),
+                                atol=1e-12)
+                assert_allclose(h.vertices[i] @ h[i].p.T, h[i + 1].p.T)
+                self.assertEqual(len(h.parents[i]), h[i + 1].t.shape[1])
+                R = h.restriction(coarse, fine)
+                self.assertEqual(R.shape, (coarse.N, fine.N))
+            with self.assertRaises(ValueError):
+                h.prolongation(fine, coarse)
+
+
+class TestMeshHierarchyCoarsen(TestCase):
+    """Coarsening reverses refinement and keeps the subsets."""
+
+    def runTest(self):
+        from skfem.mesh import MeshHierarchy, MeshLine
+        from skfem.element import ElementLineP1, ElementTetP1
+
+        for m, e in [(MeshTri(), ElementTriP2()),
+                     (MeshLine(), ElementLineP1()),
+                     (MeshTet(), ElementTetP1())]:
+            m.refine(2)
+            m.define_boundary('left', lambda x: x[0] == 0)
+            m.subdomains = {'a': m.elements_satisfying(lambda x: x[0] < .5)}
+            h = MeshHierarchy(m)
+            for itr in range(2):
+                h.refine(h[-1].elements_satisfying(
+                    lambda x: np.linalg.norm(x - .2, axis=0) < .3))
+            old = h[-1]
+            new = h.coarsen(old.elements_satisfying(lambda x: x[0] > .2))
+            self.assertEqual(len(h), 3)
+            self.assertTrue(h[1].t.shape[1] < new.t.shape[1]
+                            < old.t.shape[1])
+
+            source, target = InteriorBasis(old, e), InteriorBasis(new, e)
+            assert_allclose(target.dx[new.subdomains['a']].sum(), .5)
+            if m.dim() > 1:
+                assert_allclose(new.boundaries['left'],
+                                new.facets_satisfying(lambda x: x[0] == 0,
+                                                      True))
+            T = h.transfer(source, target)
+            assert_allclose(T @ (1. + source.doflocs[0]),
+                            1. + target.doflocs[0])
+
+            # coarsening everything removes the levels
+            for itr in range(2):
+                h.coarsen(np.arange(h[-1].t.shape[1]))
+            self.assertEqual(len(h), 1)
+            self.assertEqual(h[0].t.shape[1], m.t.shape[1])
+
+
+class TestDocstrings(TestCase):
+    """Run the examples in the docstrings of the bases."""
+
+    def runTest(self):
+        import doctest
+        from skfem.assembly.basis import basis, interior_basis
+
+        for module in [basis, interior_basis]:
+            self.assertEqual(doctest.testmod(module).failed, 0)
@@ -79,3 +79,63 @@ class TestDofsSubset(TestCase):
 
         self.assertEqual(len(dofs.nodal['u']), 4)
         self.assertEqual(len(dofs.facet['u']), 4)
+
+
+class TestCompactIndices(TestCase):
+
+    def runTest(self):
+
+        m = MeshTri()
+        m.refine(2)
+        M = MeshTri(m.p, m.t.astype(np.int32))
+        m = MeshTri(m.p, m.t)
+        M.refine()
+        m.refine()
+
+        for attr in ['t', 'facets', 't2f', 'f2t']:
+            self.assertEqual(getattr(M, attr).dtype, np.int32)
+            assert_allclose(getattr(M, attr), getattr(m, attr))
+
+        basis = InteriorBasis(M, ElementTriP2())
+        self.assertEqual(basis.element_dofs.dtype, np.int32)
+        assert_allclose(basis.element_dofs,
+                        InteriorBasis(m, ElementTriP2()).element_dofs)
+
+
+class TestDofsViewCache(TestCase):
+
+    def runTest(self):
+
+        m = MeshTri()
+        m.refine(2)
+        basis = InteriorBasis(m, ElementTriP2())
+        D1 = basis.get_dofs(lambda x: x[0] == 0)
+        D2 = basis.get_dofs(lambda x: x[1] == 0)
+
+        # memoised
+        self.assertTrue(D1.flatten() is D1.flatten())
+        self.assertEqual(D1.mask.sum(), len(D1.flatten()))
+        assert_allclose(np.nonzero(D1.mask)[0], D1.flatten())
+
+        # merging via masks
+        assert_allclose((D1 | D2).flatten(),
+                        np.union1d(D1.flatten(), D2.flatten()))
+
+        # complement
+        assert_allclose(basis.complement_dofs(D1, D2),
+                        np.setdiff1d(np.arange(basis.N),
+                                     np.union1d(D1.flatten(),
+                                                D2.flatten())))
+
+        # still a named tuple
+        self.assertEqual(D1._fields[:2], ('obj', 'nodal_ix'))
+        obj, nodal_ix, *_ = D1
+        self.assertTrue(obj is basis.dofs)
+        D3 = D1._replace(nodal_ix=nodal_ix[:1])
+        self.assertTrue(isinstance(D3, type(D1)))
+        assert_allclose(D3.nodal['u'], basis.nodal_dofs[0, nodal_ix[:1]])
+
+        # renumbering invalidates the cache
+        old = np.array(D1.flatten())
+        p = basis.renumber()
+        assert_allclose(np.sort(p[D1.flatten()]), old)
@@ -117,6 +117,155 @@ class SaveLoadCycle(unittest.TestCase):
         self.assertTrue(((m.p[0, :] - m2.p[0, :]) < 1e-6).all())
 
 
+class SaveLoadNpz(unittest.TestCase):
+    """Check that the native format keeps the connectivity."""
+
+    def runTest(self):
+        from tempfile import TemporaryDirectory
+        from skfem.io.npz import to_file
+
+        for cls in [MeshLine, MeshTri, MeshQuad, MeshTet, MeshHex]:
+            m = cls()
+            m.refine(2)
+            m.define_boundary('left', lambda x: x[0] == 0)
+            m.subdomains = {'a b': m.elements_satisfying(
+                lambda x: x[0] < .5)}
+            if cls in (MeshQuad, MeshHex):
+                m.refine(np.array([0]))
+            with TemporaryDirectory() as d:
+                m.save(d + '/mesh.npz')
+                to_file(m, d + '/mesh')
+                for name in ['mesh.npz', 'mesh']:
+                    M = Mesh.load(d + '/' + name)
+                    self.assertTrue(type(M) is cls)
+                    # the connectivity is not rebuilt
+                    self.assertTrue('facets' in M._connectivity())
+                    for k in ['p', 't', 'facets', 't2f', 'f2t']:
+                        np.testing.assert_array_equal(getattr(M, k),
+                                                      getattr(m, k))
+                    np.testing.assert_array_equal(M.boundaries['left'],
+                                                  m.boundaries['left'])
+                    np.testing.assert_array_equal(M.subdomains['a b'],
+                                                  m.subdomains['a b'])
+                    np.testing.assert_array_equal(M.boundary_facets(),
+                                                  m.boundary_facets())
+                    if m.dim() == 3:
+                        np.testing.assert_array_equal(M.t2e, m.t2e)
+                del M
+
+
+class RefineMemoryMapped(unittest.TestCase):
+    """Adaptively refine a mesh loaded as read-only memory maps."""
+
+    def runTest(self):
+        from tempfile import TemporaryDirectory
+        from skfem.io.npz import to_file
+
+        m = MeshTri()
+        m.refine(2)
+        with TemporaryDirectory() as d:
+            to_file(m, d + '/mesh')
+            M = Mesh.load(d + '/mesh')
+            self.assertFalse(M.t.flags.writeable)
+            M.refine(np.array([0]))
+            m.refine(np.array([0]))
+            np.testing.assert_array_equal(M.p, m.p)
+            np.testing.assert_array_equal(M.t, m.t)
+            del M
+
+
+class TimeSeriesCycle(unittest.TestCase):
+    """Write and read fields at several time steps."""
+
+    def runTest(self):
+        from tempfile import TemporaryDirectory
+        from skfem.io.time_series import TimeSeriesWriter, read_time_series
+
+        m = MeshQuad()
+        m.refine(2)
+        times = np.linspace(0., 1., 4)
+        with TemporaryDirectory() as d:
+            with TimeSeriesWriter(m, d + '/series') as writer:
+                for t in times:
+                    writer.write(t,
+                                 point_data={'u': t * m.p[0],
+                                             'grad u': t * m.p.T},
+                                 cell_data={'e': t * np.ones(m.t.shape[1])})
+            M, steps = read_time_series(d + '/series', mmap_mode=None)
+
+        np.testing.assert_array_equal(M.t, m.t)
+        np.testing.assert_array_equal([t for t, _, _ in steps], times)
+        for t, point_data, cell_data in steps:
+            np.testing.assert_array_equal(point_data['u'], t * m.p[0])
+            np.testing.assert_array_equal(point_data['grad u'], t * m.p.T)
+            self.assertEqual(cell_data['e'].shape, (m.t.shape[1],))
+
+        # the steps written so far can be read if the writer is not closed
+        with TemporaryDirectory() as d:
+            writer = TimeSeriesWriter(m, d + '/series').open()
+            self.assertEqual(read_time_series(d + '/series',
+                                              mmap_mode=None)[1], [])
+            for t in times[:2]:
+                writer.write(t, point_data={'u': t * m.p[0]})
+            _, steps = read_time_series(d + '/series', mmap_mode=None)
+            np.testing.assert_array_equal([t for t, _, _ in steps],
+                                          times[:2])
+            np.testing.assert_array_equal(steps[1][1]['u'],
+                                          times[1] * m.p[0])
+            self.assertEqual(sorted(p.name for p in Path(d, 'series')
+                                    .glob('series.json*')), ['series.json'])
+
+
+class MeshioHexCycle(unittest.TestCase):
+    """Check the vertex ordering of hexahedra in the meshio conversions."""
+
+    def runTest(self):
+        from skfem.io.meshio import from_meshio, to_meshio
+
+        m = MeshHex()
+        m.refine()
+        with self.assertWarnsRegex(UserWarning, '^Unable to load tagged'):
+            M = from_meshio(to_meshio(m))
+        np.testing.assert_array_equal(M.t, m.t)
+
+
+class LagrangeExport(unittest.TestCase):
+    """Export quadratic fields without refinement."""
+
+    def runTest(self):
+        from tempfile import TemporaryDirectory
+        import meshio
+        from skfem.assembly import InteriorBasis
+        from skfem.element import (ElementLineP2, ElementTriP2, ElementQuad2,
+                                   ElementQuadS2, ElementTetP2, ElementHex1,
+                                   ElementHexS2, ElementTriMorley)
+        from skfem.io.meshio import VTK_NODES, basis_to_file
+
+        for m, e, cell_type in [
+                (MeshLine(), ElementLineP2(), 'line3'),
+                (MeshTri(), ElementTriP2(), 'triangle6'),
+                (MeshQuad(), ElementQuad2(), 'quad9'),
+                (MeshQuad(), ElementQuadS2(), 'quad8'),
+                (MeshTet(), ElementTetP2(), 'tetra10'),
+                (MeshHex(), ElementHex1(), 'hexahedron'),
+                (MeshHex(), ElementHexS2(), 'hexahedron20')]:
+            m.refine()
+            basis = InteriorBasis(m, e)
+            u = basis.doflocs[0] ** 2
+            with TemporaryDirectory() as d:
+                basis_to_file(basis, d + '/u.vtu', point_data={'u': u})
+                out = meshio.read(d + '/u.vtu')
+            cells = out.cells_dict[cell_type]
+            # the points of the cells are the images of the VTK nodes
+            x = basis.mapping.F(np.array(VTK_NODES[cell_type]).T)
+            np.testing.assert_allclose(out.points[cells][:, :, :m.dim()],
+                                       x.T.swapaxes(0, 1), atol=1e-12)
+            np.testing.assert_allclose(out.point_data['u'], u)
+
+        with self.assertRaises(ValueError):
+            basis_to_file(InteriorBasis(MeshTri(), ElementTriMorley()), 'x')
+
+
 class SaveLoadCycleHex(SaveLoadCycle):
     cls = MeshHex
 
@@ -171,6 +320,112 @@ class TestBoundaryEdges2(unittest.TestCase):
         self.assertEqual(len(m.boundary_edges()), 48)
 
 
+class TestExpandFacets(unittest.TestCase):
+
+    def runTest(self):
+        for m in [MeshTet(), MeshHex()]:
+            m.refine(2)
+            facets = m.facets_satisfying(lambda x: x[0] == 0.)
+            vertices, edges = m.expand_facets(facets)
+            np.testing.assert_array_equal(
+                vertices, m.nodes_satisfying(lambda x: x[0] == 0.))
+            np.testing.assert_array_equal(
+                edges, np.nonzero((m.p[0, m.edges] == 0.).all(axis=0))[0])
+
+            # edges of interior facets are found as well
+            facets = m.facets_satisfying(lambda x: x[0] == .5)
+            _, edges = m.expand_facets(facets)
+            np.testing.assert_array_equal(
+                edges, np.nonzero((m.p[0, m.edges] == .5).all(axis=0))[0])
+
+
+class TestFindFacets(unittest.TestCase):
+
+    def runTest(self):
+        from skfem.mesh.topology import EntityIndex
+
+        for m in [MeshTri(), MeshQuad(), MeshTet(), MeshHex()]:
+            m.refine(2)
+            ix = np.random.permutation(m.facets.shape[1])
+            query = m.facets[:, ix]
+            np.testing.assert_array_equal(
+                m.find_facets(query[np.random.permutation(len(query))]), ix)
+            query[0, :2] = [-1, m.p.shape[1]]
+            np.testing.assert_array_equal(m.find_facets(query[:, :2]), -1)
+
+        # keys of large vertex indices do not overflow
+        ents = np.random.choice(10 ** 9, size=(4, 1000))
+        index = EntityIndex(ents)
+        np.testing.assert_array_equal(index.find(ents[::-1]),
+                                      np.arange(1000))
+        np.testing.assert_array_equal(index.find(ents[:, :5] + 1), -1)
+
+        # boundaries are kept when splitting refined quads
+        m = MeshQuad()
+        m.refine(2)
+        m.define_boundary('left', lambda x: x[0] == 0.)
+        M = m.to_meshtri()
+        np.testing.assert_array_equal(
+            np.sort(M.boundaries['left']),
+            M.facets_satisfying(lambda x: x[0] == 0.))
+
+
+class TestMeshioTags(unittest.TestCase):
+
+    def runTest(self):
+        import warnings
+        import meshio
+        from skfem.io.meshio import from_meshio
+
+        m = MeshTri()
+        m.refine(2)
+        left = m.facets_satisfying(lambda x: x[0] == 0.)
+        lower = m.elements_satisfying(lambda x: x[1] < .5)
+        etags = np.where(np.isin(np.arange(m.t.shape[1]), lower), 1, 2)
+
+        # the same tag numbers are used for elements and facets
+        mesh = meshio.Mesh(
+            np.vstack((m.p, np.zeros(m.p.shape[1]))).T,
+            [('triangle', m.t.T), ('line', m.facets[:, left].T)],
+            cell_data={'gmsh:physical': [etags, np.ones(len(left))]},
+            field_data={'lower': np.array([1, 2]),
+                        'upper': np.array([2, 2]),
+                        'left': np.array([1, 1])},
+        )
+        M = from_meshio(mesh)
+        np.testing.assert_array_equal(M.subdomains['lower'], lower)
+        self.assertEqual(len(M.subdomains['upper']) + len(lower),
+                         m.t.shape[1])
+        np.testing.assert_array_equal(
+            M.boundaries['left'], M.facets_satisfying(lambda x: x[0] == 0.))
+
+        # tagged elements without boundary cells
+        mesh = meshio.Mesh(
+            mesh.points,
+            [('triangle', m.t.T)],
+            cell_data={'gmsh:physical': [etags]},
+            field_data={'lower': np.array([1, 2]),
+                        'upper': np.array([2, 2])},
+        )
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            M = from_meshio(mesh)
+        np.testing.assert_array_equal(M.subdomains['lower'], lower)
+        self.assertEqual(M.boundaries, {})
+
+        mesh = meshio.Mesh(
+            mesh.points,
+            [('triangle', m.t.T), ('line', m.facets[:, left].T)],
+            cell_sets={'lower': [lower, np.array([], dtype=np.int64)],
+                       'left': [np.array([], dtype=np.int64),
+                                np.arange(len(left))]},
+        )
+        M = from_meshio(mesh)
+        np.testing.assert_array_equal(M.subdomains['lower'], lower)
+        np.testing.assert_array_equal(
+            M.boundaries['left'], M.facets_satisfying(lambda x: x[0] == 0.))
+
+
 class TestMeshAddition(unittest.TestCase):
 
     def runTest(self):
@@ -185,6 +440,395 @@ class TestMeshAddition(unittest.TestCase):
         self.assertTrue('top' in mesh.boundaries)
 
 
+class TestBuildEntities(unittest.TestCase):
+    """Compare the integer key based topology builder to np.unique."""
+
+    def runTest(self):
+        from skfem.mesh.topology import build_entities
+        m = MeshTet()
+        m.refine(2)
+        local = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        facets, t2f, f2t = build_entities(m.t, local)
+        all_facets = np.sort(np.hstack([m.t[ix] for ix in local]), axis=0)
+        ref, ix, inv = np.unique(all_facets, axis=1,
+                                 return_index=True, return_inverse=True)
+        np.testing.assert_array_equal(facets, ref)
+        np.testing.assert_array_equal(t2f.flatten(), inv.flatten())
+        self.assertEqual((f2t[1] == -1).sum(), len(m.boundary_facets()))
+        np.testing.assert_array_equal(f2t[0], ix % m.t.shape[1])
+
+
+class TestLazyConnectivity(unittest.TestCase):
+    """Connectivity is built on first access and rebuilt when t changes."""
+
+    def runTest(self):
+        for mtype in [MeshTri, MeshQuad, MeshTet, MeshHex, MeshLine]:
+            m = mtype()
+            m.refine(2)
+            m = mtype(m.p, m.t)
+            self.assertNotIn('facets', m._connectivity())
+            f2t = m.f2t
+            self.assertIs(m.f2t, f2t)
+            self.assertEqual(len(m.boundary_facets()),
+                             (m.f2t[1] == -1).sum())
+            m.t = m.t.copy()
+            self.assertNotIn('facets', m._connectivity())
+            self.assertEqual(m.f2t.shape[1], m.facets.shape[1])
+            self.assertEqual(m.t2f.shape[1], m.t.shape[1])
+            self.assertFalse(m.boundary_facets().flags.writeable)
+            if mtype is not MeshLine:
+                # class attributes describe the shapes
+                self.assertEqual(mtype.t2f.shape[0], m.t2f.shape[0])
+
+
+class TestMeshLineAdaptiveRefine(unittest.TestCase):
+
+    def runTest(self):
+        m = MeshLine()
+        m.refine(2)
+        m.refine([0, 2])
+        self.assertEqual(m.t.shape[1], 6)
+        self.assertEqual(m.facets.shape[1], 7)
+        np.testing.assert_array_equal(m.boundary_nodes(), [0, 1])
+
+
+class TestRefinedTopology(unittest.TestCase):
+    """Connectivity from refinement and init_tensor matches a rebuild."""
+
+    def runTest(self):
+        for mtype in [MeshTri, MeshQuad, MeshTet, MeshHex]:
+            x = np.linspace(0, 1, 3)
+            m = mtype.init_tensor(*((x,) * mtype.dim()))
+            m.define_boundary('left', lambda x: x[0] == 0)
+            for itr in range(3):
+                kwargs = {'sort_t': False} if mtype is MeshTri else {}
+                ref = mtype(m.p, m.t, validate=False, **kwargs)
+                names = [('facets', 't2f', mtype is not MeshHex)]
+                if mtype.dim() == 3:
+                    names.append(('edges', 't2e', True))
+                for ents, t2ents, ordered in names:
+                    A = getattr(m, ents)[:, getattr(m, t2ents)]
+                    B = getattr(ref, ents)[:, getattr(ref, t2ents)]
+                    if not ordered:
+                        A, B = np.sort(A, axis=0), np.sort(B, axis=0)
+                    np.testing.assert_array_equal(A, B)
+                    self.assertEqual(getattr(m, ents).shape,
+                                     getattr(ref, ents).shape)
+                for side in range(2):
+                    ix = np.nonzero(m.f2t[side] >= 0)[0]
+                    self.assertTrue((m.t2f[:, m.f2t[side, ix]]
+                                     == ix).any(axis=0).all())
+                self.assertEqual(
+                    set(map(tuple, np.sort(m.facets[:, m.boundary_facets()],
+                                           axis=0).T)),
+                    set(map(tuple, np.sort(ref.facets[:,
+                                                      ref.boundary_facets()],
+                                           axis=0).T))
+                )
+                self.assertTrue((m.p[0, m.facets[:, m.boundaries['left']]]
+                                 == 0).all())
+                np.testing.assert_array_equal(
+                    np.sort(m.boundaries['left']),
+                    m.facets_satisfying(lambda x: x[0] == 0)
+                )
+                m.refine()
+
+
+class TestAdaptiveRefineTet(unittest.TestCase):
+    """Adaptive refinement of MeshTet is conforming and keeps subsets."""
+
+    def runTest(self):
+        m = MeshTet()
+        m.refine(2)
+        m.define_boundary('left', lambda x: x[0] == 0)
+        m.subdomains = {'front': m.elements_satisfying(lambda x: x[1] < .5)}
+        for itr in range(3):
+            N = m.t.shape[1]
+            m.refine(m.elements_satisfying(
+                lambda x: np.linalg.norm(x - .25, axis=0) < .2))
+            self.assertTrue(N < m.t.shape[1] < 8 * N)
+            mapping = m.mapping()
+            self.assertAlmostEqual(np.abs(mapping.detA).sum() / 6., 1.)
+            self.assertAlmostEqual(
+                np.abs(mapping.detA[m.subdomains['front']]).sum() / 6., .5)
+            # hanging nodes would create interior boundary facets
+            B = mapping.B[:, :, m.boundary_facets()]
+            self.assertAlmostEqual(
+                np.linalg.norm(np.cross(B[:, 0].T, B[:, 1].T),
+                               axis=1).sum() / 2., 6.)
+            np.testing.assert_array_equal(
+                np.sort(m.boundaries['left']),
+                m.facets_satisfying(lambda x: x[0] == 0, True)
+            )
+
+
+class TestAdaptiveRefineQuadHex(unittest.TestCase):
+    """Adaptive refinement of MeshQuad and MeshHex is 2:1 balanced and
+    keeps subsets."""
+
+    def runTest(self):
+        from skfem.assembly import FacetBasis, InteriorBasis
+        from skfem.element import ElementHex1, ElementQuad1
+        from skfem.mesh.topology import find_entities
+
+        for m, e, area in [(MeshQuad(), ElementQuad1(), 4.),
+                           (MeshHex(), ElementHex1(), 6.)]:
+            m.refine(2)
+            m.define_boundary('left', lambda x: x[0] == 0)
+            m.subdomains = {'front': m.elements_satisfying(
+                lambda x: x[1] < .5)}
+            for itr in range(3):
+                N = m.t.shape[1]
+                m.refine(m.elements_satisfying(
+                    lambda x: np.linalg.norm(x - .1, axis=0) < .2))
+                self.assertTrue(N < m.t.shape[1])
+                dx = InteriorBasis(m, e).dx
+                self.assertAlmostEqual(dx.sum(), 1.)
+                self.assertAlmostEqual(dx[m.subdomains['front']].sum(), .5)
+                self.assertAlmostEqual(FacetBasis(m, e).dx.sum(), area)
+                np.testing.assert_array_equal(
+                    m.boundaries['left'],
+                    m.facets_satisfying(lambda x: x[0] == 0, True)
+                )
+                # the halves of the split edges are not split again
+                R = m._midpoints[2]
+                halves = np.hstack((R[[0, 2]], R[[1, 2]]))
+                self.assertTrue((find_entities(R[:2], halves) < 0).all())
+            m.refine()
+            self.assertAlmostEqual(InteriorBasis(m, e).dx.sum(), 1.)
+            self.assertAlmostEqual(FacetBasis(m, e).dx.sum(), area)
+
+
+class TestGeometricCache(unittest.TestCase):
+
+    def runTest(self):
+        for m in [MeshLine(), MeshTri(), MeshQuad(), MeshTet(), MeshHex()]:
+            m.refine(2)
+            dim = m.dim()
+            self.assertAlmostEqual(m.element_measures().sum(), 1.)
+            mid = m.element_midpoints()
+            self.assertTrue(m.element_midpoints() is mid)
+            np.testing.assert_allclose(m.facet_midpoints()[0],
+                                       m.p[0, m.facets].mean(axis=0))
+            h = m.element_diameters()
+            x = m.p[:, m.t]
+            np.testing.assert_allclose(h, np.linalg.norm(
+                x[:, :, None] - x[:, None], axis=0).max(axis=(0, 1)))
+
+            # moving the vertices invalidates the cache
+            stretch = np.array([2.] + [1.] * (dim - 1))[:, None]
+            m.update_vertices(stretch * m.p)
+            self.assertAlmostEqual(m.element_measures().sum(), 2.)
+            np.testing.assert_allclose(m.element_midpoints()[0], 2 * mid[0])
+            m.scale(tuple([.5] + [1.] * (dim - 1)))
+            np.testing.assert_allclose(m.element_diameters(), h)
+            self.assertTrue(m.element_diameters() is m.element_diameters())
+            m.p = 2. * m.p
+            self.assertAlmostEqual(m.element_measures().sum(), 2. ** dim)
+
+            # the cached arrays are shared, hence read-only
+            with self.assertRaises(ValueError):
+                m.element_midpoints()[0, 0] = 0.
+
+
+class TestElementFinder(unittest.TestCase):
+
+    def runTest(self):
+        from skfem.mesh.element_finder import inside
+        rng = np.random.default_rng(0)
+        for m in [MeshLine(), MeshTri(), MeshQuad(), MeshTet(), MeshHex()]:
+            m.refine(2)
+            dim = m.dim()
+            x = rng.uniform(-.2, 1.2, (dim, 1000))
+            finder = m.element_finder()
+            self.assertTrue(m.element_finder() is finder)
+            tind = finder(*x)
+            self.assertEqual(tind.shape, (1000,))
+            np.testing.assert_array_equal(tind >= 0,
+                                          ((x >= 0) & (x <= 1)).all(axis=0))
+
+            if dim > 1:
+                # curved edges for the isoparametric mappings
+                m.update_vertices(m.p + np.eye(dim)[:, :1] * .03
+                                  * np.sin(2 * np.pi * m.p[1]))
+            finder = m.element_finder()
+            tind = finder(*x)
+            ix = tind >= 0
+            self.assertTrue(ix.sum() > 300)
+            X = m.mapping().invF(x[:, ix, None], tind=tind[ix])
+            self.assertTrue(inside(m.refdom, X[:, :, 0]).all())
+
+            # the vertices are found, also after moving them
+            self.assertTrue((finder(*m.p) >= 0).all())
+            m.translate((1.,) + (0.,) * (dim - 1))
+            self.assertFalse(m.element_finder() is finder)
+            self.assertTrue((m.element_finder()(*m.p) >= 0).all())
+            self.assertEqual(m.element_finder()(*(m.p[:, :1] - 1.))[0], -1)
+
+        # Newton iteration does not converge for some points outside of a
+        # nonconvex quadrilateral; these are not found
+        m = MeshQuad(np.array([[0., 1., .2, 0.], [0., 0., .2, 1.]]),
+                     np.array([[0], [1], [2], [3]]))
+        x = np.array([[.1, .8], [.1, .8]])
+        with self.assertRaises(Exception):
+            m.mapping().invF(x[:, 1:, None], tind=np.array([0]))
+        X, converged = m.mapping().try_invF(x[:, :, None],
+                                            tind=np.array([0, 0]))
+        np.testing.assert_array_equal(converged, [True, False])
+        np.testing.assert_array_equal(m.element_finder()(*x), [0, -1])
+
+
+class TestReorder(unittest.TestCase):
+
+    def runTest(self):
+        from skfem.mesh.ordering import hilbert_order
+
+        # consecutive points along the Hilbert curve are neighbours
+        x = np.array(np.meshgrid(np.arange(8.), np.arange(8.),
+                                 np.arange(8.))).reshape(3, -1)
+        steps = np.diff(x[:, hilbert_order(x)], axis=1)
+        np.testing.assert_array_equal(np.abs(steps).sum(axis=0), 1.)
+
+        for mtype in [MeshLine, MeshTri, MeshQuad, MeshTet, MeshHex]:
+            for strategy in ['hilbert', 'morton', 'rcm']:
+                m = mtype()
+                m.refine(2)
+                if mtype in (MeshQuad, MeshHex):
+                    m.refine(np.array([0, 5]))
+                m.define_boundary('left', lambda x: x[0] == 0)
+                m.subdomains = {'a': m.elements_satisfying(
+                    lambda x: x[0] < .5)}
+                M = m.copy()
+                elements, vertices = M.reorder(strategy)
+
+                np.testing.assert_array_equal(M.p, m.p[:, vertices])
+                np.testing.assert_allclose(M.element_midpoints(),
+                                           m.element_midpoints()[:, elements])
+                np.testing.assert_array_equal(
+                    np.sort(M.boundaries['left']),
+                    M.facets_satisfying(lambda x: x[0] == 0))
+                np.testing.assert_array_equal(
+                    M.subdomains['a'],
+                    M.elements_satisfying(lambda x: x[0] < .5))
+                self.assertEqual(len(M.boundary_facets()),
+                                 len(m.boundary_facets()))
+                self.assertAlmostEqual(M.element_measures().sum(), 1.)
+
+        with self.assertRaises(ValueError):
+            MeshTri().reorder('metis')
+
+
+class TestPartition(unittest.TestCase):
+
+    def runTest(self):
+        for mtype in [MeshLine, MeshTri, MeshQuad, MeshTet, MeshHex]:
+            m = mtype()
+            m.refine(3 if m.dim() < 3 else 2)
+            nelems = m.t.shape[1]
+            for method in ['rcb', 'sfc', 'graph']:
+                partition = m.partition(3, method)
+                self.assertEqual(len(partition), 3)
+                sizes = [len(e) for e in partition.elements]
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+                np.testing.assert_array_equal(
+                    np.sort(np.concatenate(partition.elements)),
+                    np.arange(nelems))
+
+                # each vertex and facet has exactly one owner
+                for owned, n in [(partition.owned_vertices, m.p.shape[1]),
+                                 (partition.owned_facets, m.facets.shape[1])]:
+                    np.testing.assert_array_equal(
+                        np.sort(np.concatenate(owned)), np.arange(n))
+
+                interface = partition.interface_facets()
+                for i in range(3):
+                    elements = partition.elements[i]
+                    np.testing.assert_array_equal(
+                        np.union1d(partition.owned_vertices[i],
+                                   partition.ghost_vertices[i]),
+                        np.unique(m.t[:, elements]))
+                    self.assertEqual(len(np.intersect1d(
+                        partition.owned_vertices[i],
+                        partition.ghost_vertices[i])), 0)
+                    # the ghost facets are on the interface
+                    self.assertTrue(np.isin(partition.ghost_facets[i],
+                                            interface).all())
+
+                    sub, sub_vertices, _, sub_elements = \
+                        partition.submesh(i)
+                    self.assertTrue(type(sub) is mtype)
+                    np.testing.assert_array_equal(sub_elements, elements)
+                    np.testing.assert_array_equal(sub.p, m.p[:, sub_vertices])
+                    np.testing.assert_array_equal(sub_vertices[sub.t],
+                                                  m.t[:, elements])
+
+        with self.assertRaises(ValueError):
+            MeshTri().partition(3)
+        with self.assertRaises(ValueError):
+            MeshTri().partition(2, 'metis')
+
+
+class TestSubmesh(unittest.TestCase):
+
+    def runTest(self):
+        for mtype in [MeshLine, MeshTri, MeshQuad, MeshTet, MeshHex]:
+            m = mtype()
+            m.refine(2)
+            m.define_boundary('left', lambda x: x[0] == 0)
+            m.subdomains = {'a': m.elements_satisfying(lambda x: x[-1] < .5)}
+            mask = m.element_midpoints()[0] < .5
+            sub, vertices, facets, elements = m.submesh(mask)
+
+            self.assertTrue(type(sub) is mtype)
+            np.testing.assert_array_equal(elements, np.nonzero(mask)[0])
+            np.testing.assert_array_equal(sub.p, m.p[:, vertices])
+            np.testing.assert_array_equal(vertices[sub.t], m.t[:, elements])
+            np.testing.assert_array_equal(vertices[sub.facets],
+                                          m.facets[:, facets])
+            np.testing.assert_array_equal(facets[sub.t2f],
+                                          m.t2f[:, elements])
+            if m.dim() == 3:
+                np.testing.assert_array_equal(
+                    vertices[sub.edges],
+                    m.edges[:, np.unique(m.t2e[:, elements])])
+
+            # the reused connectivity agrees with a rebuilt one
+            rebuilt = sub.copy()
+            rebuilt.t = rebuilt.t.copy()
+            self.assertEqual(len(sub.boundary_facets()),
+                             len(rebuilt.boundary_facets()))
+            np.testing.assert_array_equal(
+                np.sort(sub.facets[:, sub.t2f], axis=0),
+                np.sort(rebuilt.facets[:, rebuilt.t2f], axis=0))
+
+            np.testing.assert_array_equal(
+                facets[sub.boundaries['left']], m.boundaries['left'])
+            np.testing.assert_array_equal(
+                elements[sub.subdomains['a']],
+                np.intersect1d(elements, m.subdomains['a']))
+
+        for mtype, btype in [(MeshTri, MeshLine),
+                             (MeshQuad, MeshLine),
+                             (MeshTet, MeshTri),
+                             (MeshHex, MeshQuad)]:
+            m = mtype()
+            m.refine(2)
+            surface, vertices, facets = m.boundary_mesh()
+            self.assertTrue(type(surface) is btype)
+            np.testing.assert_array_equal(facets, m.boundary_facets())
+            np.testing.assert_array_equal(vertices[surface.t],
+                                          m.facets[:, facets])
+            np.testing.assert_array_equal(surface.p, m.p[:, vertices])
+            if m.dim() == 3:
+                # the boundary of a closed surface is empty
+                self.assertEqual(len(surface.boundary_facets()), 0)
+                self.assertEqual(surface.facets.shape[1],
+                                 len(m.boundary_edges()))
+            # the surface is embedded in the space of the mesh
+            with self.assertRaises(NotImplementedError):
+                surface.mapping()
+
+
 class TestMeshQuadSplit(unittest.TestCase):
 
     def runTest(self):
@@ -3,9 +3,10 @@ import unittest
 import numpy as np
 
 from skfem.assembly import InteriorBasis
-from skfem.element import ElementTriP1
-from skfem.mesh import MeshTri
-from skfem.utils import L2_projection
+from skfem.element import (ElementHex1, ElementQuad1, ElementTetP1,
+                           ElementTriP1, ElementTriP2)
+from skfem.mesh import MeshHex, MeshQuad, MeshTet, MeshTri
+from skfem.utils import L2_projection, project, transfer_operator
 
 
 class InitializeScalarField(unittest.TestCase):
@@ -26,5 +27,64 @@ class InitializeScalarField(unittest.TestCase):
                         msg="|x-y| = {}".format(normest))
 
 
+class TransferNonMatching(unittest.TestCase):
+    """Transfer fields between bases on non-matching meshes."""
+
+    def runTest(self):
+        m1 = MeshTri()
+        m1.refine(3)
+        m2 = MeshQuad()
+        m2.scale(.8)
+        m2.translate((.1, .1))
+        m2.refine(2)
+        source = InteriorBasis(m1, ElementTriP2())
+        target = InteriorBasis(m2, ElementQuad1(), intorder=4)
+
+        def fun(x, y):
+            return x ** 2 + y
+
+        u = fun(*source.doflocs)
+        T = transfer_operator(source, target)
+        self.assertTrue(transfer_operator(source, target) is T)
+        np.testing.assert_allclose(T @ u, fun(*m2.p), atol=1e-12)
+
+        P = transfer_operator(source, target, 'projection')
+        np.testing.assert_allclose(P @ u, project(fun, basis_to=target),
+                                   atol=1e-12)
+        U = np.array([u, 2 * u]).T
+        np.testing.assert_allclose(P @ U, np.array([P @ u, 2 * P @ u]).T)
+
+        # moving the source vertices changes the operators
+        source.update(2. * m1.p)
+        T = transfer_operator(source, target)
+        np.testing.assert_allclose(T @ u, fun(*(m2.p / 2)), atol=1e-12)
+
+        # renumbering either basis changes the operators
+        T = transfer_operator(source, target)
+        p = source.renumber('rcm')
+        np.testing.assert_allclose(transfer_operator(source, target)
+                                   @ u[p], T @ u, atol=1e-12)
+        T = transfer_operator(source, target)
+        p = target.renumber('rcm')
+        np.testing.assert_allclose(transfer_operator(source, target) @ u,
+                                   (T @ u)[p], atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            transfer_operator(source, target, 'nearest')
+
+
+class TransferNonMatching3D(unittest.TestCase):
+
+    def runTest(self):
+        m1 = MeshHex()
+        m1.refine(2)
+        m2 = MeshTet()
+        m2.refine(1)
+        source = InteriorBasis(m1, ElementHex1())
+        target = InteriorBasis(m2, ElementTetP1())
+        T = transfer_operator(source, target)
+        np.testing.assert_allclose(T @ m1.p.sum(axis=0), m2.p.sum(axis=0))
+
+
 if __name__ == '__main__':
     unittest.main()